@@ -0,0 +1,200 @@
+"""In-process job manager running long optimisation requests off the event loop."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any, Optional
+
+from src.settings import JOB_HISTORY_SIZE, JOB_MAX_PENDING, JOB_MAX_WORKERS
+
+logger = logging.getLogger(__name__)
+
+# Job lifecycle states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are waiting for a worker."""
+
+
+@dataclass
+class Job:
+    """State of one submitted job, updated by the worker running it."""
+
+    id: str
+    kind: str
+    status: str = QUEUED
+    stage: Optional[str] = None
+    progress: float = 0.0  # Fraction of known stages started (1.0 once finished)
+    result: Any = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-friendly view of the job."""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": round(self.progress, 3),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class JobManager:
+    """
+    Runs submitted callables on a bounded worker pool and tracks their state.
+
+    Work runs on threads: the heavy parts (Stan fits, forecast process pools) already
+    run outside the interpreter, and threads let jobs report progress directly.
+    Each concurrent user gets their own worker up to ``max_workers``; further jobs
+    wait in the pool's queue, and submissions beyond ``max_pending`` waiting jobs
+    are rejected. Finished jobs are kept for polling, oldest evicted first.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = JOB_MAX_WORKERS,
+        max_pending: int = JOB_MAX_PENDING,
+        history_size: int = JOB_HISTORY_SIZE,
+    ) -> None:
+        self.max_pending = max_pending
+        self.history_size = history_size
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="optimisation-job"
+        )
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._inflight: dict[str, Job] = {}  # Request key -> queued or running job
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        kind: str,
+        func: Callable[[Callable[[str], None]], Any],
+        stages: tuple[str, ...] = (),
+        key: Optional[str] = None,
+    ) -> Job:
+        """
+        Queue ``func`` for execution.
+
+        Submissions carrying the ``key`` of a job that is still queued or running are
+        coalesced: the existing job is returned and ``func`` is not run again.
+
+        Args:
+            kind: Job type label (e.g. 'optimisation')
+            func: Callable taking a progress callback (called with a stage name) and
+                returning a JSON-serialisable result
+            stages: Expected stage names in order, used to turn stages into a fraction
+            key: Identity of the request (e.g. api.result_cache.request_key)
+
+        Returns:
+            The queued Job, or the in-flight job with the same key
+
+        Raises:
+            JobQueueFull: If ``max_pending`` jobs are already waiting
+        """
+        with self._lock:
+            if key is not None and key in self._inflight:
+                return self._inflight[key]
+            waiting = sum(job.status == QUEUED for job in self._jobs.values())
+            if waiting >= self.max_pending:
+                raise JobQueueFull(f"{waiting} jobs already queued")
+            job = Job(id=uuid.uuid4().hex, kind=kind)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._inflight[key] = job
+            self._evict()
+        self._executor.submit(self._run, job, func, stages, key)
+        return job
+
+    def completed(self, kind: str, result: Any) -> Job:
+        """
+        Record a job that finished without running (e.g. served from a result cache),
+        so clients poll it exactly like a computed one.
+        """
+        now = datetime.now(UTC)
+        job = Job(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            status=SUCCEEDED,
+            progress=1.0,
+            result=result,
+            created_at=now,
+            started_at=now,
+            finished_at=now,
+        )
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job by id, or None if unknown or evicted."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work and optionally wait for running jobs."""
+        self._executor.shutdown(wait=wait)
+
+    def _run(
+        self,
+        job: Job,
+        func: Callable[[Callable[[str], None]], Any],
+        stages: tuple[str, ...],
+        key: Optional[str] = None,
+    ) -> None:
+        """Worker body: run the job and record its outcome."""
+
+        def report(stage: str) -> None:
+            job.stage = stage
+            if stage in stages:
+                job.progress = stages.index(stage) / len(stages)
+
+        job.status = RUNNING
+        job.started_at = datetime.now(UTC)
+        try:
+            job.result = func(report)
+            job.status = SUCCEEDED
+            job.progress = 1.0
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind}) failed: {e}")
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = datetime.now(UTC)
+            with self._lock:
+                if key is not None and self._inflight.get(key) is job:
+                    del self._inflight[key]
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drop the oldest finished jobs beyond ``history_size`` (caller holds the lock)."""
+        excess = len(self._jobs) - self.history_size
+        if excess <= 0:
+            return
+        for job_id in [
+            job_id for job_id, job in self._jobs.items() if job.status in (SUCCEEDED, FAILED)
+        ][:excess]:
+            del self._jobs[job_id]
+
+
+# Shared manager used by the API routers
+job_manager = JobManager()
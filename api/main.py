@@ -10,12 +10,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 @app.get("/api/health")
 def health_check():
     return {"status": "ok", "message": "API is running"}
 
+@app.get("/metrics")
+def metrics():
+    """Expose pipeline counters and timing histograms in the Prometheus text format."""
+    from fastapi.responses import PlainTextResponse
+    from src.instrumentation import registry
+    return PlainTextResponse(
+        registry.render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
 @app.get("/")
 def root():
     from fastapi.responses import RedirectResponse
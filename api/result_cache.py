@@ -0,0 +1,162 @@
+"""Result cache and request keys for coalescing identical optimisation requests."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import UTC, datetime, timedelta
+from typing import Any, Optional
+
+import pandas as pd
+import pandas_market_calendars as mcal
+
+from src.settings import (
+    FORECAST_HORIZON,
+    MAXIMUM_ALLOCATION,
+    MINIMUM_ALLOCATION,
+    PROPHET_PARAMS,
+    RESULT_CACHE_SIZE,
+    RESULT_CACHE_TTL,
+    RISK_AVERSION,
+)
+
+logger = logging.getLogger(__name__)
+
+# Exchanges whose closes make cached results stale (tickers trade on NYSE or NSE)
+MARKET_CALENDARS = ("XNYS", "XNSE")
+# How long a computed market data version is reused before checking the calendars again
+_VERSION_REFRESH_SECONDS = 60.0
+# Values the optimisation uses for request fields left unset (None)
+REQUEST_DEFAULTS = {
+    "risk_aversion": RISK_AVERSION,
+    "min_allocation": MINIMUM_ALLOCATION,
+    "max_allocation": MAXIMUM_ALLOCATION,
+    "horizon": FORECAST_HORIZON,
+}
+
+
+def request_key(kind: str, payload: dict[str, Any]) -> str:
+    """
+    Hash a normalised request.
+
+    Tickers are upper-cased, de-duplicated and sorted; unset (None) fields are
+    replaced by the settings defaults the run would use (REQUEST_DEFAULTS, and
+    PROPHET_PARAMS under the given overrides), so requests differing only in
+    ordering or in spelling out defaults share a key.
+
+    Args:
+        kind: Request type (e.g. 'optimisation'), so different endpoints never collide
+        payload: Request fields (e.g. ``OptimizationRequest.dict()``)
+
+    Returns:
+        Hex digest identifying the request
+    """
+
+    def normalise(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {name: normalise(item) for name, item in value.items() if item is not None}
+        if isinstance(value, list | tuple):
+            return [normalise(item) for item in value]
+        if isinstance(value, int | float) and not isinstance(value, bool):
+            return float(value)  # Pydantic turns 5 into 5.0 for float fields
+        return value
+
+    normalised = normalise({**REQUEST_DEFAULTS, **normalise(payload)})
+    normalised["prophet_params"] = {**PROPHET_PARAMS, **normalised.get("prophet_params", {})}
+    if "tickers" in normalised:
+        normalised["tickers"] = sorted({ticker.strip().upper() for ticker in normalised["tickers"]})
+    encoded = json.dumps({"kind": kind, "request": normalised}, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def market_data_version(now: Optional[datetime] = None) -> str:
+    """
+    Identify the latest market data: the most recent session close of each exchange.
+
+    The value changes whenever any tracked exchange completes a session, which is
+    when new daily bars (and therefore new forecasts) become available.
+
+    Args:
+        now: Reference time (defaults to the current UTC time)
+
+    Returns:
+        String of the latest close timestamps, one per calendar
+    """
+    now = now or datetime.now(UTC)
+    closes = []
+    for calendar_name in MARKET_CALENDARS:
+        calendar = mcal.get_calendar(calendar_name)
+        schedule = calendar.schedule(
+            start_date=(now - timedelta(days=14)).date(), end_date=now.date()
+        )
+        past = schedule.loc[schedule["market_close"] <= pd.Timestamp(now)]
+        closes.append(past["market_close"].iloc[-1].isoformat() if not past.empty else "none")
+    return "|".join(closes)
+
+
+class ResultCache:
+    """
+    Thread-safe TTL + LRU cache of finished results.
+
+    Every entry is tagged with the market data version it was computed under and
+    is dropped as soon as the version changes (a session closed since).
+    """
+
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[tuple[float, str]] = None
+
+    def current_version(self) -> str:
+        """Market data version, recomputed at most once a minute."""
+        now = time.monotonic()
+        if self._version is None or now - self._version[0] > _VERSION_REFRESH_SECONDS:
+            try:
+                self._version = (now, market_data_version())
+            except Exception as e:
+                # Calendar failures must not take down the API; fall back to TTL only
+                logger.warning(f"Could not determine market data version: {e}")
+                self._version = (now, self._version[1] if self._version else "unknown")
+        return self._version[1]
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a cached result, or None when missing, expired or stale."""
+        version = self.current_version()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, stored_version, value = entry
+            if stored_version != version or time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a result under the current market data version."""
+        version = self.current_version()
+        with self._lock:
+            self._entries[key] = (time.monotonic(), version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drop every cached result (e.g. after new market data was ingested)."""
+        with self._lock:
+            self._entries.clear()
+        self._version = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Shared cache used by the optimisation router
+result_cache = ResultCache()
@@ -1,103 +1,137 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-import yfinance as yf
+from sqlalchemy import case, func
 from datetime import date, timedelta
-from typing import List, Dict, Any
+from typing import Optional
 import logging
 import pandas as pd
 
-from src.database import get_db, OptimizationResult
-from src.settings import PORTFOLIO_TICKERS
+from src.database import get_db, PredictionAccuracy
+from src.settings import ACCURACY_WINDOW_DAYS, ACCURACY_WINDOW_MAX
 
 router = APIRouter(prefix="/api/accuracy", tags=["accuracy"])
 logger = logging.getLogger(__name__)
 
+# 1.0 for a hit, 0.0 for a miss, NULL (ignored by AVG) when the direction is unscored
+_HIT = case(
+    (PredictionAccuracy.direction_hit.is_(True), 1.0),
+    (PredictionAccuracy.direction_hit.is_(False), 0.0),
+)
+
+
+def _percent(value: Optional[float]) -> Optional[float]:
+    """Scale a 0-1 rate to percent, keeping None."""
+    return None if value is None else 100.0 * float(value)
+
+
 @router.get("/")
-def get_accuracy_metrics(db: Session = Depends(get_db)):
+def get_accuracy_metrics(
+    window: int = Query(ACCURACY_WINDOW_DAYS, ge=1, le=ACCURACY_WINDOW_MAX),
+    db: Session = Depends(get_db),
+):
     """
-    Calculate accuracy metrics by comparing past predictions with actual market close prices.
+    Accuracy of the latest scored predictions, with trailing-window aggregates.
+
+    Scores are read from the accuracy table maintained by src.accuracy (no market
+    data is fetched here). Each row is one ticker of the latest scored date, plus
+    its MAPE, mean accuracy and directional hit rate (all in percent) over the
+    ``window`` calendar days ending on that date.
     """
-    today = date.today()
-    
-    # Get the most recent past prediction date
-    past_dates = db.query(OptimizationResult.as_of_date)\
-        .filter(OptimizationResult.as_of_date <= today)\
-        .distinct()\
-        .order_by(OptimizationResult.as_of_date.desc())\
-        .limit(1)\
-        .all()
-        
-    if not past_dates:
+    latest = db.query(func.max(PredictionAccuracy.as_of_date)).scalar()
+    if latest is None:
         return []
 
-    target_date = past_dates[0][0]
-    
-    # Fetch predictions for the target date
-    predictions_raw = db.query(OptimizationResult)\
-        .filter(OptimizationResult.as_of_date == target_date)\
+    window_start = latest - timedelta(days=window - 1)
+    aggregates = {
+        row.ticker: row
+        for row in db.query(
+            PredictionAccuracy.ticker,
+            func.avg(PredictionAccuracy.abs_pct_error).label("mape"),
+            func.avg(PredictionAccuracy.accuracy).label("mean_accuracy"),
+            func.avg(_HIT).label("hit_rate"),
+            func.count().label("samples"),
+        )
+        .filter(PredictionAccuracy.as_of_date.between(window_start, latest))
+        .group_by(PredictionAccuracy.ticker)
+        .all()
+    }
+    latest_scores = db.query(PredictionAccuracy)\
+        .filter(PredictionAccuracy.as_of_date == latest)\
+        .order_by(PredictionAccuracy.ticker)\
         .all()
-        
-    if not predictions_raw:
-        return []
 
-    # Deduplicate ticker predictions (use latest if multiple runs exist)
-    predictions_map = {p.ticker: p for p in predictions_raw}
-    predictions = list(predictions_map.values())
+    metrics = []
+    for score in latest_scores:
+        aggregate = aggregates[score.ticker]
+        metrics.append({
+            "ticker": score.ticker,
+            "predicted_price": score.predicted_price,
+            "actual_price": score.actual_price,
+            "accuracy": score.accuracy,
+            "date": score.as_of_date,
+            "abs_pct_error": score.abs_pct_error,
+            "direction_hit": score.direction_hit,
+            "window_days": window,
+            "mape": float(aggregate.mape),
+            "mean_accuracy": float(aggregate.mean_accuracy),
+            "hit_rate": _percent(aggregate.hit_rate),
+            "samples": aggregate.samples,
+        })
+    return metrics
 
-    logger.info(f"Calculating accuracy for {target_date} ({len(predictions)} tickers)")
 
-    # Fetch actual market data
-    start_d = target_date
-    end_d = target_date + timedelta(days=1)
-    tickers = [p.ticker for p in predictions]
-    ticker_str = " ".join(tickers)
-    
-    actual_prices = {}
-    
-    try:
-        data = yf.download(ticker_str, start=start_d, end=end_d, group_by='ticker', progress=False)
-        
-        if not data.empty:
-            # Handle single ticker case (yfinance returns different structure)
-            if len(tickers) == 1:
-                val = data['Close'].iloc[0] if hasattr(data['Close'], 'iloc') else data['Close']
-                if hasattr(val, 'item'): val = val.item()
-                actual_prices[tickers[0]] = val
-            else:
-                for ticker in tickers:
-                    try:
-                        # Check if ticker exists in the MultiIndex columns
-                        if ticker in data.columns.levels[0]:
-                            val = data[ticker]['Close'].iloc[0]
-                            if hasattr(val, 'item'): val = val.item()
-                            actual_prices[ticker] = val
-                    except Exception:
-                        continue
-                        
-    except Exception as e:
-        logger.error(f"Failed to fetch actual prices: {e}")
+@router.get("/rolling")
+def get_rolling_accuracy(
+    window: int = Query(ACCURACY_WINDOW_DAYS, ge=1, le=ACCURACY_WINDOW_MAX),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    tickers: Optional[str] = Query(None, description="Comma-separated tickers"),
+    db: Session = Depends(get_db),
+):
+    """
+    Rolling accuracy series: per ticker and scored date, the MAPE, mean accuracy and
+    directional hit rate (percent) over the trailing ``window`` calendar days.
+    """
+    query = db.query(
+        PredictionAccuracy.as_of_date,
+        PredictionAccuracy.ticker,
+        PredictionAccuracy.abs_pct_error,
+        PredictionAccuracy.accuracy,
+        _HIT.label("hit"),
+    )
+    if start_date is not None:
+        # Rows before start_date only warm up the first windows
+        warmup_start = start_date - timedelta(days=window - 1)
+        query = query.filter(PredictionAccuracy.as_of_date >= warmup_start)
+    if end_date is not None:
+        query = query.filter(PredictionAccuracy.as_of_date <= end_date)
+    ticker_list = [t.strip() for t in tickers.split(",") if t.strip()] if tickers else None
+    if ticker_list:
+        query = query.filter(PredictionAccuracy.ticker.in_(ticker_list))
+
+    scores = pd.DataFrame(
+        query.order_by(PredictionAccuracy.ticker, PredictionAccuracy.as_of_date).all(),
+        columns=["date", "ticker", "abs_pct_error", "accuracy", "hit"],
+    )
+    if scores.empty:
         return []
 
-    # Compute accuracy scores
-    metrics = []
-    for p in predictions:
-        actual = actual_prices.get(p.ticker)
-        
-        if actual and not (pd.isna(actual) or pd.isnull(actual)):
-            error_pct = abs(p.predicted_price - actual) / actual
-            accuracy = max(0.0, 100.0 * (1.0 - error_pct))
-            
-            if pd.isna(accuracy):
-                accuracy = 0.0
-            
-            metrics.append({
-                "ticker": p.ticker,
-                "predicted_price": p.predicted_price,
-                "actual_price": actual,
-                "accuracy": accuracy,
-                "date": target_date
-            })
+    scores["date"] = pd.to_datetime(scores["date"])
+    scores["hit"] = scores["hit"].astype(float)
+    rolling = scores.set_index("date").groupby("ticker")[["abs_pct_error", "accuracy", "hit"]]\
+        .rolling(f"{window}D")
+    series = rolling.mean().join(rolling["abs_pct_error"].count().rename("samples")).reset_index()
+    if start_date is not None:
+        series = series[series["date"] >= pd.Timestamp(start_date)]
 
-    metrics.sort(key=lambda x: x["ticker"])
-    return metrics
+    return [
+        {
+            "ticker": row.ticker,
+            "date": row.date.date(),
+            "mape": row.abs_pct_error,
+            "mean_accuracy": row.accuracy,
+            "hit_rate": None if pd.isna(row.hit) else 100.0 * row.hit,
+            "samples": int(row.samples),
+        }
+        for row in series.sort_values(["date", "ticker"]).itertuples(index=False)
+    ]
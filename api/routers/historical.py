@@ -1,42 +1,260 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import Session
-from typing import List, Any
+from datetime import date
+from collections.abc import Callable
+from typing import List, Any, Optional
+import base64
+import hashlib
 import json
+import threading
+import time
 
-from src.database import get_db, OptimizationResult
+from src.database import add_save_listener, get_db, OptimizationResult
+from src.settings import HISTORY_PAGE_MAX, LATEST_CACHE_TTL
 
 router = APIRouter(prefix="/api/historical", tags=["historical"])
 
-@router.get("/latest")
-def get_latest_results(db: Session = Depends(get_db)):
-    """
-    Get the most recent optimization results.
-    """
-    # Find the latest date
-    latest_date = db.query(OptimizationResult.as_of_date)\
-        .order_by(OptimizationResult.as_of_date.desc())\
-        .first()
-        
-    if not latest_date:
-        return {"message": "No data found"}
-        
-    results = db.query(OptimizationResult)\
-        .filter(OptimizationResult.as_of_date == latest_date[0])\
+class LatestSnapshot:
+    """
+    In-process cache of the serialised /latest response.
+
+    Results change once a day, so the body is built once and reused until results
+    are saved (see add_save_listener) or ``ttl`` expires; the TTL bounds staleness
+    when another process (e.g. the daily CLI run) writes to the database.
+    """
+
+    def __init__(self, ttl: float = LATEST_CACHE_TTL) -> None:
+        self.ttl = ttl
+        self._value: Optional[tuple[bytes, str, float]] = None  # body, ETag, stored at
+        self._generation = 0  # Bumped by invalidate()
+        self._lock = threading.Lock()
+
+    def get(self, build: Callable[[], Any]) -> tuple[bytes, str]:
+        """
+        Return (body, ETag), calling ``build`` for the payload on a miss.
+
+        A body whose build overlapped an invalidation may predate the save, so it is
+        returned to this caller but not cached.
+        """
+        value = self._value
+        if value is not None and time.monotonic() - value[2] <= self.ttl:
+            return value[0], value[1]
+        with self._lock:
+            value = self._value
+            if value is None or time.monotonic() - value[2] > self.ttl:
+                generation = self._generation
+                body = json.dumps(jsonable_encoder(build())).encode()
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                value = (body, etag, time.monotonic())
+                if generation == self._generation:
+                    self._value = value
+        return value[0], value[1]
+
+    def invalidate(self) -> None:
+        """Drop the cached body (called after results are saved)."""
+        self._generation += 1
+        self._value = None
+
+
+latest_snapshot = LatestSnapshot()
+add_save_listener(latest_snapshot.invalidate)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches ``etag``.
+
+    The header may list several validators, be ``*``, or carry weak (``W/``)
+    validators, which compare equal to the strong ETag for a GET.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _latest_results(db: Session) -> list[OptimizationResult]:
+    """
+    Rows of the latest date, newest run per ticker, in a single query.
+
+    dense_rank picks the latest date; row_number keeps one row per ticker when a
+    date was saved by several runs (each ticker appears once, not once per run).
+    """
+    ranked = db.query(
+        OptimizationResult.id,
+        func.dense_rank().over(order_by=OptimizationResult.as_of_date.desc()).label("date_rank"),
+        func.row_number().over(
+            partition_by=(OptimizationResult.as_of_date, OptimizationResult.ticker),
+            order_by=OptimizationResult.created_at.desc(),
+        ).label("run_rank"),
+    ).filter(OptimizationResult.as_of_date.isnot(None)).subquery()
+    return db.query(OptimizationResult)\
+        .join(ranked, ranked.c.id == OptimizationResult.id)\
+        .filter(ranked.c.date_rank == 1, ranked.c.run_rank == 1)\
+        .order_by(OptimizationResult.ticker)\
         .all()
-        
-    return parse_results(results)
+
+
+@router.get("/latest")
+def get_latest_results(request: Request, db: Session = Depends(get_db)):
+    """
+    Get the most recent optimization results: one row per ticker for the latest
+    date, from the newest run that saved it.
+
+    Served from an in-process cache with an ETag: clients polling with
+    If-None-Match get 304 Not Modified until new results are saved.
+    """
+
+    def build():
+        results = _latest_results(db)
+        if not results:
+            return {"message": "No data found"}
+        return parse_results(results)
+
+    body, etag = latest_snapshot.get(build)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# Output field -> column; ticker, date and id are always read (cursor and filters)
+HISTORY_FIELDS = {
+    "ticker": OptimizationResult.ticker,
+    "date": OptimizationResult.as_of_date,
+    "predicted_price": OptimizationResult.predicted_price,
+    "predicted_return": OptimizationResult.predicted_return,
+    "weight": OptimizationResult.portfolio_weight,
+    "actual_history": OptimizationResult.actual_prices_last_month,
+    "run_id": OptimizationResult.run_id,
+    "created_at": OptimizationResult.created_at,
+}
+DEFAULT_HISTORY_FIELDS = (
+    "ticker", "date", "predicted_price", "predicted_return", "weight", "actual_history"
+)
+
+
+def encode_cursor(as_of_date: date, row_id: str) -> str:
+    """Opaque cursor pointing after the row (as_of_date, id)."""
+    return base64.urlsafe_b64encode(json.dumps([as_of_date.isoformat(), row_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[date, str]:
+    """Inverse of encode_cursor; raises HTTP 400 for malformed cursors."""
+    try:
+        day, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return date.fromisoformat(day), str(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _history_query(
+    db: Session,
+    fields: list[str],
+    start_date: Optional[date],
+    end_date: Optional[date],
+    tickers: Optional[list[str]],
+):
+    """Filtered, projected query ordered newest first by (as_of_date, id)."""
+    columns = [OptimizationResult.id, OptimizationResult.as_of_date]
+    columns += [HISTORY_FIELDS[name] for name in fields if name != "date"]
+    query = db.query(*columns).filter(OptimizationResult.as_of_date.isnot(None))
+    if start_date is not None:
+        query = query.filter(OptimizationResult.as_of_date >= start_date)
+    if end_date is not None:
+        query = query.filter(OptimizationResult.as_of_date <= end_date)
+    if tickers:
+        query = query.filter(OptimizationResult.ticker.in_(tickers))
+    return query.order_by(OptimizationResult.as_of_date.desc(), OptimizationResult.id.desc())
+
+
+def _after(query, cursor: Optional[tuple[date, str]]):
+    """Keyset condition: rows strictly after the cursor in (as_of_date, id) descending order."""
+    if cursor is None:
+        return query
+    as_of_date, row_id = cursor
+    return query.filter(
+        or_(
+            OptimizationResult.as_of_date < as_of_date,
+            and_(OptimizationResult.as_of_date == as_of_date, OptimizationResult.id < row_id),
+        )
+    )
+
+
+def _split(values: Optional[str]) -> Optional[list[str]]:
+    """Parse a comma-separated query parameter."""
+    if not values:
+        return None
+    return [value.strip() for value in values.split(",") if value.strip()] or None
+
+
+def _project(row, fields: list[str]) -> dict[str, Any]:
+    """Response dict of the selected fields for one projected row."""
+    item = {}
+    for name in fields:
+        value = getattr(row, HISTORY_FIELDS[name].key)
+        if name == "actual_history":
+            value = value or []
+        item[name] = value
+    return item
+
 
 @router.get("/all")
-def get_all_results(limit: int = 100, db: Session = Depends(get_db)):
+def get_all_results(
+    limit: int = Query(100, ge=1, le=HISTORY_PAGE_MAX),
+    cursor: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    tickers: Optional[str] = Query(None, description="Comma-separated tickers"),
+    fields: Optional[str] = Query(None, description="Comma-separated output fields"),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: Session = Depends(get_db),
+):
     """
-    Get historical results.
+    Get historical results, newest first, one page at a time.
+
+    Pages are keyset-paginated on (as_of_date, id): pass the X-Next-Cursor header
+    of a response as ``cursor`` to get the next page (the header is absent on the
+    last page). ``fields`` selects columns (e.g. skip the heavy ``actual_history``).
+    With ``format=ndjson`` every matching row after ``cursor`` is streamed, one JSON
+    object per line, fetched from the database in pages of ``limit`` rows.
     """
-    results = db.query(OptimizationResult)\
-        .order_by(OptimizationResult.as_of_date.desc())\
-        .limit(limit)\
-        .all()
-        
-    return parse_results(results)
+    selected = _split(fields) or list(DEFAULT_HISTORY_FIELDS)
+    unknown = sorted(set(selected) - HISTORY_FIELDS.keys())
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(unknown)}")
+    ticker_list = _split(tickers)
+    position = decode_cursor(cursor) if cursor else None
+    query = _history_query(db, selected, start_date, end_date, ticker_list)
+
+    if format == "ndjson":
+
+        def export():
+            after = position
+            while True:
+                rows = _after(query, after).limit(limit).all()
+                for row in rows:
+                    yield json.dumps(_project(row, selected), default=str) + "\n"
+                if len(rows) < limit:
+                    return
+                after = (rows[-1].as_of_date, rows[-1].id)
+
+        return StreamingResponse(export(), media_type="application/x-ndjson")
+
+    # One extra row tells whether another page exists
+    rows = _after(query, position).limit(limit + 1).all()
+    page = rows[:limit]
+    headers = {}
+    if len(rows) > limit:
+        headers["X-Next-Cursor"] = encode_cursor(page[-1].as_of_date, page[-1].id)
+    return JSONResponse(
+        jsonable_encoder([_project(row, selected) for row in page]), headers=headers
+    )
 
 def parse_results(results: List[OptimizationResult]):
     """Helper to format DB results."""
@@ -48,6 +266,6 @@ def parse_results(results: List[OptimizationResult]):
             "predicted_price": r.predicted_price,
             "predicted_return": r.predicted_return,
             "weight": r.portfolio_weight,
-            "actual_history": json.loads(r.actual_prices_last_month) if r.actual_prices_last_month else []
+            "actual_history": r.actual_prices_last_month or []
         })
     return data
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel
 from typing import List, Optional
 import logging
 
-from src.main import run_optimisation
-from src.settings import PORTFOLIO_TICKERS, START_DATE, END_DATE
+from api.jobs import JobQueueFull, job_manager
+from api.result_cache import request_key, result_cache
+from src.main import run_efficient_frontier, run_optimisation, score_past_predictions
+from src.settings import PORTFOLIO_TICKERS, START_DATE, END_DATE, FRONTIER_RISK_AVERSIONS
 
 router = APIRouter(prefix="/api/optimization", tags=["optimization"])
 logger = logging.getLogger(__name__)
@@ -22,49 +24,179 @@ class OptimizationRequest(BaseModel):
     min_allocation: Optional[float] = None
     max_allocation: Optional[float] = None
     prophet_params: Optional[ProphetParams] = None
+    horizon: Optional[int] = None  # Trading days to forecast (defaults to FORECAST_HORIZON)
+
+class FrontierRequest(OptimizationRequest):
+    risk_aversions: List[float] = FRONTIER_RISK_AVERSIONS
 
 class OptimizationResponse(BaseModel):
     status: str
     message: str
     data: Optional[dict] = None
 
-@router.post("/run", response_model=OptimizationResponse)
-async def trigger_optimization(request: OptimizationRequest, background_tasks: BackgroundTasks):
+# Stages reported by run_optimisation, in order, plus the final database save
+OPTIMISATION_STAGES = ("extract", "preprocess", "forecast", "optimise", "save")
+# Stages reported by run_efficient_frontier (nothing is saved)
+FRONTIER_STAGES = ("extract", "preprocess", "forecast", "optimise")
+
+
+def _run_optimisation_job(
+    request: OptimizationRequest, progress, key: Optional[str] = None
+) -> dict:
+    """Job body: run the optimisation, save it, cache and return the response payload."""
+    # Convert Pydantic model to dict for prophet_params if present
+    prophet_params_dict = None
+    if request.prophet_params:
+        prophet_params_dict = request.prophet_params.dict(exclude_unset=True)
+
+    result = run_optimisation(
+        tickers=request.tickers,
+        start_date=request.start_date,
+        end_date=request.end_date,
+        risk_aversion=request.risk_aversion,
+        min_allocation=request.min_allocation,
+        max_allocation=request.max_allocation,
+        prophet_params=prophet_params_dict,
+        progress=progress,
+        horizon=request.horizon,
+    )
+
+    if not result:
+        raise RuntimeError("Optimization failed to produce results")
+
+    # Save results to database
+    progress("save")
+    from src.database import save_results_to_db
+    save_results_to_db(result)
+    score_past_predictions(result)
+
+    payload = {
+        "date": str(result["date"]),
+        "weights": result["weights"]
+    }
+    if "forecast_horizon" in result:
+        payload["forecast_horizon"] = {
+            ticker: [{**point, "date": str(point["date"])} for point in points]
+            for ticker, points in result["forecast_horizon"].items()
+        }
+    if key is not None:
+        result_cache.put(key, payload)
+    return payload
+
+@router.post("/run", response_model=OptimizationResponse, status_code=202)
+def trigger_optimization(request: OptimizationRequest, response: Response):
     """
-    Trigger the portfolio optimization process.
+    Queue a portfolio optimization run and return its job id immediately.
+
+    Poll GET /api/optimization/jobs/{job_id} for status, progress and the result.
+    Identical requests share one job while it runs; once finished, the result is served
+    from cache (as an already succeeded job) until new market data arrives.
     """
+    key = request_key("optimisation", request.dict())
+    cached = result_cache.get(key)
+    if cached is not None:
+        job = job_manager.completed("optimisation", cached)
+        response.status_code = 200
+        return {
+            "status": "success",
+            "message": "Optimization served from cache",
+            "data": {"job_id": job.id, "status": job.status, "result": cached}
+        }
+
     try:
-        # Convert Pydantic model to dict for prophet_params if present
-        prophet_params_dict = None
-        if request.prophet_params:
-            prophet_params_dict = request.prophet_params.dict(exclude_unset=True)
-
-        result = run_optimisation(
-            tickers=request.tickers,
-            start_date=request.start_date,
-            end_date=request.end_date,
-            risk_aversion=request.risk_aversion,
-            min_allocation=request.min_allocation,
-            max_allocation=request.max_allocation,
-            prophet_params=prophet_params_dict
+        job = job_manager.submit(
+            "optimisation",
+            lambda progress: _run_optimisation_job(request, progress, key),
+            stages=OPTIMISATION_STAGES,
+            key=key,
+        )
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Too many queued optimisations: {e}") from e
+
+    return {
+        "status": "queued",
+        "message": "Optimization queued",
+        "data": {"job_id": job.id, "status": job.status}
+    }
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """
+    Status of a queued optimization: queued, running (with current stage and progress),
+    succeeded (with the result) or failed (with the error).
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+def _run_frontier_job(request: FrontierRequest, progress, key: Optional[str] = None) -> dict:
+    """Job body: compute the frontier, cache and return the response payload."""
+    prophet_params_dict = None
+    if request.prophet_params:
+        prophet_params_dict = request.prophet_params.dict(exclude_unset=True)
+
+    result = run_efficient_frontier(
+        tickers=request.tickers,
+        start_date=request.start_date,
+        end_date=request.end_date,
+        risk_aversions=request.risk_aversions,
+        min_allocation=request.min_allocation,
+        max_allocation=request.max_allocation,
+        prophet_params=prophet_params_dict,
+        horizon=request.horizon,
+        progress=progress,
+    )
+
+    if not result:
+        raise RuntimeError("Frontier computation failed to produce results")
+
+    payload = {
+        "date": str(result["date"]),
+        "predicted_returns": result["predicted_returns"],
+        "frontier": result["frontier"]
+    }
+    if key is not None:
+        result_cache.put(key, payload)
+    return payload
+
+@router.post("/frontier", response_model=OptimizationResponse, status_code=202)
+def compute_frontier(request: FrontierRequest, response: Response):
+    """
+    Queue an efficient frontier computation over a grid of risk-aversion values.
+
+    Forecasts run once; each frontier point carries weights, expected return and variance
+    so clients can cache the curve and interpolate instead of re-running the optimisation.
+    Runs as a job like /run: poll GET /api/optimization/jobs/{job_id} for the result.
+    """
+    if not request.risk_aversions or any(value <= 0 for value in request.risk_aversions):
+        raise HTTPException(
+            status_code=422, detail="risk_aversions must be a non-empty list of positive values"
         )
-        
-        if not result:
-            raise HTTPException(status_code=500, detail="Optimization failed to produce results")
-            
-        # Save results to database
-        from src.database import save_results_to_db
-        save_results_to_db(result)
-        
+
+    key = request_key("frontier", request.dict())
+    cached = result_cache.get(key)
+    if cached is not None:
+        job = job_manager.completed("frontier", cached)
+        response.status_code = 200
         return {
             "status": "success",
-            "message": "Optimization completed successfully",
-            "data": {
-                "date": result["date"],
-                "weights": result["weights"]
-            }
+            "message": "Frontier served from cache",
+            "data": {"job_id": job.id, "status": job.status, "result": cached}
         }
-        
-    except Exception as e:
-        logger.error(f"Optimization endpoint error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        job = job_manager.submit(
+            "frontier",
+            lambda progress: _run_frontier_job(request, progress, key),
+            stages=FRONTIER_STAGES,
+            key=key,
+        )
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Too many queued optimisations: {e}") from e
+
+    return {
+        "status": "queued",
+        "message": "Frontier queued",
+        "data": {"job_id": job.id, "status": job.status}
+    }
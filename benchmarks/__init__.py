@@ -0,0 +1 @@
+"""Offline benchmarks for the forecasting and optimisation hot paths."""
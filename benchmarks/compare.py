@@ -0,0 +1,93 @@
+"""
+Compare two benchmark result files.
+
+Usage:
+    python -m benchmarks.compare [BASELINE CANDIDATE] [--threshold 0.1] [--fail-on-regression]
+
+Without arguments the two most recent files in benchmarks/results are compared.
+Cases are matched by benchmark name and parameters; the ratio is candidate/baseline
+best time, so values above 1 + threshold are reported as regressions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+from benchmarks.run import RESULTS_DIR
+
+
+def _case_key(result: dict[str, Any]) -> str:
+    """Stable identifier of a benchmark case."""
+    params = ",".join(f"{name}={value}" for name, value in sorted(result["params"].items()))
+    return f"{result['benchmark']}[{params}]"
+
+
+def compare(
+    baseline: dict[str, Any], candidate: dict[str, Any], threshold: float = 0.1
+) -> tuple[list[str], list[str]]:
+    """
+    Compare two reports.
+
+    Args:
+        baseline: Report written by benchmarks.run
+        candidate: Report written by benchmarks.run
+        threshold: Relative slowdown reported as a regression
+
+    Returns:
+        Tuple of (table lines, keys of regressed cases)
+    """
+    before = {_case_key(result): result for result in baseline["results"]}
+    after = {_case_key(result): result for result in candidate["results"]}
+    lines = [f"{'case':<70} {'before':>10} {'after':>10} {'ratio':>7} {'peak MB':>9}"]
+    regressions = []
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key]["best_seconds"], after[key]["best_seconds"]
+        ratio = new / old if old > 0 else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        lines.append(
+            f"{key:<70} {old:>9.4f}s {new:>9.4f}s {ratio:>7.2f} "
+            f"{after[key]['peak_mb']:>9.1f}{flag}"
+        )
+    for key in sorted(before.keys() ^ after.keys()):
+        lines.append(f"{key:<70} only in {'baseline' if key in before else 'candidate'}")
+    return lines, regressions
+
+
+def main(argv: list[str] | None = None) -> None:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("files", nargs="*", help="baseline and candidate JSON files")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.files and len(args.files) != 2:
+        parser.error("pass exactly two files (baseline and candidate) or none")
+    if args.files:
+        paths = [Path(name) for name in args.files]
+    else:
+        paths = sorted(RESULTS_DIR.glob("*.json"))[-2:]
+        if len(paths) < 2:
+            parser.error(f"need two result files in {RESULTS_DIR} (run 'make bench' twice)")
+
+    baseline, candidate = (json.loads(path.read_text()) for path in paths)
+    print(f"baseline:  {paths[0]} (commit {baseline.get('commit')})")
+    print(f"candidate: {paths[1]} (commit {candidate.get('commit')})")
+    lines, regressions = compare(baseline, candidate, args.threshold)
+    print("\n".join(lines))
+    if regressions and args.fail_on_regression:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Run the benchmark suite and store the results as JSON.
+
+Usage:
+    python -m benchmarks.run [--suite quick|full] [--output PATH] [--repeat N]
+
+Each case reports the best and mean wall time over ``--repeat`` runs and the peak
+Python heap growth (tracemalloc, which includes NumPy buffers). Stan fits run in
+a CmdStan subprocess, so their memory shows up as the child process's max RSS.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from collections.abc import Callable
+from datetime import UTC, datetime
+from itertools import product
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_stock_data
+from src.instrumentation import registry
+from src.model import ProphetModel
+from src.optimiser import calculate_mean_variance, optimize_portfolio_mean_variance
+from src.processor import append_predictions, preprocess_data, preprocess_panel
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# (tickers, years) grids per suite; forecasting is far slower, so it has its own grid
+SUITES: dict[str, dict[str, Any]] = {
+    "quick": {
+        "panel": list(product([10, 100], [1, 5])),
+        "optimise": [10, 100],
+        "forecast": list(product([4], [1, 2], [1, 2])),  # tickers, years, workers
+    },
+    "full": {
+        "panel": list(product([10, 100, 1000], [1, 5, 20])),
+        "optimise": [10, 100, 1000],
+        "forecast": list(product([10, 50], [1, 5], [1, 4])),
+    },
+}
+# SLSQP works on dense (N x N) Jacobian updates; skip it where it would dominate the run
+SLSQP_MAX_TICKERS = 250
+
+
+def _measure(func: Callable[[], Any], repeat: int) -> dict[str, float]:
+    """Time ``func`` over ``repeat`` runs and record peak traced memory of the first run."""
+    timings = []
+    peak_bytes = 0
+    for run in range(repeat):
+        gc.collect()
+        if run == 0:
+            tracemalloc.start()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+        if run == 0:
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return {
+        "best_seconds": min(timings),
+        "mean_seconds": sum(timings) / len(timings),
+        "peak_mb": peak_bytes / 2**20,
+    }
+
+
+def _panel_cases(grid: list[tuple[int, int]], repeat: int) -> list[dict[str, Any]]:
+    """Alignment and mean/covariance estimation cases."""
+    results = []
+    for num_tickers, years in grid:
+        stock_data = synthetic_stock_data(num_tickers, years)
+        panel = preprocess_panel(stock_data)
+        aligned = preprocess_data(stock_data)
+        zeros = {ticker: 0.0 for ticker in panel.tickers}
+        params = {"tickers": num_tickers, "years": years}
+        cases: dict[str, Callable[[], Any]] = {
+            "preprocess_data": lambda stock_data=stock_data: preprocess_data(stock_data),
+            "preprocess_panel": lambda stock_data=stock_data: preprocess_panel(stock_data),
+            "preprocess_panel_union": lambda stock_data=stock_data: preprocess_panel(
+                stock_data, mode="union"
+            ),
+            "calculate_mean_variance_dict": lambda aligned=aligned, zeros=zeros: (
+                calculate_mean_variance(append_predictions(aligned, zeros, zeros))
+            ),
+            "calculate_mean_variance_panel": lambda panel=panel, zeros=zeros: (
+                calculate_mean_variance(append_predictions(panel, zeros, zeros))
+            ),
+        }
+        for name, func in cases.items():
+            results.append({"benchmark": name, "params": params, **_measure(func, repeat)})
+            logging.info(f"{name} {params}: {results[-1]['best_seconds']:.4f}s")
+    return results
+
+
+def _optimise_cases(sizes: list[int], repeat: int) -> list[dict[str, Any]]:
+    """Mean-variance optimisation cases per solver."""
+    results = []
+    for num_tickers in sizes:
+        panel = preprocess_panel(synthetic_stock_data(num_tickers, years=1))
+        for solver in ("slsqp", "projected_gradient"):
+            if solver == "slsqp" and num_tickers > SLSQP_MAX_TICKERS:
+                continue
+            params = {"tickers": num_tickers, "solver": solver}
+            metrics = _measure(
+                lambda panel=panel, solver=solver: optimize_portfolio_mean_variance(
+                    panel, minimum_allocation=0.0, maximum_allocation=0.2, solver=solver
+                ),
+                repeat,
+            )
+            results.append(
+                {"benchmark": "optimize_portfolio_mean_variance", "params": params, **metrics}
+            )
+            logging.info(f"optimize {params}: {metrics['best_seconds']:.4f}s")
+    return results
+
+
+def _forecast_cache_hits() -> float:
+    """Forecast cache hits (memory and disk) recorded so far in this process."""
+    series = registry.counters.get("forecast_cache_total", {})
+    return sum(count for key, count in series.items() if dict(key).get("result") != "miss")
+
+
+def _forecast_cases(grid: list[tuple[int, int, int]]) -> list[dict[str, Any]]:
+    """Prophet fitting cases (run once each; fits are seconds long)."""
+    results = []
+    for num_tickers, years, workers in grid:
+        panel = preprocess_panel(synthetic_stock_data(num_tickers, years))
+        params = {"tickers": num_tickers, "years": years, "workers": workers}
+        # Every case must fit from scratch: no warm starts, no cached forecasts
+        model = ProphetModel(use_store=False, cache_forecasts=False)
+        hits = _forecast_cache_hits()
+        metrics = _measure(
+            lambda model=model, panel=panel, workers=workers: model.predict_for_tickers(
+                panel, max_workers=workers
+            ),
+            1,
+        )
+        assert _forecast_cache_hits() == hits, f"forecast cache served {params}"
+        results.append({"benchmark": "predict_for_tickers", "params": params, **metrics})
+        logging.info(f"predict_for_tickers {params}: {metrics['best_seconds']:.2f}s")
+    return results
+
+
+def _git_commit() -> str | None:
+    """Current commit hash, when run inside a git checkout."""
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+        return output.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(suite: str, repeat: int, skip_forecast: bool = False) -> dict[str, Any]:
+    """
+    Run every case of a suite.
+
+    Args:
+        suite: 'quick' or 'full'
+        repeat: Timed runs per case (forecast cases always run once)
+        skip_forecast: Skip the Prophet fitting cases
+
+    Returns:
+        JSON-serialisable report with environment metadata and per-case results
+    """
+    config = SUITES[suite]
+    results = _panel_cases(config["panel"], repeat) + _optimise_cases(config["optimise"], repeat)
+    if not skip_forecast:
+        results += _forecast_cases(config["forecast"])
+    return {
+        "suite": suite,
+        "commit": _git_commit(),
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "child_max_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        "results": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case")
+    parser.add_argument(
+        "--output", help="result file (default: benchmarks/results/<time>-<commit>.json)"
+    )
+    parser.add_argument("--skip-forecast", action="store_true", help="skip Prophet fitting cases")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    for noisy in ("prophet", "cmdstanpy", "src"):
+        logging.getLogger(noisy).setLevel(logging.ERROR)
+    # Prophet's pandas warnings would drown the progress output
+    warnings.filterwarnings("ignore")
+
+    report = run_suite(args.suite, args.repeat, args.skip_forecast)
+    if args.output:
+        output = Path(args.output)
+    else:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S")
+        output = RESULTS_DIR / f"{stamp}-{report['commit'] or 'nogit'}.json"
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {len(report['results'])} results to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Synthetic random-walk price panels for offline benchmarks."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def synthetic_stock_data(
+    num_tickers: int,
+    years: float,
+    seed: int = 0,
+    missing_fraction: float = 0.01,
+) -> dict[str, pd.DataFrame]:
+    """
+    Build per-ticker DataFrames shaped like the extractor's output.
+
+    Prices follow a geometric random walk on business days. A small fraction of
+    each ticker's days is dropped at random so alignment has real work to do.
+
+    Args:
+        num_tickers: Number of tickers
+        years: History length in years (252 trading days per year)
+        seed: Random seed
+        missing_fraction: Fraction of days dropped per ticker
+
+    Returns:
+        Map of ticker -> DataFrame with 'Price' and 'Returns' columns and a date index
+    """
+    rng = np.random.default_rng(seed)
+    periods = max(int(years * TRADING_DAYS_PER_YEAR), 2)
+    dates = pd.bdate_range("2000-01-03", periods=periods + 1)
+    log_returns = rng.normal(0.0003, 0.015, size=(periods + 1, num_tickers))
+    prices = 100 * np.exp(np.cumsum(log_returns, axis=0))
+
+    stock_data = {}
+    for column in range(num_tickers):
+        df = pd.DataFrame({"Price": prices[:, column]}, index=dates)
+        df["Returns"] = df["Price"].pct_change()
+        df = df.iloc[1:]
+        keep = rng.random(len(df)) >= missing_fraction
+        df = df.loc[keep]
+        df.index = df.index.date
+        df.index.name = "Date"
+        stock_data[f"SYN{column:04d}"] = df
+    return stock_data
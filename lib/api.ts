@@ -15,6 +15,36 @@ export interface OptimisationResult {
     weights: Record<string, number>;
 }
 
+export type JobStatus = 'queued' | 'running' | 'succeeded' | 'failed';
+
+export interface Job<T = unknown> {
+    id: string;
+    kind: string;
+    status: JobStatus;
+    stage: string | null;
+    progress: number;
+    result: T | null;
+    error: string | null;
+    created_at: string;
+    started_at: string | null;
+    finished_at: string | null;
+}
+
+const JOB_POLL_INTERVAL_MS = 2000;
+
+export interface FrontierPoint {
+    risk_aversion: number;
+    weights: Record<string, number>;
+    expected_return: number;
+    variance: number;
+}
+
+export interface FrontierResult {
+    date: string;
+    predicted_returns: Record<string, number>;
+    frontier: FrontierPoint[];
+}
+
 export interface HistoricalResult {
     ticker: string;
     date: string;
@@ -24,6 +54,15 @@ export interface HistoricalResult {
     actual_history: number[];
 }
 
+export interface HistoricalQuery {
+    limit?: number;
+    cursor?: string;
+    start_date?: string;
+    end_date?: string;
+    tickers?: string; // Comma-separated
+    fields?: string; // Comma-separated, e.g. 'ticker,date,predicted_price'
+}
+
 export interface ProphetParams {
     yearly_seasonality?: boolean;
     weekly_seasonality?: boolean;
@@ -38,14 +77,62 @@ export interface OptimizationConfig {
 }
 
 export const endpoints = {
-    runOptimization: async (tickers?: string[], config?: OptimizationConfig): Promise<OptimisationResult> => {
+    runOptimization: async (
+        tickers?: string[],
+        config?: OptimizationConfig,
+        onProgress?: (job: Job<OptimisationResult>) => void,
+    ): Promise<OptimisationResult> => {
         const payload: any = { ...config };
         if (tickers && tickers.length > 0) {
             payload.tickers = tickers;
         }
 
+        // The run is queued server-side; poll the job until it finishes
         const response = await api.post('/api/optimization/run', payload);
-        return response.data.data;
+        return endpoints.waitForJob(response.data.data, 'Optimization failed', onProgress);
+    },
+
+    // Resolve a queued job response ({ job_id, result? }) once the job has finished
+    waitForJob: async <T>(
+        queued: { job_id: string; result?: T },
+        failure: string,
+        onProgress?: (job: Job<T>) => void,
+    ): Promise<T> => {
+        // Cache hits come back already finished, with the result inline
+        if (queued.result) {
+            return queued.result;
+        }
+        for (;;) {
+            const job = await endpoints.getJob<T>(queued.job_id);
+            onProgress?.(job);
+            if (job.status === 'succeeded' && job.result) {
+                return job.result;
+            }
+            if (job.status === 'failed') {
+                throw new Error(job.error || failure);
+            }
+            await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+        }
+    },
+
+    getJob: async <T = unknown>(jobId: string): Promise<Job<T>> => {
+        const response = await api.get(`/api/optimization/jobs/${jobId}`);
+        return response.data;
+    },
+
+    getEfficientFrontier: async (
+        tickers?: string[],
+        config?: OptimizationConfig & { risk_aversions?: number[] },
+        onProgress?: (job: Job<FrontierResult>) => void,
+    ): Promise<FrontierResult> => {
+        const payload: any = { ...config };
+        if (tickers && tickers.length > 0) {
+            payload.tickers = tickers;
+        }
+
+        // Queued like /run; poll the job until it finishes
+        const response = await api.post('/api/optimization/frontier', payload);
+        return endpoints.waitForJob(response.data.data, 'Frontier computation failed', onProgress);
     },
 
     getLatestHistorical: async (): Promise<HistoricalResult[]> => {
@@ -53,18 +140,31 @@ export const endpoints = {
         return response.data;
     },
 
-    getAllHistorical: async (): Promise<HistoricalResult[]> => {
-        const response = await api.get('/api/historical/all');
+    getAllHistorical: async (query?: HistoricalQuery): Promise<HistoricalResult[]> => {
+        const response = await api.get('/api/historical/all', { params: query });
         return response.data;
     },
 
+    // One keyset page; pass nextCursor back as query.cursor until it is null
+    getHistoricalPage: async (
+        query?: HistoricalQuery,
+    ): Promise<{ rows: HistoricalResult[]; nextCursor: string | null }> => {
+        const response = await api.get('/api/historical/all', { params: query });
+        return { rows: response.data, nextCursor: response.headers['x-next-cursor'] ?? null };
+    },
+
     getMarketStatus: async (): Promise<Array<{ isOpen: boolean; exchange: string; timestamp: string }>> => {
         const response = await api.get('/api/market/status');
         return response.data;
     },
 
-    async getAccuracyData(): Promise<AccuracyMetric[]> {
-        const response = await api.get('/api/accuracy/');
+    async getAccuracyData(window?: number): Promise<AccuracyMetric[]> {
+        const response = await api.get('/api/accuracy/', { params: { window } });
+        return response.data;
+    },
+
+    async getRollingAccuracy(query?: RollingAccuracyQuery): Promise<RollingAccuracyPoint[]> {
+        const response = await api.get('/api/accuracy/rolling', { params: query });
         return response.data;
     },
 
@@ -89,6 +189,30 @@ export interface AccuracyMetric {
     actual_price: number;
     accuracy: number;
     date: string;
+    abs_pct_error: number;
+    direction_hit: boolean | null;
+    // Aggregates over the trailing window (percent)
+    window_days: number;
+    mape: number;
+    mean_accuracy: number;
+    hit_rate: number | null;
+    samples: number;
+}
+
+export interface RollingAccuracyQuery {
+    window?: number;
+    start_date?: string;
+    end_date?: string;
+    tickers?: string;  // Comma-separated
+}
+
+export interface RollingAccuracyPoint {
+    ticker: string;
+    date: string;
+    mape: number;
+    mean_accuracy: number;
+    hit_rate: number | null;
+    samples: number;
 }
 
 export interface MarketIndex {
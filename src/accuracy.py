@@ -0,0 +1,320 @@
+"""
+Prediction accuracy against realised closes.
+
+Usage:
+    python -m src.accuracy            # score predictions not evaluated yet
+    python -m src.accuracy --rebuild  # rescore every stored prediction
+
+Stored predictions are scored in one vectorised pass against daily closes: the
+closes each optimisation run extracted (every run scores past predictions after
+saving) or, from the command line, the local price store (PRICE_CACHE_DIR). The
+close of the first trading day on or after a prediction's as_of_date is the realised
+price, and the close before it is the reference for the directional hit. Scores are
+kept in the PredictionAccuracy table, so a refresh only evaluates predictions without
+a score (or re-saved since they were scored) and the API serves the table without
+fetching market data. Predictions still unscored ACCURACY_PENDING_DAYS after their
+as_of_date are no longer retried (``--rebuild`` considers every prediction).
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from collections import defaultdict
+from collections.abc import Mapping
+from datetime import date, datetime, timedelta
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, insert, or_, select
+
+from src import database
+from src.database import OptimizationResult, PredictionAccuracy
+from src.price_store import PriceStore
+from src.settings import ACCURACY_MAX_LAG_DAYS, ACCURACY_PENDING_DAYS, DB_INSERT_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+SCORE_COLUMNS = [
+    "as_of_date",
+    "ticker",
+    "close_date",
+    "predicted_price",
+    "actual_price",
+    "previous_close",
+    "error",
+    "abs_pct_error",
+    "accuracy",
+    "direction_hit",
+]
+
+
+def closes_frame(prices: Mapping[str, pd.Series], before: date | None = None) -> pd.DataFrame:
+    """
+    Stack per-ticker close series into one long frame.
+
+    Args:
+        prices: Map of ticker -> closes indexed by date
+        before: Ignore closes on or after this date (e.g. today's, possibly partial, bar)
+
+    Returns:
+        DataFrame with columns ticker, date, close and previous_close, sorted by date
+    """
+    frames = []
+    for ticker, series in prices.items():
+        close = pd.to_numeric(series, errors="coerce").dropna()
+        close.index = pd.to_datetime(close.index)
+        close = close.sort_index()
+        if before is not None:
+            close = close[close.index < pd.Timestamp(before)]
+        frames.append(
+            pd.DataFrame(
+                {
+                    "ticker": ticker,
+                    "date": close.index.values,
+                    "close": close.to_numpy(dtype=float),
+                    "previous_close": close.shift(1).to_numpy(dtype=float),
+                }
+            )
+        )
+
+    if not frames:
+        return pd.DataFrame(
+            {
+                "ticker": pd.Series(dtype=object),
+                "date": pd.Series(dtype="datetime64[ns]"),
+                "close": pd.Series(dtype=float),
+                "previous_close": pd.Series(dtype=float),
+            }
+        )
+    closes = pd.concat(frames, ignore_index=True)
+    closes["date"] = pd.to_datetime(closes["date"])
+    return closes.sort_values("date", kind="stable", ignore_index=True)
+
+
+def load_closes(store: PriceStore, tickers: list[str], before: date | None = None) -> pd.DataFrame:
+    """
+    Read cached closes for several tickers into one long frame (see closes_frame).
+
+    Tickers missing from the store are also looked up with the '.NS' suffix the
+    extractor falls back to. Nothing is downloaded.
+
+    Args:
+        store: Local price store
+        tickers: Ticker symbols as stored with the predictions
+        before: Ignore bars on or after this date
+
+    Returns:
+        DataFrame with columns ticker, date, close and previous_close, sorted by date
+    """
+    prices = {}
+    for ticker in tickers:
+        bars = store.load(ticker)
+        if (bars is None or bars.empty) and not ticker.endswith(".NS"):
+            bars = store.load(f"{ticker}.NS")
+        if bars is not None and not bars.empty and "Close" in bars:
+            prices[ticker] = bars["Close"]
+    return closes_frame(prices, before=before)
+
+
+def score_predictions(
+    predictions: pd.DataFrame,
+    closes: pd.DataFrame,
+    max_lag_days: int = ACCURACY_MAX_LAG_DAYS,
+) -> pd.DataFrame:
+    """
+    Score predictions against realised closes in one vectorised pass.
+
+    Each prediction is matched (per ticker, with ``merge_asof``) to the first close
+    on or after its as_of_date, at most ``max_lag_days`` later; predictions without
+    such a close are left out, to be scored once it is cached.
+
+    Args:
+        predictions: Frame with as_of_date, ticker and predicted_price columns
+        closes: Frame from load_closes
+        max_lag_days: Largest gap in days between as_of_date and the matched close
+
+    Returns:
+        Frame with SCORE_COLUMNS (abs_pct_error and accuracy in percent;
+        direction_hit is None when there is no previous close or the predicted
+        price equals it)
+    """
+    if predictions.empty or closes.empty:
+        return pd.DataFrame(columns=SCORE_COLUMNS)
+
+    left = predictions[["as_of_date", "ticker", "predicted_price"]].copy()
+    left["as_of_date"] = pd.to_datetime(left["as_of_date"])
+    left = left.sort_values("as_of_date", kind="stable")
+    matched = pd.merge_asof(
+        left,
+        closes,
+        left_on="as_of_date",
+        right_on="date",
+        by="ticker",
+        direction="forward",
+        tolerance=pd.Timedelta(int(max_lag_days), unit="D"),
+    ).dropna(subset=["close"])
+    matched = matched[matched["close"] > 0]
+    if matched.empty:
+        return pd.DataFrame(columns=SCORE_COLUMNS)
+
+    predicted = matched["predicted_price"].to_numpy(dtype=float)
+    actual = matched["close"].to_numpy(dtype=float)
+    previous = matched["previous_close"].to_numpy(dtype=float)
+    error = predicted - actual
+    abs_pct_error = np.abs(error) / actual * 100.0
+
+    predicted_move = np.sign(predicted - previous)
+    realised_move = np.sign(actual - previous)
+    scorable = ~np.isnan(previous) & (predicted_move != 0)
+    direction_hit = np.where(scorable, predicted_move == realised_move, None)
+
+    return pd.DataFrame(
+        {
+            "as_of_date": matched["as_of_date"].dt.date.to_numpy(),
+            "ticker": matched["ticker"].to_numpy(),
+            "close_date": matched["date"].dt.date.to_numpy(),
+            "predicted_price": predicted,
+            "actual_price": actual,
+            "previous_close": np.where(np.isnan(previous), None, previous),
+            "error": error,
+            "abs_pct_error": abs_pct_error,
+            "accuracy": np.maximum(0.0, 100.0 - abs_pct_error),
+            "direction_hit": direction_hit,
+        },
+        columns=SCORE_COLUMNS,
+    )
+
+
+def _pending_predictions(session, rebuild: bool, since: date | None) -> pd.DataFrame:
+    """
+    Newest stored prediction per (as_of_date, ticker) that has no up-to-date score.
+
+    Unless rebuilding, predictions dated before ``since`` are skipped: their close
+    would have been scored already, so they are unscorable (e.g. delisted tickers).
+    """
+    query = select(
+        OptimizationResult.as_of_date,
+        OptimizationResult.ticker,
+        OptimizationResult.predicted_price,
+        OptimizationResult.created_at,
+    ).where(OptimizationResult.as_of_date.isnot(None))
+    if not rebuild:
+        if since is not None:
+            query = query.where(OptimizationResult.as_of_date >= since)
+        # Anti-join: unscored predictions, or ones re-saved (upsert) after scoring
+        query = query.outerjoin(
+            PredictionAccuracy,
+            (PredictionAccuracy.as_of_date == OptimizationResult.as_of_date)
+            & (PredictionAccuracy.ticker == OptimizationResult.ticker),
+        ).where(
+            or_(
+                PredictionAccuracy.ticker.is_(None),
+                OptimizationResult.created_at > PredictionAccuracy.evaluated_at,
+            )
+        )
+
+    rows = session.execute(query).all()
+    frame = pd.DataFrame(rows, columns=["as_of_date", "ticker", "predicted_price", "created_at"])
+    return frame.sort_values("created_at", kind="stable").drop_duplicates(
+        ["as_of_date", "ticker"], keep="last"
+    )
+
+
+def refresh_accuracy(
+    store: PriceStore | None = None,
+    rebuild: bool = False,
+    today: date | None = None,
+    batch_size: int = DB_INSERT_BATCH_SIZE,
+    prices: Mapping[str, pd.Series] | None = None,
+) -> int:
+    """
+    Score stored predictions against known closes and persist the scores.
+
+    Predictions whose close is not known yet are picked up by a later refresh.
+    When the table is empty (first refresh) every prediction is considered,
+    otherwise only those of the last ACCURACY_PENDING_DAYS days.
+
+    Args:
+        store: Local price store holding the closes (never refreshed here)
+        rebuild: Rescore every prediction instead of only pending ones
+        today: Closes dated today or later are ignored as possibly partial
+            (defaults to the current date)
+        batch_size: Rows per insert statement
+        prices: Map of ticker -> closes (e.g. those extracted by the current run),
+            used instead of the store
+
+    Returns:
+        Number of scores written
+    """
+    if store is None and prices is None:
+        raise ValueError("Either a price store or prices are required")
+    today = today or date.today()
+
+    if database.SessionLocal is None:
+        database.init_db()
+
+    session = database.SessionLocal()
+    try:
+        since = None
+        if session.query(PredictionAccuracy.ticker).first() is not None:
+            since = today - timedelta(days=ACCURACY_PENDING_DAYS)
+        pending = _pending_predictions(session, rebuild, since)
+        if pending.empty:
+            return 0
+
+        tickers = sorted(pending["ticker"].unique())
+        if prices is not None:
+            closes = closes_frame(
+                {ticker: prices[ticker] for ticker in tickers if ticker in prices}, before=today
+            )
+        else:
+            closes = load_closes(store, tickers, before=today)
+        scores = score_predictions(pending, closes)
+        logger.info(f"Scored {len(scores)} of {len(pending)} pending predictions")
+
+        evaluated_at = datetime.now()
+        rows: list[dict[str, Any]] = [
+            {**row, "evaluated_at": evaluated_at}
+            for row in scores.to_dict("records")
+        ]
+
+        if rebuild:
+            session.execute(delete(PredictionAccuracy))
+        else:
+            tickers_by_date: dict[date, set[str]] = defaultdict(set)
+            for row in rows:
+                tickers_by_date[row["as_of_date"]].add(row["ticker"])
+            for as_of_date, tickers in tickers_by_date.items():
+                session.execute(
+                    delete(PredictionAccuracy).where(
+                        PredictionAccuracy.as_of_date == as_of_date,
+                        PredictionAccuracy.ticker.in_(sorted(tickers)),
+                    )
+                )
+        for start in range(0, len(rows), batch_size):
+            session.execute(insert(PredictionAccuracy), rows[start:start + batch_size])
+        session.commit()
+        return len(rows)
+
+    except Exception as e:
+        logger.error(f"Error refreshing accuracy scores: {e}")
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    from src.extractor import _default_store
+
+    parser = argparse.ArgumentParser(description="Score stored predictions against cached closes.")
+    parser.add_argument("--rebuild", action="store_true", help="rescore every prediction")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    price_store = _default_store()
+    if price_store is None:
+        raise SystemExit("PRICE_CACHE_DIR is not set: no cached closes to score against")
+    print(f"Scored {refresh_accuracy(price_store, rebuild=args.rebuild)} predictions")
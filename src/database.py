@@ -2,35 +2,100 @@
 
 from __future__ import annotations
 
-import json
 import logging
+import uuid
+from collections import defaultdict
+from collections.abc import Callable, Generator, Iterable
 from datetime import datetime, date
-from typing import Any, Generator
+from typing import Any
 
-from sqlalchemy import create_engine, Column, String, Float, Date, DateTime, Text, Integer
+from sqlalchemy import (
+    create_engine, delete, insert, select, Boolean, Column, String, Float, Date, DateTime,
+    ForeignKey, Index, Integer, JSON
+)
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
 from sqlalchemy.dialects.postgresql import JSONB
 
-from src.settings import DATABASE_URL, SUPABASE_TABLE_NAME
+from src.settings import DATABASE_URL, DB_INSERT_BATCH_SIZE, SUPABASE_TABLE_NAME
 
 logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+# Native JSONB on Postgres; JSON text on SQLite (decoded by SQLAlchemy on read)
+JSONColumn = JSON().with_variant(JSONB(), "postgresql")
+
+class OptimizationRun(Base):
+    """One optimisation run (stored once; its per-ticker rows reference it)."""
+    __tablename__ = f"{SUPABASE_TABLE_NAME}_runs"
+
+    run_id = Column(String, primary_key=True)
+    created_at = Column(DateTime, default=datetime.now)
+    as_of_date = Column(Date, nullable=True, index=True)
+    ticker_count = Column(Integer, nullable=False)
+    parameters = Column(JSONColumn, nullable=True)  # Risk settings and forecast overrides
+
 class OptimizationResult(Base):
     """SQLAlchemy model for portfolio optimization results."""
     __tablename__ = SUPABASE_TABLE_NAME
+    __table_args__ = (
+        # Latest-date lookups and per-date scans (ordered by ticker, newest run first)
+        Index(
+            f"ix_{SUPABASE_TABLE_NAME}_date_ticker_created", "as_of_date", "ticker", "created_at"
+        ),
+        # Per-ticker history
+        Index(f"ix_{SUPABASE_TABLE_NAME}_ticker_date", "ticker", "as_of_date"),
+    )
 
     id = Column(String, primary_key=True)
+    # Run the row belongs to (None for rows written before runs were recorded)
+    run_id = Column(String, ForeignKey(OptimizationRun.run_id), nullable=True)
     created_at = Column(DateTime, default=datetime.now)
     as_of_date = Column(Date, nullable=True)
     ticker = Column(String, nullable=False)
     predicted_price = Column(Float, nullable=False)
     predicted_return = Column(Float, nullable=False)
-    # Storing JSON as Text to be compatible with SQLite (for testing) and Postgres
-    actual_prices_last_month = Column(Text, nullable=True) 
+    actual_prices_last_month = Column(JSONColumn, nullable=True)  # List of recent closes
     portfolio_weight = Column(Float, nullable=False)
 
+class ForecastPoint(Base):
+    """One step of a multi-day forecast (with Prophet's uncertainty interval)."""
+    __tablename__ = f"{SUPABASE_TABLE_NAME}_forecast_points"
+    __table_args__ = (
+        Index(f"ix_{SUPABASE_TABLE_NAME}_forecast_points_date_ticker", "as_of_date", "ticker"),
+    )
+
+    id = Column(String, primary_key=True)
+    run_id = Column(String, ForeignKey(OptimizationRun.run_id), nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+    as_of_date = Column(Date, nullable=True)
+    ticker = Column(String, nullable=False)
+    step = Column(Integer, nullable=False)  # 1 = next trading day
+    target_date = Column(Date, nullable=False)
+    predicted_price = Column(Float, nullable=False)
+    lower = Column(Float, nullable=True)
+    upper = Column(Float, nullable=True)
+
+class PredictionAccuracy(Base):
+    """A stored prediction scored against the realised close (maintained by src.accuracy)."""
+    __tablename__ = f"{SUPABASE_TABLE_NAME}_accuracy"
+    __table_args__ = (
+        # Per-ticker rolling windows
+        Index(f"ix_{SUPABASE_TABLE_NAME}_accuracy_ticker_date", "ticker", "as_of_date"),
+    )
+
+    as_of_date = Column(Date, primary_key=True)
+    ticker = Column(String, primary_key=True)
+    close_date = Column(Date, nullable=False)  # Trading day whose close was compared
+    predicted_price = Column(Float, nullable=False)
+    actual_price = Column(Float, nullable=False)
+    previous_close = Column(Float, nullable=True)  # Close before close_date, if cached
+    error = Column(Float, nullable=False)  # predicted - actual
+    abs_pct_error = Column(Float, nullable=False)  # |error| / actual, in percent
+    accuracy = Column(Float, nullable=False)  # max(0, 100 - abs_pct_error)
+    direction_hit = Column(Boolean, nullable=True)  # Predicted move had the realised sign
+    evaluated_at = Column(DateTime, default=datetime.now)
+
 def get_db_engine():
     """Create and return SQLAlchemy engine."""
     if not DATABASE_URL:
@@ -53,14 +118,22 @@ def get_db_engine():
 
 SessionLocal = None
 
+# Callbacks run after results are committed (e.g. to invalidate API caches)
+_save_listeners: list[Callable[[], None]] = []
+
+def add_save_listener(listener: Callable[[], None]) -> None:
+    """Register a callback invoked after every successful save of results."""
+    _save_listeners.append(listener)
+
 def init_db():
     """Initialize database connection."""
     global SessionLocal
     try:
         engine = get_db_engine()
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-        # Create tables if they don't exist
-        Base.metadata.create_all(bind=engine)
+        # Create missing tables and bring existing ones up to the current schema
+        from src.migrations import upgrade
+        upgrade(engine)
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         raise
@@ -76,49 +149,177 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
-def save_results_to_db(result: dict[str, Any]) -> None:
+def _result_rows(
+    result: dict[str, Any], created_at: datetime
+) -> tuple[dict[str, Any], list[dict[str, Any]], list[dict[str, Any]]]:
     """
-    Save optimisation results to database using SQLAlchemy.
-    
+    Build insert parameters for one optimisation result.
+
     Args:
         result: Dictionary containing optimisation results
+        created_at: Timestamp stored on every row
+
+    Returns:
+        Tuple of (OptimizationRun row, OptimizationResult rows, ForecastPoint rows)
+        as column dicts
     """
-    import uuid
-    
+    run_id = str(uuid.uuid4())
+    as_of_date = result.get("date")
+    predictions = result.get("predictions", {})
+    predicted_returns = result.get("predicted_returns", {})
+    weights = result.get("weights", {})
+    actual_prices_last_month = result.get("actual_prices_last_month", {})
+
+    run = {
+        "run_id": run_id,
+        "created_at": created_at,
+        "as_of_date": as_of_date,
+        "ticker_count": len(predictions),
+        "parameters": result.get("parameters"),
+    }
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "run_id": run_id,
+            "created_at": created_at,
+            "as_of_date": as_of_date,
+            "ticker": ticker,
+            "predicted_price": float(predictions.get(ticker, 0.0)),
+            "predicted_return": float(predicted_returns.get(ticker, 0.0)),
+            "actual_prices_last_month": [
+                float(price) for price in actual_prices_last_month.get(ticker, [])
+            ],
+            "portfolio_weight": float(weights.get(ticker, 0.0)),
+        }
+        for ticker in predictions
+    ]
+
+    # Multi-day runs also store every forecast step
+    points = [
+        {
+            "id": str(uuid.uuid4()),
+            "run_id": run_id,
+            "created_at": created_at,
+            "as_of_date": as_of_date,
+            "ticker": ticker,
+            "step": step,
+            "target_date": point["date"],
+            "predicted_price": float(point["predicted_price"]),
+            "lower": float(point["lower"]),
+            "upper": float(point["upper"]),
+        }
+        for ticker, ticker_points in result.get("forecast_horizon", {}).items()
+        for step, point in enumerate(ticker_points, start=1)
+    ]
+    return run, rows, points
+
+
+def _latest_per_ticker(
+    rows: list[dict[str, Any]], points: list[dict[str, Any]], runs: list[dict[str, Any]]
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]]]:
+    """
+    Keep the last result per (as_of_date, ticker) of a batch, with its forecast points.
+
+    Runs left without rows are dropped.
+    """
+    latest = {(row["as_of_date"], row["ticker"]): row for row in rows}
+    kept_runs = {(key, row["run_id"]) for key, row in latest.items()}
+    points = [
+        point
+        for point in points
+        if ((point["as_of_date"], point["ticker"]), point["run_id"]) in kept_runs
+    ]
+    run_ids = {row["run_id"] for row in latest.values()}
+    return list(latest.values()), points, [run for run in runs if run["run_id"] in run_ids]
+
+
+def save_many_results_to_db(
+    results: Iterable[dict[str, Any]],
+    upsert: bool = False,
+    batch_size: int = DB_INSERT_BATCH_SIZE,
+) -> int:
+    """
+    Save several optimisation results (e.g. a backfill) in one transaction.
+
+    Rows are written with Core ``insert`` executemany statements, which bypass the
+    ORM unit of work and are batched into multi-row VALUES by the driver.
+
+    Args:
+        results: Optimisation result dictionaries (as returned by run_optimisation)
+        upsert: Replace rows already stored for the same (as_of_date, ticker) instead of
+            adding duplicates; within the batch the last result per (as_of_date, ticker)
+            wins, and runs left without rows are deleted
+        batch_size: Rows per insert statement
+
+    Returns:
+        Number of OptimizationResult rows written
+    """
+    created_at = datetime.now()
+    runs: list[dict[str, Any]] = []
+    rows: list[dict[str, Any]] = []
+    points: list[dict[str, Any]] = []
+    for result in results:
+        run, result_rows, result_points = _result_rows(result, created_at)
+        if result_rows:
+            runs.append(run)
+        rows.extend(result_rows)
+        points.extend(result_points)
+
+    if not rows:
+        logger.warning("No predictions to save")
+        return 0
+
+    if upsert:
+        rows, points, runs = _latest_per_ticker(rows, points, runs)
+
     if SessionLocal is None:
         init_db()
-        
+
     session = SessionLocal()
     try:
-        as_of_date = result.get("date")
-        predictions = result.get("predictions", {})
-        predicted_returns = result.get("predicted_returns", {})
-        weights = result.get("weights", {})
-        actual_prices_last_month = result.get("actual_prices_last_month", {})
-
-        if not predictions:
-            logger.warning("No predictions to save")
-            return
-
-        rows = []
-        for ticker in predictions.keys():
-            db_obj = OptimizationResult(
-                id=str(uuid.uuid4()),
-                created_at=datetime.now(),
-                as_of_date=as_of_date,
-                ticker=ticker,
-                predicted_price=float(predictions.get(ticker, 0.0)),
-                predicted_return=float(predicted_returns.get(ticker, 0.0)),
-                actual_prices_last_month=json.dumps(actual_prices_last_month.get(ticker, [])),
-                portfolio_weight=float(weights.get(ticker, 0.0)),
-            )
-            rows.append(db_obj)
+        replaced_runs: set[str] = set()
+        if upsert:
+            tickers_by_date: dict[Any, set[str]] = defaultdict(set)
+            for row in rows:
+                tickers_by_date[row["as_of_date"]].add(row["ticker"])
+            for model in (OptimizationResult, ForecastPoint):
+                for as_of_date, tickers in tickers_by_date.items():
+                    replaced = model.as_of_date == as_of_date, model.ticker.in_(sorted(tickers))
+                    replaced_runs.update(
+                        session.scalars(select(model.run_id).where(*replaced).distinct())
+                    )
+                    session.execute(delete(model).where(*replaced))
 
-        logger.info(f"Inserting {len(rows)} rows into database...")
-        session.add_all(rows)
+        logger.info(f"Inserting {len(rows) + len(points)} rows into database...")
+        for model, params in (
+            (OptimizationRun, runs), (OptimizationResult, rows), (ForecastPoint, points)
+        ):
+            for start in range(0, len(params), batch_size):
+                session.execute(insert(model), params[start:start + batch_size])
+
+        # Runs whose every row was replaced are dropped rather than left orphaned
+        replaced_runs.discard(None)
+        if replaced_runs:
+            session.execute(
+                delete(OptimizationRun).where(
+                    OptimizationRun.run_id.in_(sorted(replaced_runs)),
+                    ~select(OptimizationResult.id)
+                    .where(OptimizationResult.run_id == OptimizationRun.run_id)
+                    .exists(),
+                    ~select(ForecastPoint.id)
+                    .where(ForecastPoint.run_id == OptimizationRun.run_id)
+                    .exists(),
+                )
+            )
         session.commit()
         logger.info(f"Successfully saved {len(rows)} predictions to database")
-        
+        for listener in _save_listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.warning(f"Save listener failed: {e}")
+        return len(rows)
+
     except Exception as e:
         logger.error(f"Error saving to database: {e}")
         session.rollback()
@@ -126,5 +327,16 @@ def save_results_to_db(result: dict[str, Any]) -> None:
     finally:
         session.close()
 
+
+def save_results_to_db(result: dict[str, Any], upsert: bool = False) -> None:
+    """
+    Save optimisation results to database using SQLAlchemy.
+    
+    Args:
+        result: Dictionary containing optimisation results
+        upsert: Replace rows already stored for the same (as_of_date, ticker)
+    """
+    save_many_results_to_db([result], upsert=upsert)
+
 # Backward compatibility alias
 save_results_to_supabase = save_results_to_db
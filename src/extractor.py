@@ -1,22 +1,48 @@
 """Data extraction module for fetching stock data from yfinance."""
 
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import Optional
 import logging
+import time
 
 import pandas as pd
-import yfinance as yf
 
-from .settings import END_DATE, START_DATE
+from .price_store import PriceStore
+from .providers import PriceProvider, YFinanceProvider, is_transient_error
+from .settings import (
+    END_DATE,
+    EXTRACTION_BACKOFF,
+    EXTRACTION_MAX_CONCURRENCY,
+    EXTRACTION_MAX_RETRIES,
+    EXTRACTION_MODE,
+    EXTRACTION_TIMEOUT,
+    PRICE_CACHE_DIR,
+    START_DATE,
+)
 
 logger = logging.getLogger(__name__)
 
 
-def _process_ticker_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+@dataclass
+class TickerFetchReport:
+    """Outcome of fetching one ticker in concurrent extraction mode."""
+
+    ticker: str
+    symbol: Optional[str] = None  # Symbol the data was found under (e.g. 'TCS.NS')
+    success: bool = False
+    attempts: int = 0
+    latency: float = 0.0  # Wall-clock seconds spent on the ticker, including retries
+    error: Optional[str] = None
+
+
+def _process_ticker_dataframe(df: pd.DataFrame, symbol: Optional[str] = None) -> pd.DataFrame:
     """
     Process raw ticker DataFrame: extract price, calculate returns, normalise dates.
 
     Args:
         df: Raw DataFrame from yfinance with date index and 'Close' column
+        symbol: Symbol the data was fetched under, kept in ``attrs['symbol']``
 
     Returns:
         Processed DataFrame with 'Price' and 'Returns' columns and date index
@@ -31,38 +57,63 @@ def _process_ticker_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     # Convert index to date type
     df.index = df.index.date
     df.index.name = "Date"
+    if symbol is not None:
+        df.attrs["symbol"] = symbol
 
     return df
 
 
-def _extract_single_ticker_data(ticker: str, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
+def _default_store() -> Optional[PriceStore]:
+    """Return the configured local price store, or None when caching is disabled."""
+    return PriceStore(PRICE_CACHE_DIR) if PRICE_CACHE_DIR else None
+
+
+def _fetch_history(
+    symbol: str,
+    start_date: str,
+    end_date: str,
+    provider: PriceProvider,
+    store: Optional[PriceStore] = None,
+) -> pd.DataFrame:
+    """Fetch raw bars for one symbol, going through the local store when configured."""
+    if store is not None:
+        return store.get_history(symbol, start_date, end_date, provider)
+    return provider.fetch(symbol, start_date, end_date)
+
+
+def _extract_single_ticker_data(
+    ticker: str,
+    start_date: str,
+    end_date: str,
+    provider: Optional[PriceProvider] = None,
+    store: Optional[PriceStore] = None,
+) -> Optional[pd.DataFrame]:
     """
     Extract and process data for a single ticker.
     Tries the raw ticker first, then auto-appends '.NS' (NSE India) if no data found.
     """
+    provider = provider or YFinanceProvider()
     try:
         # 1. Try exact match (e.g., US stocks or user already provided extension)
-        stock = yf.Ticker(ticker)
-        df = stock.history(start=start_date, end=end_date)
-        
+        symbol = ticker
+        df = _fetch_history(ticker, start_date, end_date, provider, store)
+
         # 2. If empty, try appending .NS (Indian NSE)
         if df.empty and not ticker.endswith(".NS"):
             ticker_ns = f"{ticker}.NS"
             logger.info(f"No data for '{ticker}', trying '{ticker_ns}'...")
-            stock_ns = yf.Ticker(ticker_ns)
-            df_ns = stock_ns.history(start=start_date, end=end_date)
-            
+            df_ns = _fetch_history(ticker_ns, start_date, end_date, provider, store)
+
             if not df_ns.empty:
                 logger.info(f"Found data for '{ticker_ns}'")
+                symbol = ticker_ns
                 df = df_ns
 
-        df_processed = _process_ticker_dataframe(df)
-
         if df.empty:
             logger.warning(f"No data available for ticker: {ticker} (or .NS variant)")
             return None
 
-        return df_processed
+        return _process_ticker_dataframe(df, symbol)
 
     # Exception if ticker doesn't exist
     except Exception as e:
@@ -70,10 +121,231 @@ def _extract_single_ticker_data(ticker: str, start_date: str, end_date: str) ->
         return None
 
 
+def _fetch_many_histories(
+    symbols: list[str],
+    start_date: str,
+    end_date: str,
+    provider: PriceProvider,
+    store: Optional[PriceStore] = None,
+) -> dict[str, pd.DataFrame]:
+    """Fetch raw bars for several symbols in one batch, going through the local store when configured."""
+    if store is not None:
+        return store.get_many(symbols, start_date, end_date, provider)
+    return provider.fetch_many(symbols, start_date, end_date)
+
+
+def _extract_batched(
+    tickers: list[str],
+    start_date: str,
+    end_date: str,
+    provider: PriceProvider,
+    store: Optional[PriceStore] = None,
+) -> dict[str, pd.DataFrame]:
+    """
+    Extract all tickers with one batched request plus one batched '.NS' retry pass.
+
+    Args:
+        tickers: List of stock ticker symbols
+        start_date: Start date for data download (YYYY-MM-DD format)
+        end_date: End date for data download (YYYY-MM-DD format)
+        provider: Price provider
+        store: Optional local price store
+
+    Returns:
+        Dictionary mapping ticker to processed DataFrame (tickers without data omitted)
+    """
+    try:
+        raw_data = _fetch_many_histories(tickers, start_date, end_date, provider, store)
+    except Exception as e:
+        logger.error(f"Error downloading batch of {len(tickers)} tickers: {e}")
+        raw_data = {}
+
+    resolved = {ticker: ticker for ticker in tickers}
+
+    # Retry only the tickers that came back empty, as a single '.NS' (NSE India) batch
+    retry = {
+        f"{ticker}.NS": ticker
+        for ticker in tickers
+        if (raw_data.get(ticker) is None or raw_data[ticker].empty) and not ticker.endswith(".NS")
+    }
+    if retry:
+        logger.info(f"No data for {len(retry)} tickers, retrying with '.NS' suffix...")
+        try:
+            ns_data = _fetch_many_histories(list(retry), start_date, end_date, provider, store)
+        except Exception as e:
+            logger.error(f"Error downloading '.NS' retry batch: {e}")
+            ns_data = {}
+        for symbol_ns, ticker in retry.items():
+            df_ns = ns_data.get(symbol_ns)
+            if df_ns is not None and not df_ns.empty:
+                logger.info(f"Found data for '{symbol_ns}'")
+                raw_data[ticker] = df_ns
+                resolved[ticker] = symbol_ns
+
+    all_stock_data: dict[str, pd.DataFrame] = {}
+    for ticker in tickers:
+        df = raw_data.get(ticker)
+        if df is None or df.empty:
+            logger.warning(f"No data available for ticker: {ticker} (or .NS variant)")
+            continue
+        all_stock_data[ticker] = _process_ticker_dataframe(df, resolved[ticker])
+
+    return all_stock_data
+
+
+def _fetch_with_retry(
+    symbol: str,
+    start_date: str,
+    end_date: str,
+    provider: PriceProvider,
+    store: Optional[PriceStore],
+    deadline: float,
+    max_retries: int,
+    backoff: float,
+    report: TickerFetchReport,
+) -> pd.DataFrame:
+    """
+    Fetch one symbol, retrying transient errors with exponential backoff until the deadline.
+
+    The remaining time budget is passed to the provider as the request timeout, so a
+    stalled request cannot hold the worker past the ticker's deadline.
+    """
+    retries = 0
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"{symbol} timed out after {report.attempts} attempt(s)")
+
+        report.attempts += 1
+        try:
+            if store is not None:
+                return store.get_history(symbol, start_date, end_date, provider, timeout=remaining)
+            return provider.fetch(symbol, start_date, end_date, timeout=remaining)
+        except Exception as e:
+            if not is_transient_error(e) or retries >= max_retries:
+                raise
+            delay = backoff * 2**retries
+            retries += 1
+            if time.monotonic() + delay >= deadline:
+                raise TimeoutError(
+                    f"{symbol} timed out after {report.attempts} attempt(s): {e}"
+                ) from e
+            logger.warning(f"Transient error for {symbol} ({e}), retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+
+def _extract_ticker_with_report(
+    ticker: str,
+    start_date: str,
+    end_date: str,
+    provider: PriceProvider,
+    store: Optional[PriceStore],
+    timeout: float,
+    max_retries: int,
+    backoff: float,
+) -> tuple[Optional[pd.DataFrame], TickerFetchReport]:
+    """Extract one ticker (with '.NS' fallback) and record latency, attempts and failure reason."""
+    report = TickerFetchReport(ticker=ticker)
+    started = time.monotonic()
+    deadline = started + timeout
+    df: Optional[pd.DataFrame] = None
+
+    try:
+        symbols = [ticker] if ticker.endswith(".NS") else [ticker, f"{ticker}.NS"]
+        for symbol in symbols:
+            raw = _fetch_with_retry(
+                symbol, start_date, end_date, provider, store, deadline, max_retries, backoff, report
+            )
+            if not raw.empty:
+                report.symbol = symbol
+                df = _process_ticker_dataframe(raw, symbol)
+                break
+        if df is None or df.empty:
+            df = None
+            report.error = "no data available (or .NS variant)"
+        else:
+            report.success = True
+    except Exception as e:
+        report.error = f"{type(e).__name__}: {e}"
+
+    report.latency = time.monotonic() - started
+    return df, report
+
+
+def extract_data_concurrent(
+    tickers: list[str],
+    start_date: str = START_DATE,
+    end_date: str = END_DATE,
+    provider: Optional[PriceProvider] = None,
+    store: Optional[PriceStore] = None,
+    max_concurrency: int = EXTRACTION_MAX_CONCURRENCY,
+    timeout: float = EXTRACTION_TIMEOUT,
+    max_retries: int = EXTRACTION_MAX_RETRIES,
+    backoff: float = EXTRACTION_BACKOFF,
+) -> tuple[dict[str, pd.DataFrame], dict[str, TickerFetchReport]]:
+    """
+    Extract tickers concurrently on a bounded thread pool with per-ticker retries.
+
+    A slow or throttled ticker only occupies one worker, and failures are reported
+    per ticker instead of being dropped silently.
+
+    Args:
+        tickers: List of stock ticker symbols
+        start_date: Start date for data download (YYYY-MM-DD format)
+        end_date: End date for data download (YYYY-MM-DD format)
+        provider: Price provider (defaults to yfinance)
+        store: Local price store (defaults to PRICE_CACHE_DIR when set, otherwise no cache)
+        max_concurrency: Maximum number of tickers fetched at the same time
+        timeout: Per-ticker time budget in seconds, including retries and backoff
+        max_retries: Maximum retries per request on transient errors
+        backoff: Initial retry delay in seconds, doubled after each retry
+
+    Returns:
+        Tuple containing:
+        - all_stock_data: dict mapping ticker to DataFrame with columns ['Price', 'Returns']
+        - reports: dict mapping ticker to its TickerFetchReport (same order as tickers)
+    """
+    provider = provider or YFinanceProvider()
+    store = store if store is not None else _default_store()
+
+    all_stock_data: dict[str, pd.DataFrame] = {}
+    reports: dict[str, TickerFetchReport] = {}
+    if not tickers:
+        return all_stock_data, reports
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(tickers)))) as executor:
+        futures = [
+            executor.submit(
+                _extract_ticker_with_report,
+                ticker,
+                start_date,
+                end_date,
+                provider,
+                store,
+                timeout,
+                max_retries,
+                backoff,
+            )
+            for ticker in tickers
+        ]
+        for ticker, future in zip(tickers, futures, strict=True):
+            df, report = future.result()
+            reports[ticker] = report
+            if df is not None:
+                all_stock_data[ticker] = df
+            else:
+                logger.warning(f"Failed to extract {ticker}: {report.error}")
+
+    return all_stock_data, reports
+
+
 def extract_data(
     tickers: list[str],
     start_date: str = START_DATE,
     end_date: str = END_DATE,
+    provider: Optional[PriceProvider] = None,
+    store: Optional[PriceStore] = None,
+    mode: str = EXTRACTION_MODE,
 ) -> dict[str, pd.DataFrame]:
     """
     Extract historical stock data for multiple tickers.
@@ -82,14 +354,36 @@ def extract_data(
         tickers: List of stock ticker symbols
         start_date: Start date for data download (YYYY-MM-DD format)
         end_date: End date for data download (YYYY-MM-DD format)
+        provider: Price provider (defaults to yfinance)
+        store: Local price store (defaults to PRICE_CACHE_DIR when set, otherwise no cache)
+        mode: 'batch' (one request for the whole universe), 'concurrent' (see
+            extract_data_concurrent) or 'serial' (one request per ticker)
 
     Returns:
         Dictionary mapping ticker to DataFrame with columns ['Price', 'Returns']
     """
     all_stock_data: dict[str, pd.DataFrame] = {}
+    provider = provider or YFinanceProvider()
+    store = store if store is not None else _default_store()
+
+    if mode == "batch":
+        return _extract_batched(tickers, start_date, end_date, provider, store)
+    if mode == "concurrent":
+        all_stock_data, reports = extract_data_concurrent(
+            tickers, start_date, end_date, provider=provider, store=store
+        )
+        slowest = max(reports.values(), key=lambda report: report.latency, default=None)
+        if slowest is not None:
+            logger.info(
+                f"Extracted {len(all_stock_data)}/{len(tickers)} tickers; "
+                f"slowest {slowest.ticker} took {slowest.latency:.2f}s"
+            )
+        return all_stock_data
+    if mode != "serial":
+        raise ValueError(f"Unknown extraction mode: {mode}")
 
     for ticker in tickers:
-        df_processed = _extract_single_ticker_data(ticker, start_date, end_date)
+        df_processed = _extract_single_ticker_data(ticker, start_date, end_date, provider, store)
         if df_processed is not None:
             all_stock_data[ticker] = df_processed
 
@@ -0,0 +1,181 @@
+"""Cache of next-day forecasts keyed by ticker, price data and effective Prophet params."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+from .instrumentation import increment
+from .model_store import params_fingerprint, series_fingerprint
+from .settings import (
+    FORECAST_CACHE_DIR,
+    FORECAST_CACHE_ENABLED,
+    FORECAST_CACHE_MAX_BYTES,
+    FORECAST_CACHE_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ForecastCache:
+    """
+    Two-level cache of predicted prices.
+
+    A forecast depends only on the price series and the effective model parameters,
+    so requests that change risk settings alone can reuse it. Entries live in an
+    in-memory LRU and, when ``root`` is set, in a local directory (one small file per
+    entry) that survives restarts; the directory is kept under ``max_bytes`` by
+    removing the least recently used files.
+    """
+
+    def __init__(
+        self,
+        root: str | Path | None = None,
+        max_entries: int = FORECAST_CACHE_SIZE,
+        max_bytes: int = FORECAST_CACHE_MAX_BYTES,
+    ) -> None:
+        """
+        Initialise the cache.
+
+        Args:
+            root: Directory for the on-disk store (None keeps entries in memory only)
+            max_entries: Entries kept in memory
+            max_bytes: Size budget of the on-disk store
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._memory: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self.root = Path(root) if root else None
+        self._disk_bytes = 0
+        if self.root is not None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(path.stat().st_size for path in self.root.glob("*.json"))
+
+    @staticmethod
+    def key(ticker: str, price_series: pd.Series, params: dict) -> str:
+        """
+        Build the cache key of a forecast.
+
+        Args:
+            ticker: Ticker symbol
+            price_series: Price series the forecast is made from
+            params: Effective Prophet parameters (including the holiday calendar)
+
+        Returns:
+            Key that is also a safe file name
+        """
+        safe_ticker = "".join(char if char.isalnum() or char in "-_." else "_" for char in ticker)
+        return f"{safe_ticker}-{series_fingerprint(price_series)[:24]}-{params_fingerprint(params)}"
+
+    def get(self, key: str) -> float | None:
+        """Return a cached predicted price, or None on a miss."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                increment("forecast_cache_total", result="memory")
+                return self._memory[key]
+
+        value = self._read(key)
+        if value is None:
+            increment("forecast_cache_total", result="miss")
+            return None
+        increment("forecast_cache_total", result="disk")
+        self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: float) -> None:
+        """Store a predicted price in memory and, when enabled, on disk."""
+        self._remember(key, value)
+        if self.root is None:
+            return
+        path = self.root / f"{key}.json"
+        tmp_path = None
+        try:
+            # Unique temp file: concurrent jobs may store the same entry at once
+            with tempfile.NamedTemporaryFile(dir=self.root, suffix=".tmp", delete=False) as tmp:
+                tmp_path = Path(tmp.name)
+            tmp_path.write_text(json.dumps({"predicted_price": value}))
+            previous = path.stat().st_size if path.exists() else 0
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Could not write forecast cache entry {key}: {e}")
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
+            return
+        with self._lock:
+            self._disk_bytes += path.stat().st_size - previous
+            if self._disk_bytes > self.max_bytes:
+                self._evict_disk()
+
+    def clear(self) -> None:
+        """Drop every entry from memory and disk."""
+        with self._lock:
+            self._memory.clear()
+            if self.root is not None:
+                for path in self.root.glob("*.json"):
+                    path.unlink(missing_ok=True)
+                self._disk_bytes = 0
+
+    def _remember(self, key: str, value: float) -> None:
+        """Insert into the memory LRU."""
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _read(self, key: str) -> float | None:
+        """Read an entry from disk, marking it as recently used."""
+        if self.root is None:
+            return None
+        path = self.root / f"{key}.json"
+        try:
+            value = float(json.loads(path.read_text())["predicted_price"])
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable forecast cache entry {key}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def _evict_disk(self) -> None:
+        """Remove least recently used files until the store is at 90% of its budget."""
+        entries = []
+        for path in self.root.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._disk_bytes = total
+
+
+_shared_cache: ForecastCache | None = None
+
+
+def default_forecast_cache() -> ForecastCache | None:
+    """Return the process-wide forecast cache, or None when caching is disabled."""
+    global _shared_cache
+    if not FORECAST_CACHE_ENABLED:
+        return None
+    if _shared_cache is None:
+        _shared_cache = ForecastCache(FORECAST_CACHE_DIR)
+    return _shared_cache
@@ -0,0 +1,263 @@
+"""Lightweight instrumentation: timing spans, counters, histograms and profiling."""
+
+from __future__ import annotations
+
+import bisect
+import cProfile
+import io
+import json
+import logging
+import pstats
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Protocol
+
+from .settings import METRICS_SINKS
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds (Prometheus-style, cumulative)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, object]) -> LabelKey:
+    """Canonical, hashable form of a label dict."""
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+@dataclass
+class Histogram:
+    """Cumulative-bucket histogram of observed values."""
+
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    counts: list[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+    maximum: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+
+    def observe(self, value: float) -> None:
+        """Add one observation."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+        self.maximum = max(self.maximum, value)
+
+
+class MetricsSink(Protocol):
+    """Receiver of completed spans (in addition to the registry's aggregates)."""
+
+    def emit_span(self, name: str, duration: float, labels: dict[str, str]) -> None:
+        """Handle one completed span."""
+        ...
+
+
+class JsonLogSink:
+    """Sink writing one JSON log line per completed span."""
+
+    def __init__(self, log: logging.Logger | None = None) -> None:
+        self.log = log or logger
+
+    def emit_span(self, name: str, duration: float, labels: dict[str, str]) -> None:
+        """Log the span as a JSON object."""
+        self.log.info(
+            json.dumps({"event": "span", "name": name, "seconds": round(duration, 6), **labels})
+        )
+
+
+class MetricsRegistry:
+    """
+    Thread-safe in-memory store of counters and histograms.
+
+    Spans are recorded as ``<name>_seconds`` histograms. The registry itself is the
+    in-memory sink (see ``summary``); extra sinks receive every completed span, and
+    ``render_prometheus`` exposes the aggregates in the Prometheus text format.
+    """
+
+    def __init__(self, sinks: list[MetricsSink] | None = None) -> None:
+        self.sinks: list[MetricsSink] = list(sinks or [])
+        self.counters: dict[str, dict[LabelKey, float]] = {}
+        self.histograms: dict[str, dict[LabelKey, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1.0, **labels: object) -> None:
+        """Add ``value`` to a counter."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: object) -> None:
+        """Record one histogram observation."""
+        key = _label_key(labels)
+        with self._lock:
+            self.histograms.setdefault(name, {}).setdefault(key, Histogram()).observe(value)
+
+    def record_span(self, name: str, duration: float, labels: dict[str, str]) -> None:
+        """Record a completed span and forward it to the sinks."""
+        self.observe(f"{name}_seconds", duration, **labels)
+        for sink in self.sinks:
+            try:
+                sink.emit_span(name, duration, labels)
+            except Exception as e:
+                logger.debug(f"Metrics sink {type(sink).__name__} failed: {e}")
+
+    @contextmanager
+    def span(self, name: str, **labels: object) -> Iterator[None]:
+        """
+        Time the enclosed block.
+
+        Failed blocks are recorded with ``status='error'`` and the exception re-raised.
+        """
+        str_labels = {label: str(value) for label, value in labels.items()}
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            self.record_span(name, time.perf_counter() - started, {**str_labels, "status": status})
+
+    def reset(self) -> None:
+        """Drop all recorded metrics."""
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def summary(self) -> dict[str, dict]:
+        """
+        Snapshot of all metrics.
+
+        Returns:
+            Dict with 'counters' (name -> label string -> value) and 'histograms'
+            (name -> label string -> count/sum/mean/max)
+        """
+        with self._lock:
+            counters = {
+                name: {_format_labels(key): value for key, value in series.items()}
+                for name, series in self.counters.items()
+            }
+            histograms = {
+                name: {
+                    _format_labels(key): {
+                        "count": hist.count,
+                        "sum": hist.total,
+                        "mean": hist.total / hist.count if hist.count else 0.0,
+                        "max": hist.maximum,
+                    }
+                    for key, hist in series.items()
+                }
+                for name, series in self.histograms.items()
+            }
+        return {"counters": counters, "histograms": histograms}
+
+    def render_prometheus(self, prefix: str = "portfolio_") -> str:
+        """Render counters and histograms in the Prometheus text exposition format."""
+        lines: list[str] = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                metric = f"{prefix}{name}"
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in series.items():
+                    lines.append(f"{metric}{_format_labels(key)} {value:g}")
+            for name, series in sorted(self.histograms.items()):
+                metric = f"{prefix}{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for key, hist in series.items():
+                    cumulative = 0
+                    for bound, bucket_count in zip(
+                        [*map(str, hist.buckets), "+Inf"], hist.counts, strict=True
+                    ):
+                        cumulative += bucket_count
+                        bucket_key = (*key, ("le", bound))
+                        lines.append(f"{metric}_bucket{_format_labels(bucket_key)} {cumulative}")
+                    lines.append(f"{metric}_sum{_format_labels(key)} {hist.total:g}")
+                    lines.append(f"{metric}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(key: LabelKey) -> str:
+    """Format labels as ``{name="value",...}`` (empty string without labels)."""
+    if not key:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"') for _, value in key)
+    pairs = zip(key, escaped, strict=True)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in pairs) + "}"
+
+
+def _configured_sinks() -> list[MetricsSink]:
+    """Build the extra sinks named in METRICS_SINKS (the in-memory registry is always on)."""
+    sinks: list[MetricsSink] = []
+    for name in (part.strip() for part in METRICS_SINKS.split(",")):
+        if name == "json":
+            sinks.append(JsonLogSink())
+        elif name and name != "memory":
+            logger.warning(f"Unknown metrics sink '{name}' ignored")
+    return sinks
+
+
+# Process-wide default registry used by the pipeline and served at the API's /metrics
+registry = MetricsRegistry(_configured_sinks())
+
+
+def span(name: str, **labels: object):
+    """Time a block on the default registry (see MetricsRegistry.span)."""
+    return registry.span(name, **labels)
+
+
+def increment(name: str, value: float = 1.0, **labels: object) -> None:
+    """Increment a counter on the default registry."""
+    registry.increment(name, value, **labels)
+
+
+@contextmanager
+def profiled(output_path: str | Path | None = None, profiler: str = "cprofile") -> Iterator[None]:
+    """
+    Profile the enclosed block.
+
+    Args:
+        output_path: Where to write the profile (.prof stats for cProfile, .html for
+            pyinstrument); when None only a summary is logged
+        profiler: 'cprofile' (standard library) or 'pyinstrument' (optional dependency)
+    """
+    if profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError as e:
+            raise RuntimeError("pyinstrument is not installed (pip install pyinstrument)") from e
+        sampler = Profiler()
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            if output_path is not None:
+                Path(output_path).write_text(sampler.output_html())
+            logger.info("Profile:\n" + sampler.output_text())
+        return
+    if profiler != "cprofile":
+        raise ValueError(f"Unknown profiler: {profiler}")
+
+    tracer = cProfile.Profile()
+    tracer.enable()
+    try:
+        yield
+    finally:
+        tracer.disable()
+        if output_path is not None:
+            tracer.dump_stats(str(output_path))
+            logger.info(f"Profile written to {output_path}")
+        report = io.StringIO()
+        pstats.Stats(tracer, stream=report).sort_stats("cumulative").print_stats(25)
+        logger.info("Profile (top 25 by cumulative time):\n" + report.getvalue())
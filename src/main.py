@@ -2,24 +2,255 @@
 
 from __future__ import annotations
 
+import argparse
+import hashlib
+import json
 import logging
 import sys
+from collections.abc import Callable
+from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
+from src.accuracy import refresh_accuracy
 from src.database import save_results_to_supabase
 from src.extractor import extract_data
-from src.model import ProphetModel
-from src.optimiser import optimize_portfolio_mean_variance
-from src.processor import append_predictions, collect_recent_prices, preprocess_data
-from src.settings import END_DATE, PORTFOLIO_TICKERS, START_DATE
+from src.instrumentation import increment, profiled, registry, span
+from src.model import ProphetModel, horizon_returns
+from src.optimiser import RollingMoments, efficient_frontier, optimize_portfolio_mean_variance
+from src.pipeline import StageTimings, run_streaming_forecast
+from src.processor import (
+    AlignedPanel,
+    append_predictions,
+    collect_recent_prices,
+    preprocess_panel,
+)
+from src.settings import (
+    COVARIANCE_METHOD,
+    END_DATE,
+    FORECAST_HORIZON,
+    FRONTIER_RISK_AVERSIONS,
+    PIPELINE_STREAMING,
+    PORTFOLIO_TICKERS,
+    ROLLING_MOMENTS_PATH,
+    ROLLING_MOMENTS_WINDOW,
+    START_DATE,
+)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 
+def _forecast_portfolio(
+    tickers: list[str],
+    start_date: str,
+    end_date: str,
+    prophet_params: dict | None = None,
+    streaming: bool | None = None,
+    progress: Callable[[str], None] | None = None,
+    horizon: int | None = None,
+) -> dict[str, Any] | None:
+    """
+    Pull data, align it and forecast every ticker (the inputs shared by all optimisations).
+
+    Args:
+        tickers: List of stock ticker symbols
+        start_date: Start date for historical data
+        end_date: End date for historical data
+        prophet_params: Optional override for Prophet params (seasonality)
+        streaming: Overlap downloads and forecasting with the streaming pipeline
+            (defaults to PIPELINE_STREAMING); tickers are then forecast on their own
+            history and aligned afterwards
+        progress: Optional callback receiving the name of each stage as it starts
+        horizon: Trading days to forecast (defaults to FORECAST_HORIZON); above 1 every
+            ticker is fitted once and all steps are overlaid for the optimiser
+
+    Returns:
+        Dict with predictions, predicted_returns (next trading day),
+        actual_prices_last_month, portfolio_data (AlignedPanel of the history),
+        predicted_data (AugmentedPanel overlaying the prediction rows), forecast_horizon
+        (per-ticker predict_horizon frames, None for next-day runs), closes (extracted
+        close series per ticker) and timings (StageTimings), or None if no data
+    """
+    streaming = PIPELINE_STREAMING if streaming is None else streaming
+    progress = progress or (lambda stage: None)
+    horizon = FORECAST_HORIZON if horizon is None else horizon
+    if streaming and horizon > 1:
+        logger.info("Multi-day horizons are forecast after extraction (streaming disabled)")
+        streaming = False
+    forecasts = None
+
+    if streaming:
+        # -- Extraction and forecasting overlap; barrier before alignment --
+        logger.info("Extracting and forecasting (streaming)...")
+        progress("extract")
+        streamed = run_streaming_forecast(
+            tickers, start_date, end_date, prophet_params=prophet_params
+        )
+        timings = streamed.timings
+        extracted = sum(report.success for report in streamed.reports.values())
+        increment("tickers_extracted_total", extracted, outcome="ok")
+        increment("tickers_extracted_total", len(tickers) - extracted, outcome="failed")
+        if not streamed.all_stock_data:
+            logger.warning("No data extracted. Exiting.")
+            return None
+        progress("preprocess")
+        with timings.time("preprocess"):
+            portfolio_data = preprocess_panel(streamed.all_stock_data)
+        predictions = streamed.predictions
+        predicted_returns = streamed.predicted_returns
+        all_stock_data = streamed.all_stock_data
+    else:
+        timings = StageTimings()
+        # -- Data Extraction & Prep --
+        progress("extract")
+        with timings.time("extract"):
+            all_stock_data = extract_data(tickers, start_date=start_date, end_date=end_date)
+        increment("tickers_extracted_total", len(all_stock_data), outcome="ok")
+        increment("tickers_extracted_total", len(tickers) - len(all_stock_data), outcome="failed")
+        if not all_stock_data:
+            logger.warning("No data extracted. Exiting.")
+            return None
+
+        progress("preprocess")
+        with timings.time("preprocess"):
+            portfolio_data = preprocess_panel(all_stock_data)
+
+        # -- Forecasting (Prophet) --
+        logger.info("Generating price forecasts...")
+        progress("forecast")
+        model = ProphetModel()
+        with timings.time("forecast"):
+            if horizon > 1:
+                forecasts = model.predict_horizon_for_tickers(
+                    portfolio_data, horizon, prophet_params=prophet_params
+                )
+            else:
+                predictions, predicted_returns = model.predict_for_tickers(
+                    portfolio_data,
+                    prophet_params=prophet_params
+                )
+
+    # Capture recent history for context
+    actual_prices_last_month = collect_recent_prices(portfolio_data)
+
+    # Merge predictions for the optimizer
+    if forecasts is not None:
+        step_returns = {
+            ticker: horizon_returns(portfolio_data.price_series(ticker), forecast)
+            for ticker, forecast in forecasts.items()
+        }
+        predictions = {
+            ticker: float(forecast["predicted_price"].iloc[0])
+            for ticker, forecast in forecasts.items()
+        }
+        predicted_returns = {ticker: float(returns[0]) for ticker, returns in step_returns.items()}
+        predicted_data = portfolio_data.with_horizon_overlay(forecasts, step_returns)
+    else:
+        predicted_data = append_predictions(portfolio_data, predictions, predicted_returns)
+
+    return {
+        "predictions": predictions,
+        "predicted_returns": predicted_returns,
+        "actual_prices_last_month": actual_prices_last_month,
+        "portfolio_data": portfolio_data,
+        "predicted_data": predicted_data,
+        "forecast_horizon": forecasts,
+        "closes": {ticker: df["Price"] for ticker, df in all_stock_data.items()},
+        "timings": timings,
+    }
+
+
+def rolling_moments_path(path: str | Path, tickers: list[str], window: int) -> Path:
+    """
+    State file for one ticker set and window, next to ``path``.
+
+    Runs over other portfolios or windows keep their own state instead of
+    rebuilding (and overwriting) a shared one.
+    """
+    path = Path(path)
+    digest = hashlib.sha1(",".join(tickers).encode()).hexdigest()[:12]
+    return path.with_name(f"{path.stem}-{digest}-w{window}{path.suffix or '.npz'}")
+
+
+def _rolling_moments_with_prediction(
+    portfolio_data: AlignedPanel,
+    prediction_rows: np.ndarray,
+    path: str,
+    window: int = ROLLING_MOMENTS_WINDOW,
+) -> RollingMoments | None:
+    """
+    Advance the persisted rolling window with the new trading days and add the prediction rows.
+
+    The stored window only receives real returns (and is saved again); the predicted
+    rows are appended to a copy, so tomorrow's run starts from actual data. The
+    window must end on the panel's last day: a state that runs past it (a run with
+    an earlier end date) or cannot be advanced to it is rebuilt from the panel, and
+    only states that moved forward are saved.
+
+    The window drops incomplete rows, so it only matches the panel statistics when
+    every cell is valid and the panel (from the run's start date) fills the window;
+    otherwise None is returned and the panel should be used directly.
+
+    Args:
+        portfolio_data: Aligned price/returns history
+        prediction_rows: Predicted returns in portfolio_data.tickers order, one row per
+            forecast step
+        path: Base path of the persisted RollingMoments states (see rolling_moments_path)
+        window: Trading days in the window
+
+    Returns:
+        RollingMoments including the prediction rows, ready for the optimiser, or None
+        for masked (union-aligned) panels and panels shorter than the window
+    """
+    tickers = list(portfolio_data.tickers)
+    returns_df = portfolio_data.returns_frame()
+    complete = returns_df.dropna()
+    if portfolio_data.is_masked or len(complete) < window:
+        logger.info("Panel is masked or shorter than the rolling window, not using stored state")
+        return None
+    panel_last = pd.Timestamp(complete.index[-1])
+    state_path = rolling_moments_path(path, tickers, window)
+
+    moments = None
+    if state_path.exists():
+        try:
+            moments = RollingMoments.load(state_path)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable rolling moments state: {e}")
+    if moments is not None and (moments.tickers != tickers or moments.window != window):
+        logger.info("Ticker set or window changed, rebuilding rolling moments state")
+        moments = None
+
+    save = True
+    if moments is not None:
+        stored_last = pd.Timestamp(moments.last_date)
+        if stored_last > panel_last:
+            # Later data than this run may see (lookahead): rebuild, keep the stored state
+            logger.info(f"Rolling moments state ends after {panel_last.date()}, rebuilding")
+            moments, save = None, False
+        else:
+            appended = moments.update(returns_df)
+            logger.info(f"Rolling moments: appended {appended} new trading day(s)")
+            if pd.Timestamp(moments.last_date) != panel_last:
+                logger.info("Rolling moments state does not reach the panel, rebuilding")
+                moments = None
+
+    if moments is None:
+        moments = RollingMoments.from_returns(returns_df, window)
+    if save:
+        moments.save(state_path)
+
+    rows = np.atleast_2d(prediction_rows)
+    predicted = moments.with_row(rows[0])
+    for row in rows[1:]:
+        predicted.add_row(row)
+    return predicted
+
+
 def run_optimisation(
     tickers: list[str],
     start_date: str = START_DATE,
@@ -28,6 +259,10 @@ def run_optimisation(
     min_allocation: float | None = None,
     max_allocation: float | None = None,
     prophet_params: dict | None = None,
+    streaming: bool | None = None,
+    progress: Callable[[str], None] | None = None,
+    horizon: int | None = None,
+    covariance_method: str | None = None,
 ) -> dict[str, Any]:
     """
     Run portfolio optimisation: pull data, predict, calculate allocation, and log result.
@@ -40,6 +275,12 @@ def run_optimisation(
         min_allocation: Optional override for min allocation
         max_allocation: Optional override for max allocation
         prophet_params: Optional override for Prophet params (seasonality)
+        streaming: Use the streaming extract/forecast pipeline (defaults to PIPELINE_STREAMING)
+        progress: Optional callback receiving the name of each stage as it starts
+        horizon: Trading days forecast and fed to the optimiser (defaults to FORECAST_HORIZON)
+        covariance_method: Covariance estimator (defaults to COVARIANCE_METHOD); the
+            persisted rolling window (ROLLING_MOMENTS_PATH) is only used for 'sample',
+            on fully valid panels at least ROLLING_MOMENTS_WINDOW days long
     """
 
     as_of_date = pd.to_datetime(end_date).date()
@@ -50,27 +291,16 @@ def run_optimisation(
     if min_allocation: logger.info(f"Override: Min Allocation = {min_allocation}")
     if prophet_params: logger.info(f"Override: Prophet Params = {prophet_params}")
 
-    # -- Data Extraction & Prep --
-    all_stock_data = extract_data(tickers, start_date=start_date, end_date=end_date)
-    if not all_stock_data:
-        logger.warning("No data extracted. Exiting.")
-        return {}
-
-    portfolio_data = preprocess_data(all_stock_data)
-
-    # -- Forecasting (Prophet) --
-    logger.info("Generating price forecasts...")
-    model = ProphetModel()
-    predictions, predicted_returns = model.predict_for_tickers(
-        portfolio_data,
-        prophet_params=prophet_params
+    forecast = _forecast_portfolio(
+        tickers, start_date, end_date, prophet_params, streaming, progress, horizon
     )
-
-    # Capture recent history for context
-    actual_prices_last_month = collect_recent_prices(portfolio_data)
-
-    # Merge predictions for the optimizer
-    predicted_data = append_predictions(portfolio_data, predictions, predicted_returns)
+    if forecast is None:
+        return {}
+    timings = forecast["timings"]
+    predictions = forecast["predictions"]
+    predicted_returns = forecast["predicted_returns"]
+    actual_prices_last_month = forecast["actual_prices_last_month"]
+    predicted_data = forecast["predicted_data"]
 
     # -- Optimization (Markowitz) --
     logger.info("Calculating optimal weights...")
@@ -80,7 +310,21 @@ def run_optimisation(
     if min_allocation is not None: opt_kwargs['minimum_allocation'] = min_allocation
     if max_allocation is not None: opt_kwargs['maximum_allocation'] = max_allocation
 
-    weights_dict = optimize_portfolio_mean_variance(predicted_data, **opt_kwargs)
+    covariance_method = covariance_method or COVARIANCE_METHOD
+    opt_kwargs['covariance_method'] = covariance_method
+
+    optimiser_input = predicted_data
+    if ROLLING_MOMENTS_PATH and covariance_method == "sample":
+        moments = _rolling_moments_with_prediction(
+            forecast["portfolio_data"], predicted_data.overlay_returns, ROLLING_MOMENTS_PATH
+        )
+        if moments is not None:
+            optimiser_input = moments
+
+    if progress is not None:
+        progress("optimise")
+    with timings.time("optimise"):
+        weights_dict = optimize_portfolio_mean_variance(optimiser_input, **opt_kwargs)
 
     # -- Reporting --
     logger.info("--- Results ---")
@@ -95,31 +339,172 @@ def run_optimisation(
         if weight > 0.001: # Only log meaningful weights
             logger.info(f"  {ticker:<5} {weight * 100:.1f}%")
 
-    return {
+    logger.info("Stage timings:\n" + timings.summary())
+
+    result = {
         "date": as_of_date,
         "predictions": predictions,
         "predicted_returns": predicted_returns,
         "actual_prices_last_month": actual_prices_last_month,
         "weights": weights_dict,
+        # Stored once per run alongside the per-ticker rows
+        "parameters": {
+            "tickers": list(tickers),
+            "start_date": start_date,
+            "end_date": end_date,
+            "risk_aversion": risk_aversion,
+            "min_allocation": min_allocation,
+            "max_allocation": max_allocation,
+            "prophet_params": prophet_params,
+            "horizon": horizon,
+            "covariance_method": covariance_method,
+        },
+        # Extracted closes, used to score past predictions (not stored with the result)
+        "closes": forecast["closes"],
     }
+    if forecast["forecast_horizon"] is not None:
+        result["forecast_horizon"] = {
+            ticker: [
+                {
+                    "date": day.date(),
+                    "predicted_price": float(row.predicted_price),
+                    "lower": float(row.lower),
+                    "upper": float(row.upper),
+                }
+                for day, row in frame.iterrows()
+            ]
+            for ticker, frame in forecast["forecast_horizon"].items()
+        }
+    return result
 
 
-def main() -> None:
-    """Main CLI entry point - saves results to Supabase."""
+def run_efficient_frontier(
+    tickers: list[str],
+    start_date: str = START_DATE,
+    end_date: str = END_DATE,
+    risk_aversions: list[float] | None = None,
+    min_allocation: float | None = None,
+    max_allocation: float | None = None,
+    prophet_params: dict | None = None,
+    horizon: int | None = None,
+    progress: Callable[[str], None] | None = None,
+) -> dict[str, Any]:
+    """
+    Forecast once and compute the efficient frontier over a grid of risk-aversion values.
+
+    Args:
+        tickers: List of stock ticker symbols
+        start_date: Start date for historical data
+        end_date: End date for historical data
+        risk_aversions: Risk-aversion grid (defaults to FRONTIER_RISK_AVERSIONS)
+        min_allocation: Optional override for min allocation
+        max_allocation: Optional override for max allocation
+        prophet_params: Optional override for Prophet params (seasonality)
+        horizon: Trading days forecast and fed to the optimiser (defaults to FORECAST_HORIZON)
+        progress: Optional callback receiving the name of each stage as it starts
+    """
+    as_of_date = pd.to_datetime(end_date).date()
+    risk_aversions = risk_aversions or FRONTIER_RISK_AVERSIONS
+    logger.info(
+        f"Computing efficient frontier ({len(risk_aversions)} points) for "
+        f"{len(tickers)} tickers as of {as_of_date}"
+    )
+
+    forecast = _forecast_portfolio(
+        tickers, start_date, end_date, prophet_params, progress=progress, horizon=horizon
+    )
+    if forecast is None:
+        return {}
+
+    opt_kwargs = {}
+    if min_allocation is not None:
+        opt_kwargs['minimum_allocation'] = min_allocation
+    if max_allocation is not None:
+        opt_kwargs['maximum_allocation'] = max_allocation
+
+    if progress is not None:
+        progress("optimise")
+    frontier = efficient_frontier(forecast["predicted_data"], risk_aversions, **opt_kwargs)
+
+    return {
+        "date": as_of_date,
+        "predictions": forecast["predictions"],
+        "predicted_returns": forecast["predicted_returns"],
+        "frontier": frontier,
+    }
+
+
+def score_past_predictions(result: dict[str, Any]) -> int:
+    """
+    Score stored predictions against the closes a run extracted (see src.accuracy).
+
+    Called after a run is saved; failures are logged and never fail the run.
+
+    Returns:
+        Number of scores written
+    """
     try:
-        result = run_optimisation(tickers=PORTFOLIO_TICKERS)
+        with span("accuracy"):
+            scored = refresh_accuracy(prices=result.get("closes", {}))
+    except Exception as e:
+        logger.warning(f"Failed to refresh accuracy scores: {e}")
+        return 0
+    logger.info(f"Scored {scored} past predictions")
+    return scored
 
-        if not result:
-            logger.error("Optimisation returned empty result")
-            sys.exit(1)
 
-        try:
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse CLI flags for a single optimisation run."""
+    parser = argparse.ArgumentParser(description="Run the daily portfolio optimisation.")
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        default=None,
+        help="overlap downloads with forecasting (default: PIPELINE_STREAMING)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="profile the run and write the output to PATH (.prof for cProfile)",
+    )
+    parser.add_argument(
+        "--profiler",
+        choices=["cprofile", "pyinstrument"],
+        default="cprofile",
+        help="profiler used with --profile (pyinstrument must be installed)",
+    )
+    return parser.parse_args(argv)
+
+
+def _run_and_save(streaming: bool | None) -> None:
+    """Run the optimisation for the configured portfolio and persist the result."""
+    result = run_optimisation(tickers=PORTFOLIO_TICKERS, streaming=streaming)
+
+    if not result:
+        logger.error("Optimisation returned empty result")
+        sys.exit(1)
+
+    try:
+        with span("save"):
             save_results_to_supabase(result)
-            print("\nResults successfully saved to Supabase database")
-        except Exception as db_error:
-            logger.error(f"Failed to save to Supabase: {db_error}")
-            print(f"\nWarning: Failed to save to Supabase: {db_error}")
-            sys.exit(1)
+        print("\nResults successfully saved to Supabase database")
+    except Exception as db_error:
+        logger.error(f"Failed to save to Supabase: {db_error}")
+        print(f"\nWarning: Failed to save to Supabase: {db_error}")
+        sys.exit(1)
+
+    score_past_predictions(result)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Main CLI entry point - saves results to Supabase."""
+    args = _parse_args(argv)
+    try:
+        if args.profile:
+            with profiled(args.profile, profiler=args.profiler):
+                _run_and_save(args.streaming)
+        else:
+            _run_and_save(args.streaming)
 
     except Exception as e:
         logger.error(f"Error during optimisation: {e}")
@@ -128,6 +513,8 @@ def main() -> None:
 
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        logger.info("Metrics summary: " + json.dumps(registry.summary()))
 
 
 if __name__ == "__main__":
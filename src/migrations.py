@@ -0,0 +1,179 @@
+"""
+Schema migrations for the results database (SQLite and PostgreSQL).
+
+Usage:
+    python -m src.migrations  # upgrades DATABASE_URL to the latest version
+
+Each migration is idempotent and inspects the live schema before changing it,
+so databases created by older versions (via ``create_all``) and fresh ones end
+up identical. Applied versions are recorded in the ``schema_migrations`` table.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Engine, Integer, MetaData, Table, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+
+from src.database import (
+    Base,
+    ForecastPoint,
+    OptimizationResult,
+    OptimizationRun,
+    PredictionAccuracy,
+)
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL advisory lock key held while migrating (arbitrary, unique to this app)
+_LOCK_KEY = 0x50524F50
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def _create_tables(connection: Connection) -> None:
+    """Create every missing table (new databases get the full current schema)."""
+    Base.metadata.create_all(bind=connection)
+
+
+def _add_run_ids(connection: Connection) -> None:
+    """Add the run_id column to result tables created before runs were recorded."""
+    for model in (OptimizationResult, ForecastPoint):
+        table = model.__tablename__
+        columns = {column["name"] for column in inspect(connection).get_columns(table)}
+        if "run_id" not in columns:
+            connection.execute(
+                text(
+                    f"ALTER TABLE {table} ADD COLUMN run_id VARCHAR "
+                    f"REFERENCES {OptimizationRun.__tablename__} (run_id)"
+                )
+            )
+
+
+def _create_indexes(connection: Connection) -> None:
+    """Create the lookup indexes missing from tables created by older versions."""
+    for model in (OptimizationRun, OptimizationResult, ForecastPoint):
+        for index in model.__table__.indexes:
+            index.create(bind=connection, checkfirst=True)
+
+
+def _price_history_to_jsonb(connection: Connection) -> None:
+    """Convert the price history column from JSON text to JSONB (PostgreSQL only)."""
+    if connection.dialect.name != "postgresql":
+        # SQLite stores JSON as text either way; the column type decodes it on read
+        return
+    table = OptimizationResult.__tablename__
+    column = next(
+        column
+        for column in inspect(connection).get_columns(table)
+        if column["name"] == "actual_prices_last_month"
+    )
+    if column["type"].__class__.__name__.upper() != "JSONB":
+        connection.execute(
+            text(
+                f"ALTER TABLE {table} ALTER COLUMN actual_prices_last_month TYPE JSONB "
+                "USING actual_prices_last_month::jsonb"
+            )
+        )
+
+
+def _create_accuracy_table(connection: Connection) -> None:
+    """Create the prediction accuracy table and its index."""
+    PredictionAccuracy.__table__.create(bind=connection, checkfirst=True)
+    for index in PredictionAccuracy.__table__.indexes:
+        index.create(bind=connection, checkfirst=True)
+
+
+# Ordered (version, migration) pairs; append new migrations with the next version
+MIGRATIONS: list[tuple[int, Callable[[Connection], None]]] = [
+    (1, _create_tables),
+    (2, _add_run_ids),
+    (3, _create_indexes),
+    (4, _price_history_to_jsonb),
+    (5, _create_accuracy_table),
+]
+
+
+def _lock(connection: Connection) -> None:
+    """
+    Serialise concurrent upgrades until the transaction ends (PostgreSQL only).
+
+    SQLite allows one writer at a time, so a racing upgrade fails on the version
+    insert instead and is handled by ``upgrade``.
+    """
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+
+
+def _is_applied(connection: Connection, version: int) -> bool:
+    """Whether ``version`` is recorded in the schema_migrations table."""
+    query = select(schema_migrations.c.version).where(schema_migrations.c.version == version)
+    return connection.execute(query).first() is not None
+
+
+def current_version(engine: Engine) -> int:
+    """Return the latest applied migration version (0 for an unmanaged database)."""
+    with engine.connect() as connection:
+        if not inspect(connection).has_table(schema_migrations.name):
+            return 0
+        versions = connection.execute(select(schema_migrations.c.version)).scalars().all()
+    return max(versions, default=0)
+
+
+def upgrade(engine: Engine) -> list[int]:
+    """
+    Apply pending migrations, each in one transaction with its version record.
+
+    Safe to run from several processes at once (e.g. API workers starting
+    together): on PostgreSQL each transaction first takes an advisory lock and
+    re-checks the version; elsewhere a version recorded concurrently by another
+    process is detected by its primary key and skipped.
+
+    Args:
+        engine: Engine of the results database
+
+    Returns:
+        Versions applied by this call
+    """
+    with engine.begin() as connection:
+        _lock(connection)
+        _metadata.create_all(bind=connection)
+    applied = []
+    for version, migration in MIGRATIONS:
+        try:
+            with engine.begin() as connection:
+                _lock(connection)
+                if _is_applied(connection, version):
+                    continue
+                logger.info(f"Applying migration {version}: {migration.__doc__.splitlines()[0]}")
+                migration(connection)
+                connection.execute(
+                    schema_migrations.insert().values(version=version, applied_at=datetime.now())
+                )
+        except IntegrityError:
+            # Re-read the versions: only a concurrent record of this one is expected
+            with engine.connect() as connection:
+                if not _is_applied(connection, version):
+                    raise
+            logger.info(f"Migration {version} was applied by another process")
+            continue
+        applied.append(version)
+    return applied
+
+
+if __name__ == "__main__":
+    from src.database import get_db_engine
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    applied = upgrade(get_db_engine())
+    print(f"Applied migrations: {applied}" if applied else "Database is up to date")
@@ -2,14 +2,33 @@
 
 from __future__ import annotations
 
+import json
 import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
+from itertools import repeat
+from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import pandas_market_calendars as mcal
 from prophet import Prophet
 
-from .settings import HOLIDAY_NAME_MAP, PROPHET_PARAMS
+from .forecast_cache import ForecastCache, default_forecast_cache
+from .instrumentation import increment, span
+from .model_store import ModelStore, series_fingerprint, warm_start_params
+from .processor import AlignedPanel
+from .settings import (
+    FORECAST_CACHE_ENABLED,
+    FORECAST_HORIZON,
+    FORECAST_MAX_WORKERS,
+    HOLIDAY_NAME_MAP,
+    HOLIDAY_TABLE_PATH,
+    MODEL_REUSE_IF_UNCHANGED,
+    MODEL_STORE_DIR,
+    PROPHET_PARAMS,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -26,24 +45,36 @@ def _normalise_holiday_name(name: str) -> str:
     return cleaned.strip("_")
 
 
-def _get_us_trading_holidays(start_year: int = 2020, end_year: int = 2030) -> pd.DataFrame:
+_HOLIDAY_COLUMNS = ["holiday", "ds", "lower_window", "upper_window"]
+
+# Process-wide holiday tables keyed by (calendar, start_year, end_year)
+_HOLIDAY_CACHE: dict[tuple[str, int, int], pd.DataFrame] = {}
+# Precomputed holiday tables keyed by calendar, with the (start_year, end_year) they cover
+_PRECOMPUTED_HOLIDAYS: dict[str, tuple[int, int, pd.DataFrame]] = {}
+_HOLIDAY_CACHE_LOCK = threading.Lock()
+
+
+def calendar_for_ticker(ticker: str) -> str:
+    """Return the exchange calendar code for a ticker symbol (NSE for '.NS', otherwise NYSE)."""
+    return "XNSE" if ticker.upper().endswith(".NS") else "XNYS"
+
+
+def _build_trading_holidays(calendar_name: str, start_year: int, end_year: int) -> pd.DataFrame:
     """
-    Fetch US trading holidays using the official exchange calendar.
+    Expand the holiday rules of an exchange calendar into a Prophet holidays table.
 
     Args:
+        calendar_name: pandas_market_calendars code (e.g. 'XNYS', 'XNSE')
         start_year: Start year for holiday list.
         end_year: End year for holiday list.
 
     Returns:
         DataFrame with columns: holiday, ds, lower_window, upper_window.
     """
-    if end_year < start_year:
-        raise ValueError("end_year must be greater than or equal to start_year")
-
     start = pd.Timestamp(date(start_year, 1, 1))
     end = pd.Timestamp(date(end_year, 12, 31))
 
-    calendar = mcal.get_calendar("XNYS")
+    calendar = mcal.get_calendar(calendar_name)
     holidays: list[dict[str, pd.Timestamp]] = []
     seen: set[tuple[str, pd.Timestamp]] = set()
 
@@ -75,11 +106,11 @@ def _get_us_trading_holidays(start_year: int = 2020, end_year: int = 2030) -> pd
         holidays.append({"holiday": "adhoc_holiday", "ds": timestamp})
 
     if not holidays:
-        return pd.DataFrame(columns=["holiday", "ds", "lower_window", "upper_window"])
+        return pd.DataFrame(columns=_HOLIDAY_COLUMNS)
 
     holidays_df = pd.DataFrame(holidays).drop_duplicates(subset=["holiday", "ds"])
     if holidays_df.empty:
-        return pd.DataFrame(columns=["holiday", "ds", "lower_window", "upper_window"])
+        return pd.DataFrame(columns=_HOLIDAY_COLUMNS)
     holidays_df = holidays_df.sort_values("ds").reset_index(drop=True)
     holidays_df["ds"] = pd.to_datetime(holidays_df["ds"])
     holidays_df["lower_window"] = -1
@@ -88,20 +119,218 @@ def _get_us_trading_holidays(start_year: int = 2020, end_year: int = 2030) -> pd
     return holidays_df
 
 
+def get_trading_holidays(
+    calendar_name: str = "XNYS", start_year: int = 2020, end_year: int = 2030
+) -> pd.DataFrame:
+    """
+    Return the trading holidays of an exchange calendar, memoised per process.
+
+    Tables are served from a precomputed table (see load_holiday_table) when it
+    covers the requested years, otherwise built once and cached by
+    (calendar, start_year, end_year). The returned DataFrame is shared between
+    callers and must not be modified in place.
+
+    Args:
+        calendar_name: pandas_market_calendars code (e.g. 'XNYS', 'XNSE')
+        start_year: Start year for holiday list.
+        end_year: End year for holiday list.
+
+    Returns:
+        DataFrame with columns: holiday, ds, lower_window, upper_window.
+    """
+    if end_year < start_year:
+        raise ValueError("end_year must be greater than or equal to start_year")
+
+    key = (calendar_name, start_year, end_year)
+    cached = _HOLIDAY_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    with _HOLIDAY_CACHE_LOCK:
+        cached = _HOLIDAY_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        precomputed = _PRECOMPUTED_HOLIDAYS.get(calendar_name)
+        if precomputed is not None and precomputed[0] <= start_year and end_year <= precomputed[1]:
+            table = precomputed[2]
+            years = table["ds"].dt.year
+            holidays_df = table.loc[(years >= start_year) & (years <= end_year)].reset_index(drop=True)
+        else:
+            with span("holiday_build", calendar=calendar_name):
+                holidays_df = _build_trading_holidays(calendar_name, start_year, end_year)
+
+        _HOLIDAY_CACHE[key] = holidays_df
+        return holidays_df
+
+
+def _get_us_trading_holidays(start_year: int = 2020, end_year: int = 2030) -> pd.DataFrame:
+    """
+    Fetch US trading holidays using the official exchange calendar.
+
+    Args:
+        start_year: Start year for holiday list.
+        end_year: End year for holiday list.
+
+    Returns:
+        DataFrame with columns: holiday, ds, lower_window, upper_window.
+    """
+    return get_trading_holidays("XNYS", start_year, end_year)
+
+
+def trading_days_after(last_date, horizon: int, calendar: str = "XNYS") -> pd.DatetimeIndex:
+    """
+    Return the next ``horizon`` trading days of an exchange after ``last_date``.
+
+    Weekends and the exchange's holidays are skipped.
+
+    Args:
+        last_date: Last observed date (need not be a trading day)
+        horizon: Number of trading days
+        calendar: pandas_market_calendars code (e.g. 'XNYS', 'XNSE')
+
+    Returns:
+        DatetimeIndex of ``horizon`` trading days
+    """
+    if horizon < 1:
+        raise ValueError("horizon must be at least 1")
+    last_day = np.datetime64(pd.Timestamp(last_date).date(), "D")
+    start_year = pd.Timestamp(last_date).year
+    # Twice the horizon in weekdays plus a margin always stays within this many years
+    end_year = start_year + 1 + horizon // 200
+    holidays = get_trading_holidays(calendar, start_year, end_year)["ds"]
+    holiday_days = holidays.to_numpy().astype("datetime64[D]")
+    days = np.busday_offset(
+        last_day, np.arange(1, horizon + 1), roll="backward", holidays=holiday_days
+    )
+    return pd.DatetimeIndex(days.astype("datetime64[ns]"))
+
+
+def save_holiday_table(
+    path: str | Path, calendars: list[str], start_year: int, end_year: int
+) -> None:
+    """
+    Precompute holiday tables for several calendars and persist them as JSON.
+
+    Args:
+        path: Destination JSON file
+        calendars: Calendar codes to include (e.g. ['XNYS', 'XNSE'])
+        start_year: First year covered
+        end_year: Last year covered
+    """
+    payload = {}
+    for calendar_name in calendars:
+        holidays_df = _build_trading_holidays(calendar_name, start_year, end_year)
+        payload[calendar_name] = {
+            "start_year": start_year,
+            "end_year": end_year,
+            "holidays": [
+                {"holiday": row.holiday, "ds": row.ds.strftime("%Y-%m-%d")}
+                for row in holidays_df.itertuples(index=False)
+            ],
+        }
+    Path(path).write_text(json.dumps(payload))
+
+
+def load_holiday_table(path: str | Path) -> None:
+    """
+    Load a precomputed holiday table written by save_holiday_table into the process cache.
+
+    Args:
+        path: JSON file written by save_holiday_table
+    """
+    payload = json.loads(Path(path).read_text())
+    with _HOLIDAY_CACHE_LOCK:
+        for calendar_name, entry in payload.items():
+            holidays_df = pd.DataFrame(entry["holidays"], columns=["holiday", "ds"])
+            holidays_df["ds"] = pd.to_datetime(holidays_df["ds"])
+            holidays_df["lower_window"] = -1
+            holidays_df["upper_window"] = 1
+            _PRECOMPUTED_HOLIDAYS[calendar_name] = (
+                int(entry["start_year"]),
+                int(entry["end_year"]),
+                holidays_df,
+            )
+            # Drop tables built before the precomputed one was available
+            for key in [key for key in _HOLIDAY_CACHE if key[0] == calendar_name]:
+                del _HOLIDAY_CACHE[key]
+    logger.info(f"Loaded precomputed holidays for {', '.join(payload)} from {path}")
+
+
+if HOLIDAY_TABLE_PATH and Path(HOLIDAY_TABLE_PATH).exists():
+    load_holiday_table(HOLIDAY_TABLE_PATH)
+
+
+def _default_model_store() -> ModelStore | None:
+    """Return the configured model store, or None when model persistence is disabled."""
+    return ModelStore(MODEL_STORE_DIR) if MODEL_STORE_DIR else None
+
+
+def effective_params(prophet_params: dict | None, calendar: str) -> dict:
+    """
+    Parameters a forecast actually depends on: PROPHET_PARAMS with overrides applied,
+    plus the holiday calendar. Used to key stored models and cached forecasts.
+    """
+    return {**PROPHET_PARAMS, **(prophet_params or {}), "calendar": calendar}
+
+
 class ProphetModel:
     """Prophet model for forecasting stock prices."""
 
-    def __init__(self) -> None:
-        """Initialise Prophet model."""
-        self.model: Prophet | None = None
+    def __init__(
+        self,
+        store: ModelStore | None = None,
+        reuse_if_unchanged: bool | None = None,
+        forecast_cache: ForecastCache | None = None,
+        cache_forecasts: bool | None = None,
+        use_store: bool = True,
+    ) -> None:
+        """
+        Initialise Prophet model.
 
-    def fit(self, price_series: pd.Series, prophet_params_override: dict | None = None) -> ProphetModel:
+        Args:
+            store: Optional model store for warm starts (defaults to MODEL_STORE_DIR when set)
+            reuse_if_unchanged: Skip fitting when the stored model was fitted on identical data
+                (defaults to MODEL_REUSE_IF_UNCHANGED)
+            forecast_cache: Cache of predicted prices (defaults to the shared process cache)
+            cache_forecasts: Look up and store forecasts in the cache, skipping the fit on a
+                hit (defaults to FORECAST_CACHE_ENABLED)
+            use_store: False disables warm starts and model persistence, even when
+                MODEL_STORE_DIR is set
+        """
+        self.model: Prophet | None = None
+        self.store = None
+        if use_store:
+            self.store = store if store is not None else _default_model_store()
+        self.reuse_if_unchanged = (
+            MODEL_REUSE_IF_UNCHANGED if reuse_if_unchanged is None else reuse_if_unchanged
+        )
+        use_cache = FORECAST_CACHE_ENABLED if cache_forecasts is None else cache_forecasts
+        self.forecast_cache = None
+        if use_cache:
+            self.forecast_cache = (
+                forecast_cache if forecast_cache is not None else default_forecast_cache()
+            )
+
+    def fit(
+        self,
+        price_series: pd.Series,
+        prophet_params_override: dict | None = None,
+        calendar: str | None = None,
+        key: str | None = None,
+    ) -> ProphetModel:
         """
         Fit Prophet model to price series with trading holidays and custom params.
 
+        With a model store and a ``key`` (normally the ticker), the previous fit for
+        the same key and params is used as the Stan initialisation, or reused outright
+        when ``reuse_if_unchanged`` is set and the price series has not changed.
+
         Args:
             price_series: Historical price series with datetime index
             prophet_params_override: Optional dict to override seasonality settings (e.g. {'yearly_seasonality': False})
+            calendar: Exchange calendar for holidays (inferred from the series' 'symbol' attr, default XNYS)
+            key: Optional model store key (e.g. ticker)
 
         Returns:
             Self (ProphetModel instance) for method chaining
@@ -120,11 +349,13 @@ class ProphetModel:
             start_year = pd.to_datetime(start_date).year
             end_year = pd.to_datetime(end_date).year
 
-        # Get holidays and filter to relevant date range
-        holidays = _get_us_trading_holidays(start_year - 1, end_year + 1)
-        holidays = holidays[
-            (holidays["ds"] >= pd.to_datetime(start_date))
-            & (holidays["ds"] <= pd.to_datetime(end_date))
+        # Get cached holidays for the exchange and slice to the relevant date range
+        calendar = calendar or calendar_for_ticker(price_series.attrs.get("symbol", ""))
+        holidays = get_trading_holidays(calendar, start_year - 1, end_year + 1)
+        holiday_dates = holidays["ds"].to_numpy()
+        holidays = holidays.loc[
+            (holiday_dates >= pd.to_datetime(start_date).to_datetime64())
+            & (holiday_dates <= pd.to_datetime(end_date).to_datetime64())
         ]
 
         # Initialise Prophet with holidays and seasonality
@@ -135,6 +366,19 @@ class ProphetModel:
         if prophet_params_override:
             final_params.update(prophet_params_override)
 
+        # Stored models are keyed by ticker, effective params and holiday calendar
+        store_params = effective_params(prophet_params_override, calendar)
+        stored = None
+        fingerprint = None
+        if self.store is not None and key is not None:
+            fingerprint = series_fingerprint(price_series)
+            stored = self.store.load(key, store_params)
+            if stored is not None and self.reuse_if_unchanged and stored[1] == fingerprint:
+                logger.info(f"Reusing stored Prophet model for {key} (data unchanged)")
+                increment("prophet_fits_total", start="reused")
+                self.model = stored[0]
+                return self
+
         if not holidays.empty:
             final_params["holidays"] = holidays
             logger.info(f"Using {len(holidays)} trading holidays for Prophet model")
@@ -142,23 +386,62 @@ class ProphetModel:
             logger.warning("No holidays found for date range, using Prophet without holidays")
 
         self.model = Prophet(**final_params)
-        self.model.fit(df)
+        with span("prophet_fit"):
+            if stored is not None:
+                try:
+                    self.model.fit(df, init=warm_start_params(stored[0]))
+                    increment("prophet_fits_total", start="warm")
+                except Exception as e:
+                    # Parameter shapes change when e.g. a new holiday enters the window
+                    logger.warning(f"Warm start failed for {key} ({e}), fitting from scratch")
+                    self.model = Prophet(**final_params)
+                    self.model.fit(df)
+                    increment("prophet_fits_total", start="cold")
+            else:
+                self.model.fit(df)
+                increment("prophet_fits_total", start="cold")
+
+        if self.store is not None and key is not None and fingerprint is not None:
+            self.store.save(key, store_params, self.model, fingerprint)
 
         return self
 
-    def predict_next(self, price_series: pd.Series, prophet_params: dict | None = None) -> float:
+    def predict_next(
+        self,
+        price_series: pd.Series,
+        prophet_params: dict | None = None,
+        calendar: str | None = None,
+        key: str | None = None,
+    ) -> float:
         """
         Fit model and predict next day's price in one step.
 
+        With a forecast cache, a forecast already made for the same ticker, price
+        series and effective params is returned without fitting (``self.model`` is
+        then left unchanged).
+
         Args:
             price_series: Historical price series including current day
             prophet_params: Optional dict to override seasonality settings
+            calendar: Optional exchange calendar for holidays (see fit)
+            key: Optional model store key (see fit)
 
         Returns:
             Predicted price for next day
         """
-
-        self.fit(price_series, prophet_params_override=prophet_params)
+        cache_key = None
+        if self.forecast_cache is not None:
+            calendar = calendar or calendar_for_ticker(price_series.attrs.get("symbol", ""))
+            cache_key = self.forecast_cache.key(
+                key or price_series.attrs.get("symbol", ""),
+                price_series,
+                effective_params(prophet_params, calendar),
+            )
+            cached = self.forecast_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        self.fit(price_series, prophet_params_override=prophet_params, calendar=calendar, key=key)
 
         # Get the last date from the series
         last_date = price_series.index[-1]
@@ -169,21 +452,134 @@ class ProphetModel:
         # Make prediction
         if self.model is None:
             raise RuntimeError("Model not fitted")
-        forecast = self.model.predict(future)
+        with span("prophet_predict"):
+            forecast = self.model.predict(future)
+
+        predicted_price = float(forecast["yhat"].iloc[0])
+        if cache_key is not None:
+            self.forecast_cache.put(cache_key, predicted_price)
+        return predicted_price
+
+    def predict_horizon(
+        self,
+        price_series: pd.Series,
+        horizon: int = FORECAST_HORIZON,
+        prophet_params: dict | None = None,
+        calendar: str | None = None,
+        key: str | None = None,
+    ) -> pd.DataFrame:
+        """
+        Fit once and forecast the next ``horizon`` trading days in a single predict call.
+
+        Args:
+            price_series: Historical price series including current day
+            horizon: Number of trading days to forecast (weekends and exchange holidays skipped)
+            prophet_params: Optional dict to override seasonality settings
+            calendar: Optional exchange calendar for holidays and trading days (see fit)
+            key: Optional model store key (see fit)
+
+        Returns:
+            DataFrame indexed by trading day with predicted_price, lower and upper
+            (Prophet's uncertainty interval) columns
+        """
+        calendar = calendar or calendar_for_ticker(price_series.attrs.get("symbol", ""))
+        self.fit(price_series, prophet_params_override=prophet_params, calendar=calendar, key=key)
+        if self.model is None:
+            raise RuntimeError("Model not fitted")
+
+        days = trading_days_after(price_series.index[-1], horizon, calendar)
+        with span("prophet_predict"):
+            forecast = self.model.predict(pd.DataFrame({"ds": days}))
+
+        return pd.DataFrame(
+            {
+                "predicted_price": forecast["yhat"].to_numpy(dtype=np.float64),
+                "lower": forecast["yhat_lower"].to_numpy(dtype=np.float64),
+                "upper": forecast["yhat_upper"].to_numpy(dtype=np.float64),
+            },
+            index=pd.Index(days, name="Date"),
+        )
 
-        return float(forecast["yhat"].iloc[0])
+    def predict_horizon_for_tickers(
+        self,
+        portfolio_data: dict[str, pd.DataFrame] | AlignedPanel,
+        horizon: int = FORECAST_HORIZON,
+        prophet_params: dict | None = None,
+        max_workers: int | None = None,
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Multi-day forecasts for multiple tickers (one fit per ticker).
+
+        Args:
+            portfolio_data: Dictionary mapping ticker to DataFrame with 'Price' column, or
+                an AlignedPanel
+            horizon: Number of trading days to forecast
+            prophet_params: Optional dict to override seasonality settings
+            max_workers: Number of worker processes (defaults to FORECAST_MAX_WORKERS, 1 = serial)
+
+        Returns:
+            Dict mapping ticker to its predict_horizon frame, in ``portfolio_data`` order
+        """
+        if isinstance(portfolio_data, AlignedPanel):
+            tickers = list(portfolio_data.tickers)
+            price_series_map = {ticker: portfolio_data.price_series(ticker) for ticker in tickers}
+        else:
+            tickers = list(portfolio_data.keys())
+            price_series_map = {ticker: portfolio_data[ticker]["Price"] for ticker in tickers}
+        calendars = {
+            ticker: calendar_for_ticker(price_series_map[ticker].attrs.get("symbol", ticker))
+            for ticker in tickers
+        }
+        workers = FORECAST_MAX_WORKERS if max_workers is None else max_workers
+        workers = max(1, min(workers, len(tickers)))
+
+        if workers == 1:
+            return {
+                ticker: self.predict_horizon(
+                    price_series_map[ticker],
+                    horizon,
+                    prophet_params=prophet_params,
+                    calendar=calendars[ticker],
+                    key=ticker,
+                )
+                for ticker in tickers
+            }
+
+        logger.info(
+            f"Fitting {len(tickers)} {horizon}-day Prophet forecasts across {workers} processes"
+        )
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                _forecast_ticker_horizon,
+                [price_series_map[ticker] for ticker in tickers],
+                repeat(horizon),
+                repeat(prophet_params),
+                [calendars[ticker] for ticker in tickers],
+                tickers,
+                repeat(self.store),
+                repeat(self.reuse_if_unchanged),
+            )
+            return dict(zip(tickers, results, strict=True))
 
     def predict_for_tickers(
         self,
-        portfolio_data: dict[str, pd.DataFrame],
+        portfolio_data: dict[str, pd.DataFrame] | AlignedPanel,
         prophet_params: dict | None = None,
+        max_workers: int | None = None,
     ) -> tuple[dict[str, float], dict[str, float]]:
         """
         Predict prices and returns for multiple tickers.
 
+        Each ticker gets its own independently fitted Prophet model. With
+        ``max_workers > 1`` the fits run in a process pool; cached forecasts are
+        resolved here first so only misses are dispatched. Results are always
+        returned in the same ticker order as ``portfolio_data``.
+
         Args:
-            portfolio_data: Dictionary mapping ticker to DataFrame with 'Price' column
+            portfolio_data: Dictionary mapping ticker to DataFrame with 'Price' column, or
+                an AlignedPanel (each ticker's series is a view of the panel)
             prophet_params: Optional dict to override seasonality settings
+            max_workers: Number of worker processes (defaults to FORECAST_MAX_WORKERS, 1 = serial)
 
         Returns:
             Tuple containing:
@@ -192,22 +588,156 @@ class ProphetModel:
         """
         predictions: dict[str, float] = {}
         predicted_returns: dict[str, float] = {}
-        current_prices: dict[str, float] = {}
 
-        for ticker in portfolio_data.keys():
-            # Get stock data
-            df_stock = portfolio_data[ticker]
+        if isinstance(portfolio_data, AlignedPanel):
+            tickers = list(portfolio_data.tickers)
+            price_series_map = {ticker: portfolio_data.price_series(ticker) for ticker in tickers}
+        else:
+            tickers = list(portfolio_data.keys())
+            price_series_map = {ticker: portfolio_data[ticker]["Price"] for ticker in tickers}
+        # Holidays follow the exchange of the symbol the data was fetched under (e.g. '.NS')
+        calendars = {
+            ticker: calendar_for_ticker(price_series_map[ticker].attrs.get("symbol", ticker))
+            for ticker in tickers
+        }
+        workers = FORECAST_MAX_WORKERS if max_workers is None else max_workers
+        workers = max(1, min(workers, len(tickers)))
+
+        if workers == 1:
+            for ticker in tickers:
+                # Predict next day price and the implied return from the current price
+                price_series = price_series_map[ticker]
+                predicted_price = self.predict_next(
+                    price_series,
+                    prophet_params=prophet_params,
+                    calendar=calendars[ticker],
+                    key=ticker,
+                )
+                predictions[ticker] = predicted_price
+                predicted_returns[ticker] = _predicted_return(price_series, predicted_price)
+
+            return predictions, predicted_returns
+
+        cached: dict[str, float] = {}
+        cache_keys: dict[str, str] = {}
+        if self.forecast_cache is not None:
+            for ticker in tickers:
+                cache_keys[ticker] = self.forecast_cache.key(
+                    ticker,
+                    price_series_map[ticker],
+                    effective_params(prophet_params, calendars[ticker]),
+                )
+                value = self.forecast_cache.get(cache_keys[ticker])
+                if value is not None:
+                    cached[ticker] = value
+        missing = [ticker for ticker in tickers if ticker not in cached]
+
+        fitted: dict[str, float] = {}
+        if missing:
+            workers = min(workers, len(missing))
+            logger.info(
+                f"Fitting {len(missing)} Prophet models across {workers} worker processes"
+                f" ({len(cached)} cached)"
+            )
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # executor.map yields results in submission order, keeping output deterministic
+                results = executor.map(
+                    _forecast_ticker,
+                    [price_series_map[ticker] for ticker in missing],
+                    repeat(prophet_params),
+                    [calendars[ticker] for ticker in missing],
+                    missing,
+                    repeat(self.store),
+                    repeat(self.reuse_if_unchanged),
+                )
+                for ticker, (predicted_price, _) in zip(missing, results, strict=True):
+                    fitted[ticker] = predicted_price
+                    if ticker in cache_keys:
+                        self.forecast_cache.put(cache_keys[ticker], predicted_price)
+
+        for ticker in tickers:
+            predicted_price = cached[ticker] if ticker in cached else fitted[ticker]
+            predictions[ticker] = predicted_price
+            predicted_returns[ticker] = _predicted_return(price_series_map[ticker], predicted_price)
 
-            # Get current price
-            current_price = df_stock["Price"].iloc[-1]
-            current_prices[ticker] = current_price
+        return predictions, predicted_returns
 
-            # Predict next day price
-            predicted_price = self.predict_next(df_stock["Price"], prophet_params=prophet_params)
-            predictions[ticker] = predicted_price
 
-            # Calculate predicted return
-            daily_return = (predicted_price - current_price) / current_price
-            predicted_returns[ticker] = daily_return
+def _predicted_return(price_series: pd.Series, predicted_price: float) -> float:
+    """Return implied by moving from the last observed price to the predicted price."""
+    current_price = price_series.iloc[-1]
+    return (predicted_price - current_price) / current_price
 
-        return predictions, predicted_returns
+
+def horizon_returns(price_series: pd.Series, forecast: pd.DataFrame) -> np.ndarray:
+    """
+    Daily returns along a multi-day forecast: the first step from the last observed
+    price, each later step from the previous predicted price.
+
+    Args:
+        price_series: Historical price series the forecast was made from
+        forecast: Frame returned by ProphetModel.predict_horizon
+
+    Returns:
+        Array of ``len(forecast)`` daily returns
+    """
+    path = np.concatenate([[float(price_series.iloc[-1])], forecast["predicted_price"].to_numpy()])
+    return path[1:] / path[:-1] - 1.0
+
+
+def _forecast_ticker_horizon(
+    price_series: pd.Series,
+    horizon: int,
+    prophet_params: dict | None = None,
+    calendar: str | None = None,
+    key: str | None = None,
+    store: ModelStore | None = None,
+    reuse_if_unchanged: bool = False,
+) -> pd.DataFrame:
+    """Fit and forecast ``horizon`` trading days of a single ticker (process pool worker)."""
+    # The parent resolved the store already: None means none, not MODEL_STORE_DIR
+    model = ProphetModel(
+        store=store,
+        reuse_if_unchanged=reuse_if_unchanged,
+        cache_forecasts=False,
+        use_store=store is not None,
+    )
+    return model.predict_horizon(
+        price_series, horizon, prophet_params=prophet_params, calendar=calendar, key=key
+    )
+
+
+def _forecast_ticker(
+    price_series: pd.Series,
+    prophet_params: dict | None = None,
+    calendar: str | None = None,
+    key: str | None = None,
+    store: ModelStore | None = None,
+    reuse_if_unchanged: bool = False,
+) -> tuple[float, float]:
+    """
+    Fit and predict a single ticker in isolation (process pool worker).
+
+    Args:
+        price_series: Historical price series for one ticker
+        prophet_params: Optional dict to override seasonality settings
+        calendar: Optional exchange calendar for holidays
+        key: Optional model store key (the ticker)
+        store: Optional model store for warm starts
+        reuse_if_unchanged: Skip fitting when the stored model saw identical data
+
+    Returns:
+        Tuple of (predicted price, predicted return)
+    """
+    # The parent process owns the forecast cache (lookups happen before dispatch) and
+    # resolved the store already: None means none, not MODEL_STORE_DIR
+    model = ProphetModel(
+        store=store,
+        reuse_if_unchanged=reuse_if_unchanged,
+        cache_forecasts=False,
+        use_store=store is not None,
+    )
+    predicted_price = model.predict_next(
+        price_series, prophet_params=prophet_params, calendar=calendar, key=key
+    )
+    return predicted_price, _predicted_return(price_series, predicted_price)
@@ -0,0 +1,135 @@
+"""Persistence of fitted Prophet models for warm starts and refit skipping."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from prophet import Prophet
+from prophet.serialize import model_from_json, model_to_json
+
+logger = logging.getLogger(__name__)
+
+
+def series_fingerprint(price_series: pd.Series) -> str:
+    """
+    Return a stable hash of a price series (index and values).
+
+    Args:
+        price_series: Price series with date index
+
+    Returns:
+        Hex digest identifying the exact data the series contains
+    """
+    hashed = pd.util.hash_pandas_object(price_series, index=True).to_numpy()
+    return hashlib.sha256(hashed.tobytes()).hexdigest()
+
+
+def params_fingerprint(params: dict) -> str:
+    """
+    Return a short stable hash of model parameters.
+
+    Args:
+        params: JSON-serialisable parameter dict (e.g. effective Prophet params)
+
+    Returns:
+        Hex digest of the canonical JSON encoding
+    """
+    encoded = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()[:16]
+
+
+def warm_start_params(model: Prophet) -> dict:
+    """
+    Extract Stan parameters from a fitted model for use as ``Prophet.fit(init=...)``.
+
+    Args:
+        model: Fitted Prophet model
+
+    Returns:
+        Dict with k, m, sigma_obs, delta and beta initial values
+    """
+    params = {}
+    for name in ("k", "m", "sigma_obs"):
+        if model.mcmc_samples == 0:
+            params[name] = model.params[name][0][0]
+        else:
+            params[name] = np.mean(model.params[name])
+    for name in ("delta", "beta"):
+        if model.mcmc_samples == 0:
+            params[name] = model.params[name][0]
+        else:
+            params[name] = np.mean(model.params[name], axis=0)
+    return params
+
+
+class ModelStore:
+    """
+    Local store of fitted Prophet models, one JSON file per (ticker, params).
+
+    Each entry keeps the serialised model together with the fingerprint of the
+    price series it was fitted on.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        """
+        Initialise the store.
+
+        Args:
+            root: Directory holding serialised models
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, ticker: str, params: dict) -> Path:
+        """Return the model file path for a ticker and parameter set."""
+        safe_ticker = "".join(char if char.isalnum() or char in "-_." else "_" for char in ticker)
+        return self.root / f"{safe_ticker}-{params_fingerprint(params)}.json"
+
+    def load(self, ticker: str, params: dict) -> tuple[Prophet, str] | None:
+        """
+        Load a stored model.
+
+        Args:
+            ticker: Ticker symbol
+            params: Parameters the model was fitted with
+
+        Returns:
+            Tuple of (fitted model, data fingerprint) or None if nothing usable is stored
+        """
+        path = self.path_for(ticker, params)
+        if not path.exists():
+            return None
+        try:
+            payload = json.loads(path.read_text())
+            return model_from_json(payload["model"]), payload["fingerprint"]
+        except Exception as e:
+            logger.warning(f"Discarding unreadable stored model for {ticker}: {e}")
+            return None
+
+    def save(self, ticker: str, params: dict, model: Prophet, fingerprint: str) -> None:
+        """
+        Persist a fitted model.
+
+        Args:
+            ticker: Ticker symbol
+            params: Parameters the model was fitted with
+            model: Fitted Prophet model
+            fingerprint: Fingerprint of the price series the model was fitted on
+        """
+        path = self.path_for(ticker, params)
+        payload = json.dumps({"fingerprint": fingerprint, "model": model_to_json(model)})
+        # Unique temp file: concurrent jobs may save the same model at once
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as tmp:
+            tmp_path = Path(tmp.name)
+        try:
+            tmp_path.write_text(payload)
+            tmp_path.replace(path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
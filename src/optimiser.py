@@ -1,16 +1,365 @@
 from __future__ import annotations
 
+import copy
+import tempfile
+from pathlib import Path
+from typing import Any
+
 import numpy as np
 import pandas as pd
 from scipy.optimize import minimize
+from sklearn.covariance import ledoit_wolf
+
+from src.processor import AlignedPanel, AugmentedPanel
+from src.settings import (
+    COVARIANCE_FACTORS,
+    COVARIANCE_METHOD,
+    EWMA_DECAY,
+    MAXIMUM_ALLOCATION,
+    MINIMUM_ALLOCATION,
+    OPTIMISER_SOLVER,
+    RISK_AVERSION,
+)
+
+
+class FactorCovariance:
+    """
+    Low-rank plus diagonal covariance Σ = B Bᵀ + diag(d), kept in factored form.
+
+    ``cov @ w`` is evaluated as B (Bᵀ w) + d ∘ w in O(NK), so the optimiser never
+    materialises the dense N×N matrix.
+    """
+
+    def __init__(
+        self, loadings: np.ndarray, specific_variance: np.ndarray, tickers: list[str]
+    ) -> None:
+        """
+        Initialise the factored covariance.
+
+        Args:
+            loadings: Factor loadings B with shape (N, K)
+            specific_variance: Idiosyncratic variances d with shape (N,)
+            tickers: Asset labels in row order
+        """
+        self.loadings = np.ascontiguousarray(loadings, dtype=np.float64)
+        self.specific_variance = np.ascontiguousarray(specific_variance, dtype=np.float64)
+        self.tickers = list(tickers)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Shape of the equivalent dense matrix."""
+        return (len(self.tickers), len(self.tickers))
+
+    def __matmul__(self, weights: np.ndarray) -> np.ndarray:
+        """Matrix-vector product Σw in O(NK)."""
+        return self.loadings @ (self.loadings.T @ weights) + self.specific_variance * weights
+
+    def reindex(self, tickers: list[str]) -> FactorCovariance:
+        """Return the covariance with rows reordered to ``tickers``."""
+        if tickers == self.tickers:
+            return self
+        positions = [self.tickers.index(ticker) for ticker in tickers]
+        return FactorCovariance(
+            self.loadings[positions], self.specific_variance[positions], tickers
+        )
+
+    def max_eigenvalue(self) -> float:
+        """Upper bound on λ_max(Σ): λ_max(BᵀB) + max(d), computed on the K×K Gram matrix."""
+        gram = self.loadings.T @ self.loadings
+        low_rank = float(np.linalg.eigvalsh(gram)[-1]) if gram.size else 0.0
+        return low_rank + float(np.max(self.specific_variance, initial=0.0))
+
+    def to_dense(self) -> pd.DataFrame:
+        """Materialise the dense covariance matrix (for small universes and inspection)."""
+        dense = self.loadings @ self.loadings.T + np.diag(self.specific_variance)
+        return pd.DataFrame(dense, index=self.tickers, columns=self.tickers)
+
+
+def _ewma_covariance(returns: np.ndarray, decay: float) -> np.ndarray:
+    """Exponentially weighted covariance (RiskMetrics style) of a (T, N) returns array."""
+    num_periods = returns.shape[0]
+    weights = decay ** np.arange(num_periods - 1, -1, -1, dtype=np.float64)
+    weights /= weights.sum()
+    centred = returns - weights @ returns
+    scaled = centred * np.sqrt(weights)[:, None]
+    return scaled.T @ scaled
+
+
+def _factor_covariance(returns: np.ndarray, n_factors: int, tickers: list[str]) -> FactorCovariance:
+    """
+    Statistical (PCA) factor model estimated from a thin SVD of the (T, N) returns.
+
+    The top-K singular vectors give loadings B; the residual variance of each asset
+    becomes its specific variance, floored at a small positive value.
+    """
+    num_periods = returns.shape[0]
+    centred = returns - returns.mean(axis=0)
+    _, singular_values, components = np.linalg.svd(centred, full_matrices=False)
+    n_factors = max(0, min(n_factors, len(singular_values)))
+    loadings = components[:n_factors].T * (singular_values[:n_factors] / np.sqrt(num_periods - 1))
+    total_variance = centred.var(axis=0, ddof=1)
+    specific_variance = total_variance - np.sum(loadings**2, axis=1)
+    floor = 1e-6 * float(np.mean(total_variance)) if total_variance.size else 0.0
+    return FactorCovariance(loadings, np.maximum(specific_variance, floor), tickers)
+
+
+def estimate_covariance(
+    returns_df: pd.DataFrame,
+    method: str = COVARIANCE_METHOD,
+    n_factors: int = COVARIANCE_FACTORS,
+    decay: float = EWMA_DECAY,
+) -> pd.DataFrame | FactorCovariance:
+    """
+    Estimates the covariance of asset returns.
+
+    Args:
+        returns_df: Returns with one column per ticker.
+        method: 'sample', 'ledoit_wolf' (shrinkage), 'ewma' or 'factor' (low-rank + diagonal).
+        n_factors: Number of factors for the 'factor' method.
+        decay: Decay factor for the 'ewma' method.
+
+    Returns:
+        Dense covariance DataFrame, or a FactorCovariance for the 'factor' method.
+    """
+    if method == "sample":
+        return returns_df.cov()
+    if method not in ("ledoit_wolf", "ewma", "factor"):
+        raise ValueError(f"Unknown covariance method: {method}")
+
+    tickers = list(returns_df.columns)
+    returns = returns_df.dropna().to_numpy(dtype=np.float64)
+    if method == "factor":
+        return _factor_covariance(returns, n_factors, tickers)
+    if method == "ledoit_wolf":
+        cov, _ = ledoit_wolf(returns)
+    else:
+        cov = _ewma_covariance(returns, decay)
+    return pd.DataFrame(cov, index=tickers, columns=tickers)
+
+
+def _clip_to_psd(cov: pd.DataFrame) -> pd.DataFrame:
+    """
+    Repair a covariance that is not positive semi-definite by clipping negative eigenvalues.
+
+    Pairwise-complete covariances (from masked panels) can be slightly indefinite.
+    """
+    values = cov.to_numpy(dtype=np.float64)
+    eigenvalues, eigenvectors = np.linalg.eigh(values)
+    if eigenvalues[0] >= 0:
+        return cov
+    repaired = (eigenvectors * np.maximum(eigenvalues, 0.0)) @ eigenvectors.T
+    return pd.DataFrame((repaired + repaired.T) / 2, index=cov.index, columns=cov.columns)
+
+
+def _covariance_array(
+    cov: pd.DataFrame | FactorCovariance, tickers: list[str]
+) -> np.ndarray | FactorCovariance:
+    """Convert a covariance estimate into a contiguous array (or factored operator) in ticker order."""
+    if isinstance(cov, FactorCovariance):
+        return cov.reindex(tickers)
+    return np.ascontiguousarray(
+        cov.reindex(index=tickers, columns=tickers).to_numpy(dtype=np.float64)
+    )
+
+
+def _max_eigenvalue(cov: np.ndarray | FactorCovariance) -> float:
+    """Largest eigenvalue of a covariance (upper bound for factored covariances)."""
+    if isinstance(cov, FactorCovariance):
+        return cov.max_eigenvalue()
+    return float(np.linalg.eigvalsh(cov)[-1])
+
+
+class RollingMoments:
+    """
+    Running mean and covariance of daily returns over a fixed trailing window.
+
+    Keeps the window's rows in a ring buffer together with the running sum and
+    cross-product matrix, so appending a day (and dropping the oldest) costs O(N²)
+    instead of recomputing the statistics from a DataFrame of all returns. The
+    state can be saved after each daily run and extended with only the new rows.
+    """
+
+    def __init__(self, tickers: list[str], window: int = 252) -> None:
+        """
+        Initialise an empty window.
+
+        Args:
+            tickers: Asset labels (column order of every row)
+            window: Number of trailing rows kept (default: 252)
+        """
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        self.tickers = list(tickers)
+        self.window = window
+        num_assets = len(self.tickers)
+        self._rows = np.zeros((window, num_assets))
+        self._dates: list[Any] = [None] * window
+        self._start = 0
+        self._count = 0
+        self._sum = np.zeros(num_assets)
+        self._cross = np.zeros((num_assets, num_assets))
+        self._updates_since_rebuild = 0
+
+    @classmethod
+    def from_returns(cls, returns_df: pd.DataFrame, window: int = 252) -> RollingMoments:
+        """
+        Build the state from a returns DataFrame (one column per ticker, date index).
+
+        Args:
+            returns_df: Daily returns; only the last ``window`` rows are kept
+            window: Number of trailing rows kept
+
+        Returns:
+            Populated RollingMoments
+        """
+        moments = cls(list(returns_df.columns), window)
+        moments.update(returns_df)
+        return moments
+
+    def __len__(self) -> int:
+        """Number of rows currently in the window."""
+        return self._count
+
+    @property
+    def last_date(self) -> Any:
+        """Date label of the most recent row (None when empty)."""
+        if self._count == 0:
+            return None
+        return self._dates[(self._start + self._count - 1) % self.window]
+
+    def add_row(self, row: np.ndarray, row_date: Any = None) -> None:
+        """
+        Append one day of returns, dropping the oldest row when the window is full.
+
+        Args:
+            row: Returns for every ticker, in ``tickers`` order
+            row_date: Optional date label of the row
+        """
+        row = np.asarray(row, dtype=np.float64)
+        if row.shape != (len(self.tickers),) or not np.all(np.isfinite(row)):
+            raise ValueError("row must contain one finite return per ticker")
+        if self._count == self.window:
+            self.drop_row()
+
+        position = (self._start + self._count) % self.window
+        self._rows[position] = row
+        self._dates[position] = row_date
+        self._count += 1
+        self._sum += row
+        self._cross += np.outer(row, row)
+        self._after_update()
+
+    def drop_row(self) -> None:
+        """Remove the oldest row from the window."""
+        if self._count == 0:
+            raise ValueError("window is empty")
+        row = self._rows[self._start]
+        self._sum -= row
+        self._cross -= np.outer(row, row)
+        self._dates[self._start] = None
+        self._start = (self._start + 1) % self.window
+        self._count -= 1
+        self._after_update()
+
+    def update(self, returns_df: pd.DataFrame) -> int:
+        """
+        Append the rows of ``returns_df`` dated after ``last_date``.
+
+        Args:
+            returns_df: Daily returns with the same ticker columns and a sortable date index
+
+        Returns:
+            Number of rows appended
+        """
+        columns = returns_df[self.tickers]
+        if self.last_date is not None:
+            newer = pd.to_datetime(columns.index) > pd.Timestamp(self.last_date)
+            columns = columns.loc[newer]
+        columns = columns.tail(self.window).dropna()
+        for row_date, row in zip(columns.index, columns.to_numpy(dtype=np.float64), strict=True):
+            self.add_row(row, row_date)
+        return len(columns)
+
+    def with_row(self, row: np.ndarray, row_date: Any = None) -> RollingMoments:
+        """Return a copy with one extra row (e.g. predicted returns) appended."""
+        moments = copy.deepcopy(self)
+        moments.add_row(row, row_date)
+        return moments
+
+    def mean(self) -> pd.Series:
+        """Mean return per ticker over the window."""
+        if self._count == 0:
+            raise ValueError("window is empty")
+        return pd.Series(self._sum / self._count, index=self.tickers)
+
+    def covariance(self) -> pd.DataFrame:
+        """Sample covariance (ddof=1) over the window."""
+        if self._count < 2:
+            raise ValueError("at least two rows are needed for a covariance")
+        mean = self._sum / self._count
+        cov = (self._cross - self._count * np.outer(mean, mean)) / (self._count - 1)
+        return pd.DataFrame(cov, index=self.tickers, columns=self.tickers)
+
+    def mean_variance(self) -> tuple[pd.Series, pd.DataFrame]:
+        """(mean_returns, cov_matrix) tuple, as returned by calculate_mean_variance."""
+        return self.mean(), self.covariance()
+
+    def save(self, path: str | Path) -> None:
+        """
+        Persist the window (rows in chronological order) to an .npz file.
+
+        The file is replaced atomically, so concurrent runs never read a partial state.
+        """
+        path = Path(path)
+        order = [(self._start + offset) % self.window for offset in range(self._count)]
+        dates = np.array([str(self._dates[position]) for position in order], dtype=str)
+        # Unique temp file: concurrent runs may save the same state at once
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as tmp:
+            tmp_path = Path(tmp.name)
+        try:
+            with open(tmp_path, "wb") as handle:
+                np.savez(
+                    handle,
+                    tickers=np.array(self.tickers, dtype=str),
+                    window=np.array(self.window),
+                    rows=self._rows[order],
+                    dates=dates,
+                )
+            tmp_path.replace(path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, path: str | Path) -> RollingMoments:
+        """Load a window saved with ``save`` (dates come back as datetime.date)."""
+        with np.load(path) as data:
+            moments = cls([str(ticker) for ticker in data["tickers"]], int(data["window"]))
+            for row, row_date in zip(data["rows"], data["dates"], strict=True):
+                moments.add_row(row, pd.Timestamp(str(row_date)).date())
+        return moments
 
-from src.settings import MAXIMUM_ALLOCATION, MINIMUM_ALLOCATION, RISK_AVERSION
+    def _after_update(self) -> None:
+        """Periodically rebuild the running sums from the buffer to stop rounding drift."""
+        self._updates_since_rebuild += 1
+        if self._updates_since_rebuild < 4 * self.window:
+            return
+        order = [(self._start + offset) % self.window for offset in range(self._count)]
+        rows = self._rows[order]
+        self._sum = rows.sum(axis=0)
+        self._cross = rows.T @ rows
+        self._updates_since_rebuild = 0
+
+
+# Inputs the mean/covariance can be computed from
+ReturnsSource = dict[str, pd.DataFrame] | AlignedPanel | AugmentedPanel | RollingMoments
 
 
 def calculate_mean_variance(
-    data_dict: dict[str, pd.DataFrame],
+    data_dict: ReturnsSource,
     lookback_days: int = 252,  # ~1 year of trading days
-) -> tuple[pd.Series, pd.DataFrame]:
+    covariance_method: str = COVARIANCE_METHOD,
+) -> tuple[pd.Series, pd.DataFrame | FactorCovariance]:
     """
     Computes the risk/return profile (mean returns & covariance matrix) for the portfolio.
     
@@ -18,12 +367,30 @@ def calculate_mean_variance(
     while smoothing out short-term noise.
 
     Args:
-        data_dict: Map of Ticker -> DataFrame (must contain 'Returns' column).
+        data_dict: Map of Ticker -> DataFrame (must contain 'Returns' column), an
+            AlignedPanel or AugmentedPanel, or a RollingMoments state whose window
+            statistics are returned directly.
         lookback_days: Trading days to include in the calculation (default: 252).
+        covariance_method: Covariance estimator (see estimate_covariance).
 
     Returns:
-        (mean_returns, cov_matrix) tuple for Markowitz optimization.
+        (mean_returns, cov_matrix) tuple for Markowitz optimization. cov_matrix is a
+        FactorCovariance when covariance_method is 'factor'.
     """
+    if isinstance(data_dict, RollingMoments):
+        # Incremental state already holds the trailing window's sums
+        return data_dict.mean_variance()
+
+    if isinstance(data_dict, AlignedPanel | AugmentedPanel):
+        # Only the trailing window is read (a view of the history, plus the overlay row);
+        # masked cells are NaN, so means use each ticker's valid rows and the sample
+        # covariance is pairwise
+        returns_df = data_dict.returns_frame(lookback_days)
+        cov_matrix = estimate_covariance(returns_df, method=covariance_method)
+        if data_dict.is_masked and isinstance(cov_matrix, pd.DataFrame):
+            cov_matrix = _clip_to_psd(cov_matrix)
+        return returns_df.mean(), cov_matrix
+
     # For each ticker, take the last N days
     filtered_data = {}
     for ticker, df in data_dict.items():
@@ -40,53 +407,257 @@ def calculate_mean_variance(
     returns_df = pd.DataFrame({ticker: df["Returns"] for ticker, df in filtered_data.items()})
 
     mean_returns = returns_df.mean()
-    cov_matrix = returns_df.cov()
+    cov_matrix = estimate_covariance(returns_df, method=covariance_method)
 
     return mean_returns, cov_matrix
 
 
+def _mean_variance_objective(
+    weights: np.ndarray,
+    mu: np.ndarray,
+    cov: np.ndarray | FactorCovariance,
+    risk_aversion: float,
+) -> tuple[float, np.ndarray]:
+    """
+    Negative mean-variance utility and its closed-form gradient.
+
+    f(w) = -(w·μ - ½λ wᵀΣw),  ∇f(w) = -μ + λΣw  (Hessian λΣ is constant).
+    Σw is the only covariance operation, so factored covariances cost O(NK).
+    """
+    cov_w = cov @ weights
+    value = -(float(weights @ mu) - 0.5 * risk_aversion * float(weights @ cov_w))
+    gradient = -mu + risk_aversion * cov_w
+    return value, gradient
+
+
+def _project_to_bounded_simplex(
+    values: np.ndarray, lower: float, upper: float, iterations: int = 100
+) -> np.ndarray:
+    """
+    Euclidean projection onto {w : lower <= w_i <= upper, sum(w) = 1}.
+
+    The projection is clip(values - τ, lower, upper) for the shift τ that makes the
+    weights sum to one; τ is found by bisection since the sum is monotone in τ.
+    """
+    tau_low = float(np.min(values)) - upper
+    tau_high = float(np.max(values)) - lower
+    for _ in range(iterations):
+        tau = 0.5 * (tau_low + tau_high)
+        if np.clip(values - tau, lower, upper).sum() > 1:
+            tau_low = tau
+        else:
+            tau_high = tau
+    return np.clip(values - 0.5 * (tau_low + tau_high), lower, upper)
+
+
+def _solve_projected_gradient(
+    mu: np.ndarray,
+    cov: np.ndarray | FactorCovariance,
+    risk_aversion: float,
+    lower: float,
+    upper: float,
+    initial_weights: np.ndarray,
+    cov_max_eigenvalue: float | None = None,
+    tol: float = 1e-10,
+    max_iter: int = 20000,
+) -> np.ndarray:
+    """
+    Accelerated projected gradient (FISTA) for the box + budget constrained QP.
+
+    Uses a fixed step of 1/L where L = λ·λ_max(Σ) is the Lipschitz constant of the
+    gradient, so each iteration costs one matrix-vector product plus an O(N) projection.
+    Pass ``cov_max_eigenvalue`` to reuse λ_max(Σ) across solves on the same covariance.
+    """
+    if cov_max_eigenvalue is None:
+        cov_max_eigenvalue = _max_eigenvalue(cov)
+    lipschitz = risk_aversion * cov_max_eigenvalue
+    if lipschitz <= 0:
+        # Linear objective: the gradient is constant, any positive step works
+        lipschitz = 1.0
+    step = 1.0 / lipschitz
+
+    weights = _project_to_bounded_simplex(initial_weights, lower, upper)
+    momentum_point = weights.copy()
+    momentum = 1.0
+    for _ in range(max_iter):
+        _, gradient = _mean_variance_objective(momentum_point, mu, cov, risk_aversion)
+        next_weights = _project_to_bounded_simplex(momentum_point - step * gradient, lower, upper)
+        if np.max(np.abs(next_weights - weights)) < tol:
+            return next_weights
+        next_momentum = 0.5 * (1 + np.sqrt(1 + 4 * momentum**2))
+        momentum_point = next_weights + ((momentum - 1) / next_momentum) * (next_weights - weights)
+        weights, momentum = next_weights, next_momentum
+
+    raise ValueError("Optimisation failed: projected gradient did not converge")
+
+
+def _solve_mean_variance(
+    mu: np.ndarray,
+    cov: np.ndarray | FactorCovariance,
+    risk_aversion: float,
+    lower: float,
+    upper: float,
+    initial_weights: np.ndarray | None = None,
+    solver: str = OPTIMISER_SOLVER,
+    cov_max_eigenvalue: float | None = None,
+) -> np.ndarray:
+    """
+    Solve max w·μ - ½λ wᵀΣw subject to sum(w) = 1 and lower <= w <= upper.
+
+    Args:
+        mu: Contiguous array of expected returns (N,)
+        cov: Contiguous covariance array (N, N) or FactorCovariance
+        risk_aversion: Risk aversion λ
+        lower: Minimum weight per asset
+        upper: Maximum weight per asset
+        initial_weights: Starting point (defaults to equal weights)
+        solver: 'slsqp' (SciPy with analytic gradients) or 'projected_gradient'
+        cov_max_eigenvalue: Optional precomputed largest eigenvalue of cov (projected gradient)
+
+    Returns:
+        Optimal weights array (N,)
+    """
+    num_assets = len(mu)
+    if num_assets * lower > 1 + 1e-12 or num_assets * upper < 1 - 1e-12:
+        raise ValueError(
+            f"Optimisation failed: bounds [{lower}, {upper}] are infeasible for {num_assets} assets"
+        )
+    if initial_weights is None:
+        initial_weights = np.full(num_assets, 1 / num_assets)
+
+    if solver == "projected_gradient":
+        return _solve_projected_gradient(
+            mu, cov, risk_aversion, lower, upper, initial_weights, cov_max_eigenvalue
+        )
+    if solver != "slsqp":
+        raise ValueError(f"Unknown optimiser solver: {solver}")
+
+    # Fully invested constraint: sum(weights) = 1
+    constraints = [
+        {"type": "eq", "fun": lambda w: np.sum(w) - 1, "jac": lambda w: np.ones_like(w)}
+    ]
+
+    # Bounds: enforce minimum allocation per asset
+    bounds = tuple((lower, upper) for _ in range(num_assets))
+
+    # Run optimizer with the closed-form gradient instead of finite differences
+    result = minimize(
+        _mean_variance_objective,
+        initial_weights,
+        args=(mu, cov, risk_aversion),
+        jac=True,
+        method="SLSQP",
+        bounds=bounds,
+        constraints=constraints,
+        # Daily-return objectives are O(1e-3), so the default ftol (1e-6) stops far from the optimum
+        options={"ftol": 1e-12, "maxiter": 1000},
+    )
+
+    if not result.success:
+        raise ValueError(f"Optimisation failed: {result.message}")
+
+    return result.x
+
+
 def optimize_portfolio_mean_variance(
-    data_dict: dict[str, pd.DataFrame],
+    data_dict: ReturnsSource,
     minimum_allocation: float = MINIMUM_ALLOCATION,
     maximum_allocation: float = MAXIMUM_ALLOCATION,
     risk_aversion: float = RISK_AVERSION,
+    solver: str = OPTIMISER_SOLVER,
+    covariance_method: str = COVARIANCE_METHOD,
 ) -> dict[str, float]:
     """
     Solves the Mean-Variance Optimization problem to find optimal asset weights.
     
     Objective: Maximize (Returns - Risk_Penalty)
     Where Risk_Penalty = 0.5 * risk_aversion * Portfolio_Variance
-    """
-    mu, cov = calculate_mean_variance(data_dict)
-    tickers = list(data_dict.keys())
-    num_assets = len(tickers)
-
-    # Maximize Utility: R - (λ/2) * σ²
-    # We minimize the negative: -R + (λ/2) * σ²
-    def objective(weights: np.ndarray) -> float:
-        port_return = float(np.dot(weights, mu))
-        port_var = float(np.dot(weights.T, np.dot(cov, weights)))
-        return -(port_return - 0.5 * risk_aversion * port_var)
-
-    # Fully invested constraint: sum(weights) = 1
-    constraints = [{"type": "eq", "fun": lambda w: np.sum(w) - 1}]
 
-    # Bounds: enforce minimum allocation per asset
-    bounds = tuple((minimum_allocation, maximum_allocation) for _ in range(num_assets))
+    The mean and covariance are converted to contiguous NumPy arrays once and the
+    solver is given the closed-form gradient. ``solver`` selects SciPy's SLSQP or a
+    dedicated projected-gradient QP solver for the box + budget constraints, and
+    ``covariance_method`` selects the covariance estimator (see estimate_covariance).
+    """
+    mu, cov = calculate_mean_variance(data_dict, covariance_method=covariance_method)
+    tickers = list(mu.index)
 
-    # Initial guess: equal weights
-    initial_weights = np.array([1 / num_assets] * num_assets)
+    mu_array = np.ascontiguousarray(mu.reindex(tickers).to_numpy(dtype=np.float64))
+    cov_array = _covariance_array(cov, tickers)
 
-    # Run optimizer
-    result = minimize(
-        objective, initial_weights, method="SLSQP", bounds=bounds, constraints=constraints
+    optimal_weights = _solve_mean_variance(
+        mu_array,
+        cov_array,
+        risk_aversion,
+        minimum_allocation,
+        maximum_allocation,
+        solver=solver,
     )
 
-    if not result.success:
-        raise ValueError(f"Optimisation failed: {result.message}")
-
     # Build a typed dictionary of weights to satisfy static type checking
     weights: dict[str, float] = {
-        ticker: float(weight) for ticker, weight in zip(tickers, result.x, strict=True)
+        ticker: float(weight) for ticker, weight in zip(tickers, optimal_weights, strict=True)
     }
     return weights
+
+
+def efficient_frontier(
+    data_dict: ReturnsSource,
+    risk_aversions: list[float],
+    minimum_allocation: float = MINIMUM_ALLOCATION,
+    maximum_allocation: float = MAXIMUM_ALLOCATION,
+    solver: str = OPTIMISER_SOLVER,
+    covariance_method: str = COVARIANCE_METHOD,
+) -> list[dict[str, Any]]:
+    """
+    Sweeps the efficient frontier over a grid of risk-aversion values in one call.
+
+    The mean and covariance are estimated once, and each solve is warm-started from
+    the previous point's weights, so neighbouring grid points converge quickly.
+
+    Args:
+        data_dict: Map of Ticker -> DataFrame (must contain 'Returns' column), a panel
+            or RollingMoments (see calculate_mean_variance).
+        risk_aversions: Risk-aversion values to solve for (solved in the given order).
+        minimum_allocation: Minimum weight per asset.
+        maximum_allocation: Maximum weight per asset.
+        solver: Optimiser backend ('slsqp' or 'projected_gradient').
+        covariance_method: Covariance estimator (see estimate_covariance).
+
+    Returns:
+        One dict per risk-aversion value with 'risk_aversion', 'weights',
+        'expected_return' and 'variance'.
+    """
+    mu, cov = calculate_mean_variance(data_dict, covariance_method=covariance_method)
+    tickers = list(mu.index)
+
+    mu_array = np.ascontiguousarray(mu.reindex(tickers).to_numpy(dtype=np.float64))
+    cov_array = _covariance_array(cov, tickers)
+    cov_max_eigenvalue = _max_eigenvalue(cov_array) if solver == "projected_gradient" else None
+
+    frontier: list[dict[str, Any]] = []
+    previous_weights: np.ndarray | None = None
+    for risk_aversion in risk_aversions:
+        optimal_weights = _solve_mean_variance(
+            mu_array,
+            cov_array,
+            risk_aversion,
+            minimum_allocation,
+            maximum_allocation,
+            initial_weights=previous_weights,
+            solver=solver,
+            cov_max_eigenvalue=cov_max_eigenvalue,
+        )
+        previous_weights = optimal_weights
+        frontier.append(
+            {
+                "risk_aversion": float(risk_aversion),
+                "weights": {
+                    ticker: float(weight)
+                    for ticker, weight in zip(tickers, optimal_weights, strict=True)
+                },
+                "expected_return": float(optimal_weights @ mu_array),
+                "variance": float(optimal_weights @ (cov_array @ optimal_weights)),
+            }
+        )
+
+    return frontier
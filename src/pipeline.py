@@ -0,0 +1,320 @@
+"""Streaming executor overlapping price extraction with per-ticker forecasting."""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from .extractor import TickerFetchReport, _default_store, _extract_ticker_with_report
+from .forecast_cache import default_forecast_cache
+from .instrumentation import registry
+from .model import (
+    _default_model_store,
+    _forecast_ticker,
+    _predicted_return,
+    calendar_for_ticker,
+    effective_params,
+)
+from .price_store import PriceStore
+from .providers import PriceProvider, YFinanceProvider
+from .settings import (
+    EXTRACTION_BACKOFF,
+    EXTRACTION_MAX_CONCURRENCY,
+    EXTRACTION_MAX_RETRIES,
+    EXTRACTION_TIMEOUT,
+    FORECAST_MAX_WORKERS,
+    MODEL_REUSE_IF_UNCHANGED,
+    PIPELINE_QUEUE_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageTiming:
+    """Aggregate timing of one pipeline stage."""
+
+    stage: str
+    count: int = 0
+    busy: float = 0.0  # Sum of per-item durations (can exceed wall time when items overlap)
+    first_start: float | None = None
+    last_end: float | None = None
+
+    @property
+    def wall(self) -> float:
+        """Seconds between the stage's first start and last end."""
+        if self.first_start is None or self.last_end is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+
+@dataclass
+class StageTimings:
+    """
+    Thread-safe collection of per-stage timings, measured on one monotonic clock.
+
+    Every recorded item is also exported to the metrics registry as a ``stage`` span.
+    """
+
+    origin: float = field(default_factory=time.monotonic)
+    stages: dict[str, StageTiming] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, stage: str, started: float, ended: float) -> None:
+        """Record one item of ``stage`` that ran from ``started`` to ``ended``."""
+        with self._lock:
+            timing = self.stages.setdefault(stage, StageTiming(stage))
+            timing.count += 1
+            timing.busy += ended - started
+            if timing.first_start is None or started < timing.first_start:
+                timing.first_start = started
+            if timing.last_end is None or ended > timing.last_end:
+                timing.last_end = ended
+        registry.record_span("stage", ended - started, {"stage": stage})
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """Context manager recording the enclosed block as one item of ``stage``."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(stage, started, time.monotonic())
+
+    def summary(self) -> str:
+        """Human-readable table of stages in start order (offsets relative to ``origin``)."""
+        lines = [f"{'stage':<10} {'items':>5} {'start':>8} {'end':>8} {'wall':>8} {'busy':>8}"]
+        ordered = sorted(self.stages.values(), key=lambda timing: timing.first_start or 0.0)
+        for timing in ordered:
+            start = (timing.first_start or self.origin) - self.origin
+            end = (timing.last_end or self.origin) - self.origin
+            lines.append(
+                f"{timing.stage:<10} {timing.count:>5} {start:>7.2f}s {end:>7.2f}s "
+                f"{timing.wall:>7.2f}s {timing.busy:>7.2f}s"
+            )
+        return "\n".join(lines)
+
+
+@dataclass
+class StreamingForecast:
+    """Output of the streaming stages, up to (not including) cross-sectional alignment."""
+
+    all_stock_data: dict[str, pd.DataFrame]
+    predictions: dict[str, float]
+    predicted_returns: dict[str, float]
+    reports: dict[str, TickerFetchReport]
+    timings: StageTimings
+
+
+def _timed_forecast(
+    price_series: pd.Series,
+    prophet_params: dict | None,
+    calendar: str,
+    key: str,
+    reuse_if_unchanged: bool,
+) -> tuple[float, float, float, float]:
+    """Forecast one ticker (process pool worker) and return its start/end times."""
+    started = time.monotonic()
+    predicted_price, predicted_return = _forecast_ticker(
+        price_series, prophet_params, calendar, key, _default_model_store(), reuse_if_unchanged
+    )
+    return predicted_price, predicted_return, started, time.monotonic()
+
+
+def run_streaming_forecast(
+    tickers: list[str],
+    start_date: str,
+    end_date: str,
+    prophet_params: dict | None = None,
+    provider: PriceProvider | None = None,
+    store: PriceStore | None = None,
+    extract_concurrency: int = EXTRACTION_MAX_CONCURRENCY,
+    forecast_workers: int = FORECAST_MAX_WORKERS,
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+) -> StreamingForecast:
+    """
+    Extract and forecast tickers as a pipeline instead of in strict stages.
+
+    Downloads run on a thread pool; each ticker is handed to the forecast stage
+    through a bounded queue as soon as its bars are processed, so Prophet fitting
+    starts while slower downloads are still in flight. A full queue blocks the
+    download threads (backpressure). Forecasts found in the forecast cache skip
+    the forecast stage entirely. Each ticker is forecast on its own history;
+    the barrier is left to the caller, before cross-sectional alignment and
+    optimisation.
+
+    Args:
+        tickers: List of stock ticker symbols
+        start_date: Start date for data download (YYYY-MM-DD format)
+        end_date: End date for data download (YYYY-MM-DD format)
+        prophet_params: Optional dict to override seasonality settings
+        provider: Price provider (defaults to yfinance)
+        store: Local price store (defaults to PRICE_CACHE_DIR when set, otherwise no cache)
+        extract_concurrency: Maximum number of tickers downloaded at the same time
+        forecast_workers: Forecast worker processes (1 = forecast in the calling thread)
+        queue_size: Capacity of the queue between extraction and forecasting
+
+    Returns:
+        StreamingForecast with processed bars, predictions (in ``tickers`` order),
+        fetch reports and per-stage timings
+    """
+    provider = provider or YFinanceProvider()
+    store = store if store is not None else _default_store()
+    timings = StageTimings()
+    reports: dict[str, TickerFetchReport] = {}
+    all_stock_data: dict[str, pd.DataFrame] = {}
+    forecasts: dict[str, tuple[float, float]] = {}
+    if not tickers:
+        return StreamingForecast({}, {}, {}, reports, timings)
+
+    ready: queue.Queue[tuple[str, pd.DataFrame] | None] = queue.Queue(maxsize=max(1, queue_size))
+    extract_errors: list[BaseException] = []
+    # Set when the forecast stage stops consuming (normally or because a forecast failed)
+    stop = threading.Event()
+
+    def offer(item: tuple[str, pd.DataFrame] | None) -> bool:
+        """Put an item on the queue, giving up once the forecast stage has stopped."""
+        while not stop.is_set():
+            try:
+                ready.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def extract_stage() -> None:
+        try:
+            workers = max(1, min(extract_concurrency, len(tickers)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(
+                        _extract_ticker_with_report,
+                        ticker,
+                        start_date,
+                        end_date,
+                        provider,
+                        store,
+                        EXTRACTION_TIMEOUT,
+                        EXTRACTION_MAX_RETRIES,
+                        EXTRACTION_BACKOFF,
+                    ): ticker
+                    for ticker in tickers
+                }
+                for future in as_completed(futures):
+                    ticker = futures[future]
+                    df, report = future.result()
+                    ended = time.monotonic()
+                    timings.record("extract", ended - report.latency, ended)
+                    reports[ticker] = report
+                    if df is None:
+                        logger.warning(f"Failed to extract {ticker}: {report.error}")
+                        continue
+                    all_stock_data[ticker] = df
+                    if not offer((ticker, df)):
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        return
+        except BaseException as e:
+            extract_errors.append(e)
+        finally:
+            # Always release the forecast stage, even when extraction fails
+            offer(None)
+
+    def forecast_args(ticker: str, df: pd.DataFrame) -> tuple:
+        calendar = calendar_for_ticker(df.attrs.get("symbol", ticker))
+        return df["Price"], prophet_params, calendar, ticker, MODEL_REUSE_IF_UNCHANGED
+
+    forecast_cache = default_forecast_cache()
+    cache_keys: dict[str, str] = {}
+
+    def cached_forecast(ticker: str, df: pd.DataFrame) -> bool:
+        """Resolve a ticker from the forecast cache; returns False on a miss."""
+        if forecast_cache is None:
+            return False
+        calendar = calendar_for_ticker(df.attrs.get("symbol", ticker))
+        cache_keys[ticker] = forecast_cache.key(
+            ticker, df["Price"], effective_params(prophet_params, calendar)
+        )
+        predicted_price = forecast_cache.get(cache_keys[ticker])
+        if predicted_price is None:
+            return False
+        forecasts[ticker] = (predicted_price, _predicted_return(df["Price"], predicted_price))
+        return True
+
+    def store_forecast(ticker: str, predicted_price: float, predicted_return: float) -> None:
+        forecasts[ticker] = (predicted_price, predicted_return)
+        if ticker in cache_keys:
+            forecast_cache.put(cache_keys[ticker], predicted_price)
+
+    producer = threading.Thread(target=extract_stage, name="pipeline-extract", daemon=True)
+    producer.start()
+
+    workers = max(1, min(forecast_workers, len(tickers)))
+    try:
+        if workers == 1:
+            while (item := ready.get()) is not None:
+                ticker, df = item
+                if cached_forecast(ticker, df):
+                    continue
+                predicted_price, predicted_return, started, ended = _timed_forecast(
+                    *forecast_args(ticker, df)
+                )
+                timings.record("forecast", started, ended)
+                store_forecast(ticker, predicted_price, predicted_return)
+        else:
+            logger.info(f"Streaming forecasts across {workers} worker processes")
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                in_flight: dict[Future, str] = {}
+
+                def collect(done: set[Future]) -> None:
+                    for future in done:
+                        ticker = in_flight.pop(future)
+                        predicted_price, predicted_return, started, ended = future.result()
+                        timings.record("forecast", started, ended)
+                        store_forecast(ticker, predicted_price, predicted_return)
+
+                while (item := ready.get()) is not None:
+                    ticker, df = item
+                    if cached_forecast(ticker, df):
+                        continue
+                    in_flight[executor.submit(_timed_forecast, *forecast_args(ticker, df))] = ticker
+                    # Keep at most one fit per worker in flight; the rest wait in the queue
+                    if len(in_flight) >= workers:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done)
+                collect(set(wait(in_flight).done))
+    finally:
+        # Release the producer if a forecast raised: it must not block on a full queue
+        stop.set()
+        while True:
+            try:
+                ready.get_nowait()
+            except queue.Empty:
+                break
+
+    producer.join()
+    if extract_errors:
+        raise extract_errors[0]
+
+    ordered = [ticker for ticker in tickers if ticker in forecasts]
+    return StreamingForecast(
+        all_stock_data={ticker: all_stock_data[ticker] for ticker in ordered},
+        predictions={ticker: forecasts[ticker][0] for ticker in ordered},
+        predicted_returns={ticker: forecasts[ticker][1] for ticker in ordered},
+        reports={ticker: reports[ticker] for ticker in tickers if ticker in reports},
+        timings=timings,
+    )
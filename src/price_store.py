@@ -0,0 +1,281 @@
+"""Persistent local store of daily price bars with incremental refresh."""
+
+from __future__ import annotations
+
+import logging
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .providers import PriceProvider
+from .settings import PRICE_ADJUSTMENT_TOLERANCE
+
+logger = logging.getLogger(__name__)
+
+
+class PriceStore:
+    """
+    On-disk cache of daily bars, one file per symbol.
+
+    Bars that were already downloaded are kept; a request only fetches the ranges
+    not yet covered (normally just the most recent trading day). The last cached
+    bar is always re-fetched with the tail so a partial intraday bar gets replaced
+    by the final close.
+
+    Closes are split- and dividend-adjusted, and the provider rescales its whole
+    history after such an event. The tail therefore also re-fetches the bar before
+    the last one (a final close); when it no longer matches the cache, or the tail
+    reports a dividend or split, the cached range is fetched again and overwritten.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        """
+        Initialise the store.
+
+        Args:
+            root: Directory holding one pickled DataFrame per symbol
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, symbol: str) -> Path:
+        """Return the cache file path for a symbol."""
+        safe_symbol = "".join(char if char.isalnum() or char in "-_." else "_" for char in symbol)
+        return self.root / f"{safe_symbol}.pkl"
+
+    def load(self, symbol: str) -> pd.DataFrame | None:
+        """
+        Load cached bars for a symbol.
+
+        Args:
+            symbol: Ticker symbol
+
+        Returns:
+            Cached DataFrame (with ``attrs['covered_start']``) or None if not cached
+        """
+        path = self.path_for(symbol)
+        if not path.exists():
+            return None
+        try:
+            return pd.read_pickle(path)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable price cache for {symbol}: {e}")
+            return None
+
+    def save(self, symbol: str, bars: pd.DataFrame, covered_start: pd.Timestamp) -> None:
+        """
+        Persist bars for a symbol.
+
+        Args:
+            symbol: Ticker symbol
+            bars: DataFrame of daily bars with a naive DatetimeIndex
+            covered_start: Earliest date the cache is known to cover
+        """
+        bars = bars.copy()
+        bars.attrs["covered_start"] = covered_start.strftime("%Y-%m-%d")
+        path = self.path_for(symbol)
+        # Unique temp file: concurrent jobs may save the same symbol at once
+        with tempfile.NamedTemporaryFile(dir=self.root, suffix=".tmp", delete=False) as tmp:
+            tmp_path = Path(tmp.name)
+        try:
+            bars.to_pickle(tmp_path)
+            tmp_path.replace(path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def get_history(
+        self,
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        provider: PriceProvider,
+        timeout: float | None = None,
+    ) -> pd.DataFrame:
+        """
+        Return bars for [start_date, end_date), fetching only ranges missing from the cache.
+
+        Args:
+            symbol: Ticker symbol
+            start_date: Start date (YYYY-MM-DD, inclusive)
+            end_date: End date (YYYY-MM-DD, exclusive)
+            provider: Provider used to fetch missing ranges
+            timeout: Optional per-request timeout passed to the provider
+
+        Returns:
+            DataFrame of daily bars within the requested range (empty if none)
+        """
+        cached = self.load(symbol)
+        ranges, covered_start = self._missing_ranges(symbol, cached, start_date, end_date)
+        fetched = [
+            provider.fetch(symbol, range_start, range_end, timeout=timeout)
+            for range_start, range_end in ranges
+        ]
+        if self._readjusted(symbol, cached, fetched):
+            refetched = provider.fetch(
+                symbol, covered_start.strftime("%Y-%m-%d"), end_date, timeout=timeout
+            )
+            if not refetched.empty:
+                cached, fetched = None, [refetched]
+        return self._update(symbol, cached, fetched, covered_start, start_date, end_date)
+
+    def get_many(
+        self,
+        symbols: list[str],
+        start_date: str,
+        end_date: str,
+        provider: PriceProvider,
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Batched variant of ``get_history``.
+
+        Symbols needing the same missing range are fetched together with one
+        ``provider.fetch_many`` call, so a daily refresh of the whole universe is a
+        single round trip.
+
+        Args:
+            symbols: Ticker symbols
+            start_date: Start date (YYYY-MM-DD, inclusive)
+            end_date: End date (YYYY-MM-DD, exclusive)
+            provider: Provider used to fetch missing ranges
+
+        Returns:
+            Map of symbol -> DataFrame of daily bars within the requested range
+        """
+        cached: dict[str, pd.DataFrame | None] = {}
+        covered: dict[str, pd.Timestamp] = {}
+        pending: dict[tuple[str, str], list[str]] = {}
+        for symbol in symbols:
+            cached[symbol] = self.load(symbol)
+            ranges, covered[symbol] = self._missing_ranges(
+                symbol, cached[symbol], start_date, end_date
+            )
+            for fetch_range in ranges:
+                pending.setdefault(fetch_range, []).append(symbol)
+
+        fetched: dict[str, list[pd.DataFrame]] = {symbol: [] for symbol in symbols}
+        for (range_start, range_end), range_symbols in pending.items():
+            frames = provider.fetch_many(range_symbols, range_start, range_end)
+            for symbol in range_symbols:
+                if symbol in frames:
+                    fetched[symbol].append(frames[symbol])
+
+        # Re-adjusted histories are fetched again in full, batched by covered range
+        refetch: dict[tuple[str, str], list[str]] = {}
+        for symbol in symbols:
+            if self._readjusted(symbol, cached[symbol], fetched[symbol]):
+                full_range = (covered[symbol].strftime("%Y-%m-%d"), end_date)
+                refetch.setdefault(full_range, []).append(symbol)
+        for (range_start, range_end), range_symbols in refetch.items():
+            frames = provider.fetch_many(range_symbols, range_start, range_end)
+            for symbol in range_symbols:
+                if symbol in frames and not frames[symbol].empty:
+                    cached[symbol], fetched[symbol] = None, [frames[symbol]]
+
+        return {
+            symbol: self._update(
+                symbol, cached[symbol], fetched[symbol], covered[symbol], start_date, end_date
+            )
+            for symbol in symbols
+        }
+
+    def _missing_ranges(
+        self,
+        symbol: str,
+        cached: pd.DataFrame | None,
+        start_date: str,
+        end_date: str,
+    ) -> tuple[list[tuple[str, str]], pd.Timestamp]:
+        """
+        Work out which date ranges must be fetched to serve a request.
+
+        Returns:
+            Tuple of (list of (start, end) ranges to fetch, covered start after fetching)
+        """
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date)
+        if cached is None or cached.empty:
+            return [(start_date, end_date)], start
+
+        covered_start = pd.Timestamp(cached.attrs.get("covered_start", cached.index.min()))
+        last_bar = cached.index.max()
+        ranges: list[tuple[str, str]] = []
+
+        # Missing head: the caller asks for history earlier than anything fetched so far
+        if start < covered_start:
+            logger.info(f"Price cache: fetching {symbol} head {start.date()} -> {covered_start.date()}")
+            ranges.append((start_date, covered_start.strftime("%Y-%m-%d")))
+            covered_start = start
+
+        # Missing tail: re-fetch from the bar before the last cached one (a final close,
+        # compared by _readjusted) up to the requested end
+        if end > last_bar + timedelta(days=1):
+            tail_start = cached.index[-2] if len(cached) > 1 else last_bar
+            logger.info(f"Price cache: fetching {symbol} tail {tail_start.date()} -> {end.date()}")
+            ranges.append((tail_start.strftime("%Y-%m-%d"), end_date))
+
+        return ranges, covered_start
+
+    def _readjusted(
+        self, symbol: str, cached: pd.DataFrame | None, fetched: list[pd.DataFrame]
+    ) -> bool:
+        """
+        Tell whether fetched bars show the provider re-adjusted history already cached.
+
+        The last cached bar may have been a partial intraday bar, so only closes
+        before it are compared.
+        """
+        if cached is None or len(cached) < 2:
+            return False
+        final = cached.iloc[:-1]
+        anchor = final.index[-1]
+        for part in fetched:
+            if part.empty:
+                continue
+            overlap = part.index.intersection(final.index)
+            if len(overlap) and not np.allclose(
+                part.loc[overlap, "Close"].to_numpy(dtype=float),
+                final.loc[overlap, "Close"].to_numpy(dtype=float),
+                rtol=PRICE_ADJUSTMENT_TOLERANCE,
+                atol=0.0,
+            ):
+                logger.warning(f"Price cache: {symbol} closes were re-adjusted, refetching")
+                return True
+            new_bars = part.loc[part.index > anchor]
+            for action in ("Dividends", "Stock Splits"):
+                if action in new_bars and (new_bars[action].fillna(0) != 0).any():
+                    logger.warning(f"Price cache: {symbol} has new {action.lower()}, refetching")
+                    return True
+        return False
+
+    def _update(
+        self,
+        symbol: str,
+        cached: pd.DataFrame | None,
+        fetched: list[pd.DataFrame],
+        covered_start: pd.Timestamp,
+        start_date: str,
+        end_date: str,
+    ) -> pd.DataFrame:
+        """Merge fetched bars into the cache, persist if anything changed, and slice the request."""
+        parts = [part for part in fetched if not part.empty]
+        if cached is not None and not cached.empty:
+            parts.insert(0, cached)
+        if not parts:
+            return fetched[0] if fetched else pd.DataFrame(columns=["Close"])
+
+        if len(parts) > 1 or cached is None or cached.empty:
+            merged = pd.concat(parts)
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+            self.save(symbol, merged, covered_start)
+        else:
+            merged = cached
+            if covered_start < pd.Timestamp(cached.attrs.get("covered_start", cached.index.min())):
+                self.save(symbol, merged, covered_start)
+
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date)
+        return merged.loc[(merged.index >= start) & (merged.index < end)]
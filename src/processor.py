@@ -1,17 +1,403 @@
 """Data processing module for aligning, normalizing, and manipulating stock data."""
 
+from __future__ import annotations
+
 import logging
+from dataclasses import dataclass, field
 from datetime import timedelta
+from functools import cached_property, reduce
 
+import numpy as np
 import pandas as pd
 
+from .settings import ALIGNMENT_FFILL_LIMIT, ALIGNMENT_MODE
+
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class AlignedPanel:
+    """
+    Price and return history for several tickers on one shared date index.
+
+    ``prices`` and ``returns`` are 2-D float64 arrays of shape (dates, tickers),
+    stored column-major so each ticker's history is a contiguous column. Per-ticker
+    series and returns frames handed to the model and optimiser are views of these
+    arrays rather than copies.
+
+    Panels aligned on the union of dates carry a ``valid`` mask (same shape as the
+    arrays): cells where a ticker has no usable value hold NaN and are False there.
+    ``valid`` is None when every cell is populated.
+    """
+
+    tickers: list[str]
+    dates: np.ndarray  # datetime64[D], sorted ascending
+    prices: np.ndarray
+    returns: np.ndarray
+    symbols: dict[str, str] = field(default_factory=dict)  # Symbol each ticker was fetched under
+    valid: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        """Number of dates in the panel."""
+        return len(self.dates)
+
+    @cached_property
+    def index(self) -> pd.DatetimeIndex:
+        """Shared DatetimeIndex of the panel (built once, reused by every view)."""
+        return pd.DatetimeIndex(self.dates, name="Date")
+
+    @cached_property
+    def _columns(self) -> dict[str, int]:
+        """Map of ticker -> column position."""
+        return {ticker: position for position, ticker in enumerate(self.tickers)}
+
+    @property
+    def is_masked(self) -> bool:
+        """True when some cells are not valid."""
+        return self.valid is not None and not bool(self.valid.all())
+
+    def valid_rows(self, ticker: str) -> np.ndarray | None:
+        """Boolean row mask of a ticker's valid dates (None when all rows are valid)."""
+        if self.valid is None:
+            return None
+        rows = self.valid[:, self._columns[ticker]]
+        return None if rows.all() else rows
+
+    def price_series(self, ticker: str) -> pd.Series:
+        """
+        Price history of one ticker over its valid dates (``attrs['symbol']`` set).
+
+        A view of the panel when the ticker has no invalid dates, otherwise a
+        compacted copy of just the valid rows.
+        """
+        column = self._columns[ticker]
+        rows = self.valid_rows(ticker)
+        if rows is None:
+            series = pd.Series(self.prices[:, column], index=self.index, name="Price", copy=False)
+        else:
+            series = pd.Series(self.prices[rows, column], index=self.index[rows], name="Price")
+        series.attrs["symbol"] = self.symbols.get(ticker, ticker)
+        return series
+
+    def returns_frame(self, lookback_days: int | None = None) -> pd.DataFrame:
+        """
+        Trailing returns of all tickers as a DataFrame view (dates x tickers).
+
+        Invalid cells are NaN, so pandas statistics (mean, pairwise cov) skip them.
+
+        Args:
+            lookback_days: Number of most recent rows to include (all rows when None)
+
+        Returns:
+            DataFrame sharing memory with the panel's returns array
+        """
+        start = 0 if lookback_days is None else max(len(self) - lookback_days, 0)
+        return pd.DataFrame(
+            self.returns[start:], index=self.index[start:], columns=self.tickers, copy=False
+        )
+
+    def to_dict(self) -> dict[str, pd.DataFrame]:
+        """
+        Convert to the dict-of-DataFrames layout returned by ``preprocess_data``.
+
+        Each frame holds only the ticker's valid dates.
+        """
+        day_index = pd.Index(self.dates.astype(object), name="Date")
+        frames = {}
+        for position, ticker in enumerate(self.tickers):
+            rows = self.valid_rows(ticker)
+            rows = slice(None) if rows is None else rows
+            df = pd.DataFrame(
+                {"Price": self.prices[rows, position], "Returns": self.returns[rows, position]},
+                index=day_index[rows],
+            )
+            df.attrs["symbol"] = self.symbols.get(ticker, ticker)
+            frames[ticker] = df
+        return frames
+
+    def with_overlay(
+        self, predictions: dict[str, float], predicted_returns: dict[str, float]
+    ) -> AugmentedPanel:
+        """
+        Add a predicted row on top of this panel without copying the history.
+
+        Args:
+            predictions: Predicted price per ticker
+            predicted_returns: Predicted return per ticker
+
+        Returns:
+            AugmentedPanel sharing this panel's arrays
+        """
+        return AugmentedPanel(
+            self,
+            np.array([predictions[ticker] for ticker in self.tickers], dtype=np.float64),
+            np.array([predicted_returns[ticker] for ticker in self.tickers], dtype=np.float64),
+        )
+
+    def with_horizon_overlay(
+        self, forecasts: dict[str, pd.DataFrame], forecast_returns: dict[str, np.ndarray]
+    ) -> AugmentedPanel:
+        """
+        Add one predicted row per forecast step on top of this panel.
+
+        Steps are aligned by position (step h is each ticker's h-th trading day);
+        the overlay is dated with the first ticker's forecast dates.
+
+        Args:
+            forecasts: Per-ticker frames with a 'predicted_price' column (one row per step)
+            forecast_returns: Per-ticker daily returns along the forecast
+
+        Returns:
+            AugmentedPanel with ``horizon`` overlay rows sharing this panel's arrays
+        """
+        prices = np.column_stack(
+            [forecasts[ticker]["predicted_price"].to_numpy(np.float64) for ticker in self.tickers]
+        )
+        returns = np.column_stack(
+            [np.asarray(forecast_returns[ticker], dtype=np.float64) for ticker in self.tickers]
+        )
+        dates = _day_array(forecasts[self.tickers[0]].index)
+        return AugmentedPanel(self, prices, returns, dates)
+
+
+@dataclass
+class AugmentedPanel:
+    """
+    An AlignedPanel plus overlay rows of predicted prices and returns.
+
+    The history is shared with the base panel, never copied: only the trailing
+    window requested by the optimiser is stacked with the overlay rows. Many
+    scenario overlays can therefore be built on the same history cheaply. The
+    overlay is a single next-day row, or one row per step of a multi-day forecast.
+    """
+
+    base: AlignedPanel
+    overlay_prices: np.ndarray  # Predicted prices in base.tickers order, (N,) or (steps, N)
+    overlay_returns: np.ndarray  # Predicted returns, same shape as overlay_prices
+    overlay_dates: np.ndarray | None = None  # datetime64[D] per step (default: next day)
+
+    @property
+    def tickers(self) -> list[str]:
+        """Tickers of the base panel."""
+        return self.base.tickers
+
+    @property
+    def overlay_date(self) -> np.datetime64:
+        """Date of the first overlay row (by default the day after the last historical date)."""
+        return self._overlay_days[0]
+
+    @property
+    def horizon(self) -> int:
+        """Number of overlay rows."""
+        return 1 if self.overlay_prices.ndim == 1 else self.overlay_prices.shape[0]
+
+    @property
+    def _overlay_days(self) -> np.ndarray:
+        """Dates of the overlay rows."""
+        if self.overlay_dates is not None:
+            return self.overlay_dates
+        return np.array([self.base.dates[-1] + np.timedelta64(1, "D")])
+
+    @property
+    def is_masked(self) -> bool:
+        """True when the history has invalid cells (the overlay rows are always valid)."""
+        return self.base.is_masked
+
+    def __len__(self) -> int:
+        """Number of dates including the overlay rows."""
+        return len(self.base) + self.horizon
+
+    def returns_frame(self, lookback_days: int | None = None) -> pd.DataFrame:
+        """
+        Trailing returns including the overlay rows as the last dates.
+
+        Args:
+            lookback_days: Number of most recent rows (overlay included); all rows when None
+
+        Returns:
+            DataFrame (dates x tickers) built from the trailing window only
+        """
+        steps = self.horizon
+        history_rows = len(self.base) if lookback_days is None else max(lookback_days - steps, 0)
+        start = max(len(self.base) - history_rows, 0)
+        returns = np.vstack([self.base.returns[start:], np.atleast_2d(self.overlay_returns)])
+        index = self.base.index[start:].append(pd.DatetimeIndex(self._overlay_days))
+        return pd.DataFrame(returns, index=index, columns=self.tickers, copy=False)
+
+    def to_panel(self) -> AlignedPanel:
+        """Materialise a full AlignedPanel with the overlay rows appended."""
+        base = self.base
+        num_dates = len(base)
+        prices = np.empty((num_dates + self.horizon, len(base.tickers)), order="F")
+        returns = np.empty_like(prices, order="F")
+        prices[:num_dates] = base.prices
+        returns[:num_dates] = base.returns
+        prices[num_dates:] = self.overlay_prices
+        returns[num_dates:] = self.overlay_returns
+        valid = None
+        if base.valid is not None:
+            valid = np.ones(prices.shape, dtype=bool, order="F")
+            valid[:num_dates] = base.valid
+        return AlignedPanel(
+            base.tickers,
+            np.append(base.dates, self._overlay_days),
+            prices,
+            returns,
+            base.symbols,
+            valid,
+        )
+
+
+def _day_array(index: pd.Index) -> np.ndarray:
+    """Convert a date-like index to a datetime64[D] array."""
+    return pd.to_datetime(index).to_numpy().astype("datetime64[D]")
+
+
+def _sorted_days(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return a frame's dates as a sorted, unique datetime64[D] array and the row order.
+
+    Args:
+        df: DataFrame with a date-like index
+
+    Returns:
+        Tuple of (sorted unique dates, positions of the matching rows in ``df``);
+        for duplicated dates the last row wins
+    """
+    days = _day_array(df.index)
+    order = np.arange(len(days))
+    if len(days) > 1 and not (days[1:] > days[:-1]).all():
+        order = np.argsort(days, kind="stable")
+        days = days[order]
+        keep = np.append(days[1:] != days[:-1], True)
+        order, days = order[keep], days[keep]
+    return days, order
+
+
+def _align_positions(
+    all_stock_data: dict[str, pd.DataFrame],
+) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """
+    Find the dates common to every ticker and each ticker's row positions for them.
+
+    Each ticker's dates are converted to a sorted datetime64[D] array once, the
+    common dates come from a chain of sorted-array intersections, and row positions
+    are located with a binary search — no per-date Python objects are created.
+
+    Args:
+        all_stock_data: Dictionary mapping ticker to DataFrame with date index
+
+    Returns:
+        Tuple of (common datetime64[D] dates, map of ticker -> row positions)
+    """
+    sorted_days = {ticker: _sorted_days(df) for ticker, df in all_stock_data.items()}
+    common_dates = reduce(
+        lambda left, right: np.intersect1d(left, right, assume_unique=True),
+        (days for days, _ in sorted_days.values()),
+    )
+    positions = {
+        ticker: order[np.searchsorted(days, common_dates)]
+        for ticker, (days, order) in sorted_days.items()
+    }
+    return common_dates, positions
+
+
+def _forward_fill(values: np.ndarray, observed: np.ndarray, limit: int) -> np.ndarray:
+    """
+    Forward-fill NaN cells of a (dates x tickers) array in place, at most ``limit`` rows.
+
+    The row of the last observation is carried down each column with a cumulative
+    maximum, so the whole panel is filled in one vectorised pass.
+
+    Args:
+        values: Array to fill (unobserved cells are NaN)
+        observed: Boolean mask of observed cells
+        limit: Maximum number of consecutive rows to fill after an observation
+
+    Returns:
+        Boolean mask of the cells that were filled
+    """
+    rows = np.arange(values.shape[0])[:, None]
+    last_observed = np.maximum.accumulate(np.where(observed, rows, -1), axis=0)
+    filled = ~observed & (last_observed >= 0) & (rows - last_observed <= limit)
+    columns = np.broadcast_to(np.arange(values.shape[1]), values.shape)
+    values[filled] = values[last_observed[filled], columns[filled]]
+    return filled
+
+
+def preprocess_panel(
+    all_stock_data: dict[str, pd.DataFrame],
+    mode: str = ALIGNMENT_MODE,
+    ffill_limit: int = ALIGNMENT_FFILL_LIMIT,
+) -> AlignedPanel:
+    """
+    Align multiple tickers into an array-backed panel.
+
+    Modes:
+        - 'intersection': keep only the dates every ticker traded (no masks).
+        - 'union': keep every date any ticker traded. A ticker's missing prices are
+          forward-filled for up to ``ffill_limit`` rows (with a zero return); cells
+          beyond that (e.g. before an IPO) are NaN and marked invalid in ``valid``.
+
+    Args:
+        all_stock_data: Dictionary mapping ticker to DataFrame with 'Price' and 'Returns'
+            columns and a date index
+        mode: Alignment mode, 'intersection' or 'union'
+        ffill_limit: Maximum forward-filled rows per gap in 'union' mode (0 disables filling)
+
+    Returns:
+        AlignedPanel holding the aligned dates and (dates x tickers) Price/Returns arrays
+    """
+    if mode not in ("intersection", "union"):
+        raise ValueError(f"Unknown alignment mode: {mode}")
+
+    tickers = list(all_stock_data.keys())
+    if not tickers:
+        empty = np.empty((0, 0), order="F")
+        return AlignedPanel([], np.array([], dtype="datetime64[D]"), empty, empty.copy(order="F"))
+    symbols = {ticker: df.attrs.get("symbol", ticker) for ticker, df in all_stock_data.items()}
+
+    if mode == "intersection":
+        common_dates, positions = _align_positions(all_stock_data)
+        prices = np.empty((len(common_dates), len(tickers)), order="F")
+        returns = np.empty((len(common_dates), len(tickers)), order="F")
+        for column, ticker in enumerate(tickers):
+            df = all_stock_data[ticker]
+            prices[:, column] = df["Price"].to_numpy(dtype=np.float64)[positions[ticker]]
+            returns[:, column] = df["Returns"].to_numpy(dtype=np.float64)[positions[ticker]]
+        return AlignedPanel(tickers, common_dates, prices, returns, symbols)
+
+    sorted_days = {ticker: _sorted_days(df) for ticker, df in all_stock_data.items()}
+    all_dates = np.unique(np.concatenate([days for days, _ in sorted_days.values()]))
+    prices = np.full((len(all_dates), len(tickers)), np.nan, order="F")
+    returns = np.full((len(all_dates), len(tickers)), np.nan, order="F")
+    observed = np.zeros((len(all_dates), len(tickers)), dtype=bool, order="F")
+    for column, ticker in enumerate(tickers):
+        days, order = sorted_days[ticker]
+        rows = np.searchsorted(all_dates, days)
+        df = all_stock_data[ticker]
+        prices[rows, column] = df["Price"].to_numpy(dtype=np.float64)[order]
+        returns[rows, column] = df["Returns"].to_numpy(dtype=np.float64)[order]
+        observed[rows, column] = True
+
+    filled = _forward_fill(prices, observed, ffill_limit)
+    # A carried-forward price did not move
+    returns[filled] = 0.0
+    valid = observed | filled
+    logger.info(
+        f"Union alignment: {len(all_dates)} dates, {int(filled.sum())} cells forward-filled, "
+        f"{int((~valid).sum())} cells masked"
+    )
+    return AlignedPanel(tickers, all_dates, prices, returns, symbols, valid)
+
+
 def preprocess_data(all_stock_data: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
     """
     Align multiple tickers by common dates while keeping them as a dictionary of DataFrames.
 
+    Prefer ``preprocess_panel`` for new code; this keeps every column of the input
+    frames and the ``datetime.date`` index used by earlier callers.
+
     Args:
         all_stock_data: Dictionary mapping ticker to DataFrame with date index
 
@@ -21,40 +407,38 @@ def preprocess_data(all_stock_data: dict[str, pd.DataFrame]) -> dict[str, pd.Dat
     if not all_stock_data:
         return {}
 
-    # Ensure all indexes are datetime.date type and find intersection of dates across all tickers
-    normalised_all_stock_data = {}
-    for ticker, df in all_stock_data.items():
-        df_copy = df.copy()
-        df_copy.index = pd.to_datetime(df_copy.index).date
-        normalised_all_stock_data[ticker] = df_copy
-
-    # Find common dates across all tickers
-    date_sets = [set(df.index) for df in normalised_all_stock_data.values()]
-    common_dates = sorted(set.intersection(*date_sets))
+    common_dates, positions = _align_positions(all_stock_data)
+    day_index = pd.Index(common_dates.astype(object), name="Date")
 
     # Trim each DataFrame to the common dates
-    aligned_all_stock_data = {
-        ticker: df.loc[common_dates] for ticker, df in normalised_all_stock_data.items()
-    }
+    aligned_all_stock_data = {}
+    for ticker, df in all_stock_data.items():
+        aligned = df.iloc[positions[ticker]]
+        aligned.index = day_index
+        aligned_all_stock_data[ticker] = aligned
     return aligned_all_stock_data
 
 
 def append_predictions(
-    portfolio_data: dict[str, pd.DataFrame],
+    portfolio_data: dict[str, pd.DataFrame] | AlignedPanel,
     predictions: dict[str, float],
     predicted_returns: dict[str, float],
-) -> dict[str, pd.DataFrame]:
+) -> dict[str, pd.DataFrame] | AugmentedPanel:
     """
     Append predicted price and return to each ticker's DataFrame.
 
     Args:
-        portfolio_data: Dictionary of historical DataFrames per ticker
+        portfolio_data: Dictionary of historical DataFrames per ticker, or an AlignedPanel
         predictions: Dictionary of predicted prices per ticker
         predicted_returns: Dictionary of predicted returns per ticker
 
     Returns:
-        Updated dictionary with an additional row for each ticker
+        Updated dictionary with an additional row for each ticker. Given a panel, an
+        AugmentedPanel overlaying the prediction row on the unchanged history
     """
+    if isinstance(portfolio_data, AlignedPanel):
+        return portfolio_data.with_overlay(predictions, predicted_returns)
+
     updated_portfolio_data = {}
 
     for ticker, df in portfolio_data.items():
@@ -76,19 +460,36 @@ def append_predictions(
 
 
 def collect_recent_prices(
-    portfolio_data: dict[str, pd.DataFrame],
+    portfolio_data: dict[str, pd.DataFrame] | AlignedPanel,
     days: int = 30,
 ) -> dict[str, list[float]]:
     """
     Collect the most recent prices for each ticker over the given trailing window.
 
     Args:
-        portfolio_data: Dictionary of historical DataFrames per ticker.
+        portfolio_data: Dictionary of historical DataFrames per ticker, or an AlignedPanel.
         days: Number of trailing days (inclusive) to include. Defaults to 30.
 
     Returns:
         Dictionary mapping ticker to a list of recent price floats ordered by date.
     """
+    if isinstance(portfolio_data, AlignedPanel):
+        panel = portfolio_data
+        if len(panel) == 0:
+            return {ticker: [] for ticker in panel.tickers}
+        # The cutoff row is shared by every ticker; find it once with a binary search
+        start = np.searchsorted(panel.dates, panel.dates[-1] - np.timedelta64(days, "D"))
+        recent = panel.prices[start:]
+        if panel.valid is None:
+            return {
+                ticker: recent[:, column].tolist() for column, ticker in enumerate(panel.tickers)
+            }
+        recent_valid = panel.valid[start:]
+        return {
+            ticker: recent[recent_valid[:, column], column].tolist()
+            for column, ticker in enumerate(panel.tickers)
+        }
+
     recent_prices: dict[str, list[float]] = {}
 
     for ticker, df in portfolio_data.items():
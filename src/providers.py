@@ -0,0 +1,242 @@
+"""Price data providers used by the extractor and the local price store."""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Protocol
+
+import pandas as pd
+import yfinance as yf
+from yfinance import exceptions as yf_exceptions
+
+logger = logging.getLogger(__name__)
+
+# yfinance errors meaning "no data for this symbol" (treated as an empty result)
+_MISSING_DATA_ERRORS: tuple[type[Exception], ...] = tuple(
+    getattr(yf_exceptions, name)
+    for name in ("YFTickerMissingError", "YFPricesMissingError", "YFTzMissingError")
+    if hasattr(yf_exceptions, name)
+)
+
+# Errors worth retrying: network failures, timeouts and provider throttling
+_TRANSIENT_ERRORS: tuple[type[Exception], ...] = (OSError, TimeoutError) + tuple(
+    getattr(yf_exceptions, name)
+    for name in ("YFRateLimitError",)
+    if hasattr(yf_exceptions, name)
+)
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Return True when a provider error is likely to succeed on retry."""
+    return isinstance(error, _TRANSIENT_ERRORS)
+
+
+def _normalise_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalise raw provider bars to a tz-naive, midnight-aligned, sorted DatetimeIndex.
+
+    Args:
+        df: Raw DataFrame of daily bars indexed by date or timestamp
+
+    Returns:
+        DataFrame with a naive DatetimeIndex named 'Date'
+    """
+    if df.empty:
+        return pd.DataFrame(columns=["Close"], index=pd.DatetimeIndex([], name="Date"))
+
+    index = pd.DatetimeIndex(pd.to_datetime(df.index))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df = df.copy()
+    df.index = index.normalize()
+    df.index.name = "Date"
+    df = df[~df.index.duplicated(keep="last")]
+    return df.sort_index()
+
+
+def _split_batched_frame(frame: pd.DataFrame, symbols: list[str]) -> dict[str, pd.DataFrame]:
+    """
+    Split a ``group_by='ticker'`` download into per-symbol frames.
+
+    The index is normalised once for the whole frame (on a shallow copy, so the
+    caller's frame is left untouched); each symbol's frame is then selected from it
+    with the rows the symbol has no bars for removed. The selections copy the data.
+
+    Args:
+        frame: Batched download with (symbol, field) MultiIndex columns
+        symbols: Symbols that were requested
+
+    Returns:
+        Map of symbol -> normalised DataFrame (empty for symbols without data)
+    """
+    empty = _normalise_bars(pd.DataFrame())
+    if frame is None or frame.empty:
+        return {symbol: empty for symbol in symbols}
+
+    frame = frame.copy(deep=False)
+    index = pd.DatetimeIndex(pd.to_datetime(frame.index))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    frame.index = index.normalize()
+    frame.index.name = "Date"
+
+    if not isinstance(frame.columns, pd.MultiIndex):
+        # Single-symbol downloads may come back with flat columns
+        frames = {symbols[0]: frame} if len(symbols) == 1 else {}
+    else:
+        available = set(frame.columns.get_level_values(0))
+        frames = {
+            symbol: frame.xs(symbol, axis=1, level=0) for symbol in symbols if symbol in available
+        }
+
+    result: dict[str, pd.DataFrame] = {}
+    for symbol in symbols:
+        df = frames.get(symbol)
+        if df is None or "Close" not in df.columns:
+            result[symbol] = empty
+            continue
+        df = df.loc[df["Close"].notna()]
+        result[symbol] = df.sort_index() if not df.index.is_monotonic_increasing else df
+    return result
+
+
+class PriceProvider(Protocol):
+    """
+    Source of daily price bars.
+
+    Implementations return a DataFrame with at least a 'Close' column, indexed by a
+    tz-naive DatetimeIndex, covering ``start_date`` (inclusive) to ``end_date``
+    (exclusive). An empty DataFrame means no data is available for the symbol.
+    """
+
+    def fetch(
+        self, symbol: str, start_date: str, end_date: str, timeout: float | None = None
+    ) -> pd.DataFrame:
+        """Fetch daily bars for one symbol, raising on network or provider errors."""
+        ...
+
+    def fetch_many(
+        self, symbols: list[str], start_date: str, end_date: str
+    ) -> dict[str, pd.DataFrame]:
+        """Fetch daily bars for several symbols, ideally in a single round trip."""
+        ...
+
+
+class YFinanceProvider:
+    """Provider backed by Yahoo Finance through yfinance."""
+
+    def fetch(
+        self, symbol: str, start_date: str, end_date: str, timeout: float | None = None
+    ) -> pd.DataFrame:
+        """
+        Fetch daily bars for one symbol from Yahoo Finance.
+
+        Network and throttling errors are raised (so callers can retry them) instead
+        of being swallowed into an empty frame; missing-symbol errors still return an
+        empty frame so the '.NS' fallback can run.
+
+        Args:
+            symbol: Ticker symbol (e.g. 'AAPL' or 'RELIANCE.NS')
+            start_date: Start date (YYYY-MM-DD, inclusive)
+            end_date: End date (YYYY-MM-DD, exclusive)
+            timeout: Optional HTTP timeout in seconds (yfinance default when None)
+
+        Returns:
+            Normalised DataFrame of daily bars (empty if no data)
+        """
+        kwargs: dict = {"raise_errors": True}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        try:
+            df = yf.Ticker(symbol).history(start=start_date, end=end_date, **kwargs)
+        except _MISSING_DATA_ERRORS as e:
+            logger.debug(f"No data for {symbol}: {e}")
+            return _normalise_bars(pd.DataFrame())
+        return _normalise_bars(df)
+
+    def fetch_many(
+        self, symbols: list[str], start_date: str, end_date: str
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Fetch daily bars for several symbols with one batched download.
+
+        Args:
+            symbols: Ticker symbols
+            start_date: Start date (YYYY-MM-DD, inclusive)
+            end_date: End date (YYYY-MM-DD, exclusive)
+
+        Returns:
+            Map of symbol -> normalised DataFrame (empty for symbols without data)
+        """
+        if not symbols:
+            return {}
+        frame = yf.download(
+            symbols,
+            start=start_date,
+            end=end_date,
+            group_by="ticker",
+            auto_adjust=True,
+            progress=False,
+            threads=True,
+        )
+        return _split_batched_frame(frame, symbols)
+
+
+class FixtureProvider:
+    """
+    Offline provider serving bars from in-memory frames.
+
+    Used in tests and offline runs in place of yfinance. Every fetch is recorded in
+    ``calls`` so callers can assert which ranges were requested.
+    """
+
+    def __init__(self, frames: dict[str, pd.DataFrame]) -> None:
+        """
+        Initialise the provider.
+
+        Args:
+            frames: Map of symbol -> DataFrame of daily bars with a 'Close' column
+        """
+        self.frames = {symbol: _normalise_bars(df) for symbol, df in frames.items()}
+        self.calls: list[tuple[str, str, str]] = []
+        self.batch_calls: list[tuple[tuple[str, ...], str, str]] = []
+
+    @classmethod
+    def from_directory(cls, directory: str | Path) -> FixtureProvider:
+        """
+        Load fixtures from ``<symbol>.csv`` files with a 'Date' column and a 'Close' column.
+
+        Args:
+            directory: Directory containing one CSV file per symbol
+
+        Returns:
+            FixtureProvider serving the loaded frames
+        """
+        frames = {
+            path.stem: pd.read_csv(path, index_col="Date", parse_dates=True)
+            for path in sorted(Path(directory).glob("*.csv"))
+        }
+        return cls(frames)
+
+    def fetch(
+        self, symbol: str, start_date: str, end_date: str, timeout: float | None = None
+    ) -> pd.DataFrame:
+        """Return the fixture bars for ``symbol`` within [start_date, end_date)."""
+        self.calls.append((symbol, start_date, end_date))
+        return self._slice(symbol, start_date, end_date)
+
+    def fetch_many(
+        self, symbols: list[str], start_date: str, end_date: str
+    ) -> dict[str, pd.DataFrame]:
+        """Return fixture bars for several symbols, recorded as one batched call."""
+        self.batch_calls.append((tuple(symbols), start_date, end_date))
+        return {symbol: self._slice(symbol, start_date, end_date) for symbol in symbols}
+
+    def _slice(self, symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        """Return a copy of the fixture bars for ``symbol`` within [start_date, end_date)."""
+        df = self.frames.get(symbol)
+        if df is None:
+            return _normalise_bars(pd.DataFrame())
+        mask = (df.index >= pd.Timestamp(start_date)) & (df.index < pd.Timestamp(end_date))
+        return df.loc[mask].copy()
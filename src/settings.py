@@ -1,4 +1,5 @@
 """Settings and constants for portfolio optimisation."""
+import os
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -8,6 +9,19 @@ load_dotenv()
 MINIMUM_ALLOCATION = 0.05  # Minimum allocation per asset (5%)
 MAXIMUM_ALLOCATION = 1
 RISK_AVERSION = 5
+# Covariance estimator: 'sample', 'ledoit_wolf', 'ewma' or 'factor' (low-rank + diagonal)
+COVARIANCE_METHOD = "sample"
+COVARIANCE_FACTORS = 10  # Number of factors for the 'factor' estimator
+EWMA_DECAY = 0.94  # Daily decay for the 'ewma' estimator (RiskMetrics)
+# Default risk-aversion grid for efficient frontier sweeps
+FRONTIER_RISK_AVERSIONS = [0.5, 1, 2, 3, 5, 7.5, 10, 15, 20, 30, 50]
+# File holding the persisted rolling mean/covariance window (sample estimator only);
+# unset recomputes the statistics from the full returns history on every run
+# (one state file per ticker set and window is written next to it)
+ROLLING_MOMENTS_PATH = os.environ.get("ROLLING_MOMENTS_PATH")
+ROLLING_MOMENTS_WINDOW = 252  # Trading days in the persisted window (the default lookback)
+# Optimiser backend: 'slsqp' (SciPy) or 'projected_gradient' (dedicated box + budget QP solver)
+OPTIMISER_SOLVER = "slsqp"
 
 # Date defaults
 START_DATE = "2024-01-01"  # Default start date for historical data
@@ -29,10 +43,35 @@ PORTFOLIO_TICKERS = [
     "PLTR",
 ]
 
+# Data extraction: 'batch' (one request for all tickers), 'concurrent' (one request per
+# ticker on a bounded thread pool with retries) or 'serial' (one request per ticker)
+EXTRACTION_MODE = os.environ.get("EXTRACTION_MODE", "batch")
+EXTRACTION_MAX_CONCURRENCY = 8  # Parallel requests in concurrent mode
+EXTRACTION_TIMEOUT = 30.0  # Per-ticker time budget in seconds, including retries
+EXTRACTION_MAX_RETRIES = 3  # Retries on transient provider errors
+EXTRACTION_BACKOFF = 0.5  # Initial retry delay in seconds, doubled after each attempt
+
+# Local price cache (one file per ticker); unset disables caching
+PRICE_CACHE_DIR = os.environ.get("PRICE_CACHE_DIR")
+# Relative difference between a cached and a re-fetched close that means the provider
+# re-adjusted its history (split or dividend), so the cached bars are fetched again
+PRICE_ADJUSTMENT_TOLERANCE = 5e-4
+
 # Database
 SUPABASE_TABLE_NAME = "stock_optimisation_store"
-import os
 DATABASE_URL = os.environ.get("DATABASE_URL")
+DB_INSERT_BATCH_SIZE = 1000  # Rows per bulk insert statement
+HISTORY_PAGE_MAX = 1000  # Largest page (and NDJSON fetch batch) served by /api/historical/all
+# Seconds the API reuses the latest snapshot; saves made by this process invalidate it
+# at once, the TTL covers writes by other processes (e.g. the daily CLI run)
+LATEST_CACHE_TTL = int(os.environ.get("LATEST_CACHE_TTL", "300"))
+# Prediction accuracy (see src.accuracy): default trailing window of /api/accuracy aggregates
+ACCURACY_WINDOW_DAYS = 30
+ACCURACY_WINDOW_MAX = 365
+# A prediction is scored against the first close within this many days of its as_of_date
+ACCURACY_MAX_LAG_DAYS = 5
+# Unscored predictions older than this are no longer retried (python -m src.accuracy --rebuild)
+ACCURACY_PENDING_DAYS = 30
 
 
 # Holiday name mapping for Prophet model
@@ -51,9 +90,52 @@ HOLIDAY_NAME_MAP = {
     "Christmas Day": "christmas",
 }
 
+# Optional precomputed holiday table (JSON written by src.model.save_holiday_table)
+HOLIDAY_TABLE_PATH = os.environ.get("HOLIDAY_TABLE_PATH")
+
+# Date alignment across tickers: 'intersection' (dates every ticker traded) or 'union'
+# (all dates, short gaps forward-filled, remaining cells masked as invalid)
+ALIGNMENT_MODE = os.environ.get("ALIGNMENT_MODE", "intersection")
+ALIGNMENT_FFILL_LIMIT = 5  # Max consecutive forward-filled rows per gap in 'union' mode
+
+# API job queue for optimisation runs
+JOB_MAX_WORKERS = int(os.environ.get("JOB_MAX_WORKERS", "2"))  # Runs executed at the same time
+JOB_MAX_PENDING = 20  # Queued runs accepted before new submissions are rejected
+JOB_HISTORY_SIZE = 200  # Finished jobs kept for status polling
+# Identical optimisation requests share one job; finished results are cached until the
+# TTL expires or an exchange closes a session (new market data)
+RESULT_CACHE_TTL = int(os.environ.get("RESULT_CACHE_TTL", "3600"))  # Seconds
+RESULT_CACHE_SIZE = 128  # Cached results kept (least recently used evicted)
+
+# Instrumentation: comma-separated extra metrics sinks ('json' logs one line per span);
+# the in-memory registry (also served at the API's /metrics) is always enabled
+METRICS_SINKS = os.environ.get("METRICS_SINKS", "memory")
+
 # Prophet model parameters
 PROPHET_PARAMS = {
     "yearly_seasonality": True,
     "weekly_seasonality": True,
     "daily_seasonality": False,
 }
+
+# Streaming pipeline: overlap downloads with per-ticker forecasting (see src.pipeline)
+PIPELINE_STREAMING = os.environ.get("PIPELINE_STREAMING", "false").lower() == "true"
+PIPELINE_QUEUE_SIZE = 16  # Tickers buffered between extraction and forecasting
+
+# Forecasting execution
+# Number of worker processes used to fit per-ticker Prophet models (1 = serial)
+FORECAST_MAX_WORKERS = int(os.environ.get("FORECAST_MAX_WORKERS", "1"))
+# Trading days forecast per ticker (1 = next day only); longer horizons are predicted
+# from a single fit and overlaid on the history for multi-day rebalancing
+FORECAST_HORIZON = int(os.environ.get("FORECAST_HORIZON", "1"))
+# Directory of fitted models used to warm-start daily refits; unset disables persistence
+MODEL_STORE_DIR = os.environ.get("MODEL_STORE_DIR")
+# Reuse a stored model without refitting when the price series is unchanged
+MODEL_REUSE_IF_UNCHANGED = os.environ.get("MODEL_REUSE_IF_UNCHANGED", "false").lower() == "true"
+# Cache of next-day forecasts keyed by ticker, price series and effective params, so
+# re-running with different risk settings skips forecasting
+FORECAST_CACHE_ENABLED = os.environ.get("FORECAST_CACHE", "true").lower() == "true"
+FORECAST_CACHE_SIZE = 4096  # Forecasts kept in memory
+# Directory persisting cached forecasts across restarts; unset keeps them in memory only
+FORECAST_CACHE_DIR = os.environ.get("FORECAST_CACHE_DIR")
+FORECAST_CACHE_MAX_BYTES = 16 * 2**20  # Size budget of FORECAST_CACHE_DIR
@@ -0,0 +1,226 @@
+"""Tests for prediction accuracy scoring and the accuracy API."""
+
+from datetime import date
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src import database
+from src.accuracy import load_closes, refresh_accuracy, score_predictions
+from src.database import PredictionAccuracy, save_many_results_to_db
+from src.price_store import PriceStore
+
+
+def _store_closes(store: PriceStore, symbol: str, closes: dict[str, float]) -> None:
+    """Save daily closes for a symbol in the price store."""
+    index = pd.DatetimeIndex(pd.to_datetime(list(closes)), name="Date")
+    store.save(symbol, pd.DataFrame({"Close": list(closes.values())}, index=index), index[0])
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """Point the database module at a fresh SQLite file."""
+    with (
+        patch.object(database, "DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}"),
+        patch.object(database, "SessionLocal", None),
+    ):
+        database.init_db()
+        yield
+        database.SessionLocal.kw["bind"].dispose()
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Price store with closes for AAPL (Wed-Fri, Mon) and MSFT (Wed-Thu)."""
+    store = PriceStore(tmp_path / "prices")
+    _store_closes(
+        store,
+        "AAPL",
+        {"2024-01-03": 100.0, "2024-01-04": 102.0, "2024-01-05": 101.0, "2024-01-08": 104.0},
+    )
+    _store_closes(store, "MSFT", {"2024-01-03": 200.0, "2024-01-04": 190.0})
+    return store
+
+
+def _scores() -> dict[tuple[date, str], PredictionAccuracy]:
+    """Stored scores keyed by (as_of_date, ticker)."""
+    session = database.SessionLocal()
+    try:
+        return {(s.as_of_date, s.ticker): s for s in session.query(PredictionAccuracy).all()}
+    finally:
+        session.close()
+
+
+class TestScorePredictions:
+    """Test the vectorised scoring of predictions against closes."""
+
+    def test_metrics_and_alignment(self, store) -> None:
+        """Test errors, direction hits and matching weekend dates to the next close."""
+        predictions = pd.DataFrame(
+            {
+                "as_of_date": [
+                    date(2024, 1, 4), date(2024, 1, 6), date(2024, 1, 4), date(2024, 1, 3)
+                ],
+                "ticker": ["AAPL", "AAPL", "MSFT", "MSFT"],
+                "predicted_price": [101.0, 102.0, 210.0, 205.0],
+            }
+        )
+        scores = score_predictions(predictions, load_closes(store, ["AAPL", "MSFT"]))
+        by_key = {(row.as_of_date, row.ticker): row for row in scores.itertuples()}
+
+        aapl = by_key[(date(2024, 1, 4), "AAPL")]
+        assert aapl.close_date == date(2024, 1, 4)
+        assert aapl.error == pytest.approx(-1.0)
+        assert aapl.abs_pct_error == pytest.approx(100 / 102)
+        assert aapl.accuracy == pytest.approx(100 - 100 / 102)
+        assert aapl.direction_hit is True  # Predicted up from 100, closed up at 102
+
+        # Saturday prediction is scored against Monday's close, Friday being the reference
+        weekend = by_key[(date(2024, 1, 6), "AAPL")]
+        assert weekend.close_date == date(2024, 1, 8)
+        assert weekend.previous_close == 101.0
+        assert weekend.direction_hit is True
+
+        msft = by_key[(date(2024, 1, 4), "MSFT")]
+        assert msft.direction_hit is False  # Predicted up, closed down
+        assert msft.accuracy == pytest.approx(100 - 100 * 20 / 190)
+
+        # First cached bar: no previous close to score the direction against
+        assert by_key[(date(2024, 1, 3), "MSFT")].direction_hit is None
+
+    def test_unmatched_predictions_are_left_out(self, store) -> None:
+        """Test predictions without a close within the lag or before the cutoff are skipped."""
+        predictions = pd.DataFrame(
+            {
+                "as_of_date": [date(2024, 1, 5), date(2024, 1, 9), date(2024, 1, 4)],
+                "ticker": ["MSFT", "AAPL", "TSLA"],
+                "predicted_price": [1.0, 1.0, 1.0],
+            }
+        )
+        closes = load_closes(store, ["AAPL", "MSFT", "TSLA"])
+        assert score_predictions(predictions, closes).empty
+
+        cutoff = load_closes(store, ["AAPL"], before=date(2024, 1, 8))
+        assert cutoff["date"].max() == pd.Timestamp("2024-01-05")
+
+
+class TestRefreshAccuracy:
+    """Test incremental persistence of accuracy scores."""
+
+    def test_scores_new_closes_incrementally(self, sqlite_db, store) -> None:
+        """Test only unscored predictions are evaluated as closes arrive."""
+        save_many_results_to_db(
+            {"date": day, "predictions": {"AAPL": 103.0, "MSFT": 195.0}}
+            for day in (date(2024, 1, 4), date(2024, 1, 5))
+        )
+
+        assert refresh_accuracy(store, today=date(2024, 1, 10)) == 3  # No MSFT close on the 5th
+        assert set(_scores()) == {
+            (date(2024, 1, 4), "AAPL"),
+            (date(2024, 1, 4), "MSFT"),
+            (date(2024, 1, 5), "AAPL"),
+        }
+        assert refresh_accuracy(store, today=date(2024, 1, 10)) == 0
+
+        _store_closes(
+            store, "MSFT", {"2024-01-03": 200.0, "2024-01-04": 190.0, "2024-01-05": 196.0}
+        )
+        assert refresh_accuracy(store, today=date(2024, 1, 10)) == 1
+        assert _scores()[(date(2024, 1, 5), "MSFT")].direction_hit is True
+
+    def test_resaved_predictions_are_rescored(self, sqlite_db, store) -> None:
+        """Test an upserted prediction replaces its previous score."""
+        save_many_results_to_db([{"date": date(2024, 1, 4), "predictions": {"AAPL": 90.0}}])
+        refresh_accuracy(store, today=date(2024, 1, 10))
+        assert _scores()[(date(2024, 1, 4), "AAPL")].direction_hit is False
+
+        save_many_results_to_db(
+            [{"date": date(2024, 1, 4), "predictions": {"AAPL": 102.0}}], upsert=True
+        )
+        assert refresh_accuracy(store, today=date(2024, 1, 10)) == 1
+        score = _scores()[(date(2024, 1, 4), "AAPL")]
+        assert score.predicted_price == 102.0
+        assert score.accuracy == 100.0
+
+        assert refresh_accuracy(store, rebuild=True, today=date(2024, 1, 10)) == 1
+        assert len(_scores()) == 1
+
+
+    def test_scores_against_run_closes(self, sqlite_db) -> None:
+        """Test closes extracted by a run score predictions without a price store."""
+        save_many_results_to_db([{"date": date(2024, 1, 4), "predictions": {"AAPL": 103.0}}])
+        closes = pd.Series(
+            [100.0, 102.0], index=[date(2024, 1, 3), date(2024, 1, 4)], name="Price"
+        )
+
+        assert refresh_accuracy(prices={"AAPL": closes}, today=date(2024, 1, 10)) == 1
+        score = _scores()[(date(2024, 1, 4), "AAPL")]
+        assert score.actual_price == 102.0
+        assert score.direction_hit is True
+
+        with pytest.raises(ValueError):
+            refresh_accuracy()
+
+    def test_unscorable_predictions_age_out(self, sqlite_db, store) -> None:
+        """Test old unscored predictions are skipped by incremental refreshes, not rebuilds."""
+        save_many_results_to_db(
+            [{"date": date(2024, 1, 4), "predictions": {"AAPL": 103.0, "TSLA": 250.0}}]
+        )
+        assert refresh_accuracy(store, today=date(2024, 3, 1)) == 1  # No TSLA closes
+
+        _store_closes(store, "TSLA", {"2024-01-03": 240.0, "2024-01-04": 248.0})
+        assert refresh_accuracy(store, today=date(2024, 3, 1)) == 0
+        assert refresh_accuracy(store, today=date(2024, 1, 10)) == 1
+        assert refresh_accuracy(store, rebuild=True, today=date(2024, 3, 1)) == 2
+
+
+class TestAccuracyEndpoint:
+    """Test /api/accuracy serves stored scores without fetching market data."""
+
+    @pytest.fixture
+    def client(self, sqlite_db, store):
+        """API client over scores for 2024-01-03..05."""
+        save_many_results_to_db(
+            {"date": day, "predictions": {"AAPL": 103.0}}
+            for day in (date(2024, 1, 3), date(2024, 1, 4), date(2024, 1, 5))
+        )
+        refresh_accuracy(store, today=date(2024, 1, 10))
+        from api.main import app
+
+        with patch("yfinance.download", side_effect=AssertionError("network call")):
+            yield TestClient(app)
+
+    def test_latest_scores_with_window_aggregates(self, client) -> None:
+        """Test the latest date is returned with trailing-window MAPE and hit rate."""
+        rows = client.get("/api/accuracy/").json()
+        assert len(rows) == 1
+        row = rows[0]
+        assert row["date"] == "2024-01-05"
+        assert row["actual_price"] == 101.0
+        assert row["direction_hit"] is False  # Predicted up from 102, closed down at 101
+        assert row["samples"] == 3
+        assert row["mape"] == pytest.approx(100 * (3 / 100 + 1 / 102 + 2 / 101) / 3)
+        # Jan 3 has no previous close; Jan 4 is a hit and Jan 5 a miss
+        assert row["hit_rate"] == pytest.approx(50.0)
+
+        narrow = client.get("/api/accuracy/", params={"window": 2}).json()[0]
+        assert narrow["samples"] == 2
+        assert narrow["mape"] == pytest.approx(100 * (1 / 102 + 2 / 101) / 2)
+
+    def test_rolling_series(self, client) -> None:
+        """Test the rolling series over a 2-day window."""
+        rows = client.get(
+            "/api/accuracy/rolling", params={"window": 2, "start_date": "2024-01-04"}
+        ).json()
+        assert [row["date"] for row in rows] == ["2024-01-04", "2024-01-05"]
+        assert rows[0]["samples"] == 2
+        assert rows[0]["mape"] == pytest.approx(100 * (3 / 100 + 1 / 102) / 2)
+        assert client.get("/api/accuracy/rolling", params={"tickers": "TSLA"}).json() == []
+
+    def test_empty_table(self, sqlite_db) -> None:
+        """Test an empty list is returned before anything is scored."""
+        from api.main import app
+
+        assert TestClient(app).get("/api/accuracy/").json() == []
@@ -1,181 +1,163 @@
 """Tests for database module."""
 
-import json
 import uuid
-from datetime import date
-from unittest.mock import MagicMock, patch
+from datetime import date, timedelta
+from unittest.mock import patch
 
 import pytest
-
-from src.database import get_supabase_client, save_results_to_supabase
-from src.settings import SUPABASE_TABLE_NAME
-
-
-class TestGetSupabaseClient:
-    """Test Supabase client creation."""
-
-    @patch.dict(
-        "os.environ", {"SUPABASE_URL": "https://test.supabase.co", "SUPABASE_KEY": "test-key"}
-    )
-    @patch("src.database.create_client")
-    def test_get_supabase_client_with_credentials(self, mock_create_client: MagicMock) -> None:
-        """Test get_supabase_client returns client when credentials are available."""
-        mock_client = MagicMock()
-        mock_create_client.return_value = mock_client
-
-        result = get_supabase_client()
-
-        assert result is not None
-        assert result == mock_client
-        mock_create_client.assert_called_once_with("https://test.supabase.co", "test-key")
-
-    @patch.dict("os.environ", {}, clear=True)
-    def test_get_supabase_client_without_credentials(self) -> None:
-        """Test get_supabase_client returns None when both credentials are missing."""
-        result = get_supabase_client()
-        assert result is None
-
-
-class TestSaveResultsToSupabase:
-    """Test saving results to Supabase."""
-
-    @patch("src.database.get_supabase_client")
-    def test_save_results_to_supabase_success(self, mock_get_client: MagicMock) -> None:
-        """Test successfully saving results to Supabase."""
-        # Setup mocks
-        mock_client = MagicMock()
-        mock_table = MagicMock()
-        mock_insert = MagicMock()
-        mock_execute = MagicMock()
-
-        mock_client.table.return_value = mock_table
-        mock_table.insert.return_value = mock_insert
-        mock_insert.execute.return_value = mock_execute
-        mock_get_client.return_value = mock_client
-
-        # Test data
-        result = {
-            "date": date(2024, 1, 31),
-            "predictions": {"AAPL": 150.25, "MSFT": 380.50},
-            "predicted_returns": {"AAPL": 0.02, "MSFT": 0.015},
-            "weights": {"AAPL": 0.4, "MSFT": 0.6},
-            "actual_prices_last_month": {"AAPL": [148.0], "MSFT": [375.0]},
-        }
-
-        # Call function
-        save_results_to_supabase(result)
-
-        # Verify calls
-        mock_get_client.assert_called_once()
-        mock_client.table.assert_called_once_with(SUPABASE_TABLE_NAME)
-        mock_table.insert.assert_called_once()
-
-        # Check that insert was called with correct structure
-        insert_call_args = mock_table.insert.call_args[0][0]
-        assert len(insert_call_args) == 2  # Two stocks
-
-        # Check first row structure
-        first_row = insert_call_args[0]
-        assert "id" in first_row
-        assert "created_at" in first_row
-        assert "as_of_date" in first_row
-        assert "ticker" in first_row
-        assert "predicted_price" in first_row
-        assert "predicted_return" in first_row
-        assert "actual_prices_last_month" in first_row
-        assert "portfolio_weight" in first_row
-
-        # Check ID is a valid UUID string
-        uuid.UUID(first_row["id"])  # Will raise if invalid UUID
-
-        # Check values
-        assert first_row["ticker"] in ("AAPL", "MSFT")
-        assert first_row["as_of_date"] == "2024-01-31"
-        if first_row["ticker"] == "AAPL":
-            assert first_row["predicted_price"] == 150.25
-            assert first_row["predicted_return"] == 0.02
-            assert first_row["portfolio_weight"] == 0.4
-            actuals = json.loads(first_row["actual_prices_last_month"])
-            assert actuals == [148.0]
-        else:
-            assert first_row["predicted_price"] == 380.50
-            assert first_row["predicted_return"] == 0.015
-            assert first_row["portfolio_weight"] == 0.6
-            actuals = json.loads(first_row["actual_prices_last_month"])
-            assert actuals == [375.0]
-
-        mock_insert.execute.assert_called_once()
-
-    @patch("src.database.get_supabase_client")
-    def test_save_results_to_supabase_no_predictions(self, mock_get_client: MagicMock) -> None:
-        """Test save_results_to_supabase returns early when no predictions."""
-        mock_client = MagicMock()
-        mock_get_client.return_value = mock_client
-
-        result = {
-            "date": date(2024, 1, 31),
-            "predictions": {},
-            "predicted_returns": {},
-            "weights": {},
-            "actual_prices_last_month": {},
-        }
-
-        save_results_to_supabase(result)
-
-        # Should not attempt to insert
-        mock_client.table.assert_not_called()
-
-    @patch("src.database.get_supabase_client")
-    def test_save_results_to_supabase_missing_keys(self, mock_get_client: MagicMock) -> None:
-        """Test save_results_to_supabase handles missing keys gracefully."""
-        mock_client = MagicMock()
-        mock_table = MagicMock()
-        mock_insert = MagicMock()
-        mock_execute = MagicMock()
-
-        mock_client.table.return_value = mock_table
-        mock_table.insert.return_value = mock_insert
-        mock_insert.execute.return_value = mock_execute
-        mock_get_client.return_value = mock_client
-
-        # Missing predicted_returns and weights
-        result = {
-            "date": date(2024, 1, 31),
-            "predictions": {"AAPL": 150.25},
-            "actual_prices_last_month": {"AAPL": [148.0]},
-        }
-
-        save_results_to_supabase(result)
-
-        # Should still work, using defaults
-        insert_call_args = mock_table.insert.call_args[0][0]
-        assert len(insert_call_args) == 1
-        assert insert_call_args[0]["ticker"] == "AAPL"
-        assert insert_call_args[0]["predicted_price"] == 150.25
-        assert insert_call_args[0]["predicted_return"] == 0.0  # Default
-        assert insert_call_args[0]["portfolio_weight"] == 0.0  # Default
-        assert json.loads(insert_call_args[0]["actual_prices_last_month"]) == [148.0]
-
-    @patch("src.database.get_supabase_client")
-    def test_save_results_to_supabase_insert_failure(self, mock_get_client: MagicMock) -> None:
-        """Test save_results_to_supabase handles insertion failure."""
-        mock_client = MagicMock()
-        mock_table = MagicMock()
-        mock_insert = MagicMock()
-
-        mock_client.table.return_value = mock_table
-        mock_table.insert.return_value = mock_insert
-        mock_insert.execute.side_effect = Exception("Database connection error")
-        mock_get_client.return_value = mock_client
-
-        result = {
-            "date": date(2024, 1, 31),
-            "predictions": {"AAPL": 150.25},
-            "predicted_returns": {"AAPL": 0.02},
-            "weights": {"AAPL": 1.0},
-            "actual_prices_last_month": {"AAPL": [148.0]},
+from sqlalchemy import select
+
+from src import database
+from src.database import (
+    ForecastPoint,
+    OptimizationResult,
+    OptimizationRun,
+    save_many_results_to_db,
+    save_results_to_db,
+    save_results_to_supabase,
+)
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """Point the module at a fresh SQLite database for the duration of a test."""
+    with (
+        patch.object(database, "DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}"),
+        patch.object(database, "SessionLocal", None),
+    ):
+        database.init_db()
+        yield database.SessionLocal
+        database.SessionLocal.kw["bind"].dispose()
+
+
+def _result(as_of_date: date, scale: float = 1.0) -> dict:
+    """Optimisation result for two tickers."""
+    return {
+        "date": as_of_date,
+        "predictions": {"AAPL": 150.25 * scale, "MSFT": 380.50 * scale},
+        "predicted_returns": {"AAPL": 0.02, "MSFT": 0.015},
+        "weights": {"AAPL": 0.4, "MSFT": 0.6},
+        "actual_prices_last_month": {"AAPL": [148.0], "MSFT": [375.0]},
+    }
+
+
+def _stored(session_factory) -> list[OptimizationResult]:
+    """All stored optimisation rows ordered by date and ticker."""
+    with session_factory() as session:
+        return session.scalars(
+            select(OptimizationResult).order_by(
+                OptimizationResult.as_of_date, OptimizationResult.ticker
+            )
+        ).all()
+
+
+class TestSaveResults:
+    """Test saving optimisation results."""
+
+    def test_save_results_to_db_success(self, sqlite_db) -> None:
+        """Test one row is written per ticker with all columns populated."""
+        save_results_to_supabase({**_result(date(2024, 1, 31)), "parameters": {"risk_aversion": 2}})
+
+        rows = _stored(sqlite_db)
+        assert [row.ticker for row in rows] == ["AAPL", "MSFT"]
+        aapl = rows[0]
+        uuid.UUID(aapl.id)  # Will raise if invalid UUID
+        assert aapl.created_at is not None
+        assert aapl.as_of_date == date(2024, 1, 31)
+        assert aapl.predicted_price == 150.25
+        assert aapl.predicted_return == 0.02
+        assert aapl.portfolio_weight == 0.4
+        assert aapl.actual_prices_last_month == [148.0]
+
+        # Both rows reference the single run row
+        with sqlite_db() as session:
+            (run,) = session.scalars(select(OptimizationRun)).all()
+        assert {row.run_id for row in rows} == {run.run_id}
+        assert run.ticker_count == 2
+        assert run.parameters == {"risk_aversion": 2}
+
+    def test_save_results_no_predictions(self, sqlite_db) -> None:
+        """Test nothing is written when there are no predictions."""
+        save_results_to_db({"date": date(2024, 1, 31), "predictions": {}})
+        assert _stored(sqlite_db) == []
+
+    def test_save_results_missing_keys(self, sqlite_db) -> None:
+        """Test missing returns and weights default to zero."""
+        save_results_to_db(
+            {
+                "date": date(2024, 1, 31),
+                "predictions": {"AAPL": 150.25},
+                "actual_prices_last_month": {"AAPL": [148.0]},
+            }
+        )
+        (row,) = _stored(sqlite_db)
+        assert row.predicted_return == 0.0
+        assert row.portfolio_weight == 0.0
+        assert row.actual_prices_last_month == [148.0]
+
+    def test_save_results_insert_failure_rolls_back(self, sqlite_db) -> None:
+        """Test a failing write propagates the error and leaves stored rows untouched."""
+        save_results_to_db(_result(date(2024, 1, 31)))
+
+        with patch.object(database, "insert", side_effect=RuntimeError("connection lost")):
+            with pytest.raises(RuntimeError, match="connection lost"):
+                save_results_to_db(_result(date(2024, 1, 31), scale=2.0), upsert=True)
+
+        # The upsert's delete was rolled back together with the failed insert
+        assert [row.predicted_price for row in _stored(sqlite_db)] == [150.25, 380.50]
+
+    def test_save_many_results_and_upsert(self, sqlite_db) -> None:
+        """Test a backfill is written in one call and upsert replaces (date, ticker) rows."""
+        start = date(2024, 1, 1)
+        backfill = [_result(start + timedelta(days=offset)) for offset in range(30)]
+        assert save_many_results_to_db(backfill, batch_size=7) == 60
+        assert len(_stored(sqlite_db)) == 60
+
+        # Plain inserts keep duplicates, upserts replace them
+        save_results_to_db(_result(start))
+        assert len(_stored(sqlite_db)) == 62
+        save_many_results_to_db([_result(start, scale=2.0)], upsert=True)
+        rows = _stored(sqlite_db)
+        assert len(rows) == 60
+        first_day = [row for row in rows if row.as_of_date == start]
+        assert sorted(row.predicted_price for row in first_day) == [300.5, 761.0]
+
+    def test_upsert_collapses_batch_and_drops_replaced_runs(self, sqlite_db) -> None:
+        """Test a repeated date in one upsert keeps the last result and no orphan runs."""
+        day = date(2024, 1, 31)
+        save_results_to_db(_result(day))
+        horizon = [{"date": date(2024, 2, 1), "predicted_price": 1.0, "lower": 0.5, "upper": 2.0}]
+        repeated = [
+            {**_result(day, scale=2.0), "forecast_horizon": {"AAPL": horizon}},
+            {**_result(day, scale=3.0), "forecast_horizon": {"AAPL": horizon}},
+        ]
+
+        assert save_many_results_to_db(repeated, upsert=True) == 2
+
+        rows = _stored(sqlite_db)
+        assert [row.predicted_price for row in rows] == [150.25 * 3, 380.50 * 3]
+        with sqlite_db() as session:
+            runs = session.scalars(select(OptimizationRun.run_id)).all()
+            points = session.scalars(select(ForecastPoint)).all()
+        assert runs == [rows[0].run_id]
+        assert [point.run_id for point in points] == [rows[0].run_id]
+
+    def test_save_forecast_points(self, sqlite_db) -> None:
+        """Test multi-day forecasts are stored one row per step."""
+        result = _result(date(2024, 1, 31))
+        result["forecast_horizon"] = {
+            "AAPL": [
+                {"date": date(2024, 2, 1), "predicted_price": 151.0, "lower": 149.0, "upper": 153.0},
+                {"date": date(2024, 2, 2), "predicted_price": 152.0, "lower": 148.0, "upper": 156.0},
+            ]
         }
-
-        # Should propagate the exception
-        with pytest.raises(Exception, match="Database connection error"):
-            save_results_to_supabase(result)
+        save_results_to_db(result)
+        save_results_to_db(result, upsert=True)
+
+        with sqlite_db() as session:
+            points = session.scalars(select(ForecastPoint).order_by(ForecastPoint.step)).all()
+        assert [(point.step, point.target_date) for point in points] == [
+            (1, date(2024, 2, 1)),
+            (2, date(2024, 2, 2)),
+        ]
+        assert points[1].lower == 148.0 and points[1].upper == 156.0
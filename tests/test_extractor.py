@@ -1,10 +1,50 @@
 """Tests for extractor module."""
 
 from datetime import date
+from unittest.mock import patch
 
+import numpy as np
 import pandas as pd
+import pytest
 
-from src.extractor import extract_data
+from src.extractor import extract_data, extract_data_concurrent
+from src.price_store import PriceStore
+from src.providers import FixtureProvider, YFinanceProvider
+
+
+def _recorded_download(recorded: dict[str, pd.DataFrame], calls: list[list[str]]):
+    """Build a yf.download stand-in that replays recorded per-symbol bars."""
+
+    def download(tickers, start=None, end=None, **kwargs) -> pd.DataFrame:
+        symbols = list(tickers)
+        calls.append(symbols)
+        available = [symbol for symbol in symbols if symbol in recorded]
+        if not available:
+            return pd.DataFrame()
+        # yfinance returns failed symbols as all-NaN column groups in the same frame
+        frames = {
+            symbol: recorded.get(symbol, recorded[available[0]] * np.nan) for symbol in symbols
+        }
+        frame = pd.concat(frames, axis=1)
+        frame.index = frame.index.tz_localize("America/New_York")
+        return frame.loc[(frame.index >= pd.Timestamp(start, tz="America/New_York"))]
+
+    return download
+
+
+class _FlakyProvider(FixtureProvider):
+    """Fixture provider that raises configured errors before serving data."""
+
+    def __init__(self, frames: dict[str, pd.DataFrame], errors: dict[str, list[Exception]]):
+        super().__init__(frames)
+        self.errors = errors
+
+    def fetch(self, symbol, start_date, end_date, timeout=None) -> pd.DataFrame:
+        pending = self.errors.get(symbol)
+        if pending:
+            self.calls.append((symbol, start_date, end_date))
+            raise pending.pop(0)
+        return super().fetch(symbol, start_date, end_date, timeout=timeout)
 
 
 class TestExtractor:
@@ -40,3 +80,134 @@ class TestExtractor:
                 assert all(
                     pd.Timestamp(d) <= pd.Timestamp(end_date) for d in data[tickers[0]].index
                 )
+
+    def test_extract_data_with_fixture_provider(self, tmp_path) -> None:
+        """Test offline extraction through a fixture provider and local price store."""
+        dates = pd.bdate_range("2024-01-01", periods=30)
+        provider = FixtureProvider(
+            {
+                "MSFT": pd.DataFrame({"Close": np.linspace(300, 330, 30)}, index=dates),
+                "RELIANCE.NS": pd.DataFrame({"Close": np.linspace(2500, 2600, 30)}, index=dates),
+            }
+        )
+        store = PriceStore(tmp_path)
+
+        data = extract_data(
+            ["MSFT", "RELIANCE", "MISSING"],
+            start_date="2024-01-01",
+            end_date="2024-03-01",
+            provider=provider,
+            store=store,
+        )
+
+        assert set(data) == {"MSFT", "RELIANCE"}
+        assert len(data["MSFT"]) == 29  # First row dropped by pct_change
+        assert list(data["MSFT"].columns) == ["Price", "Returns"]
+        assert data["MSFT"].index.name == "Date"
+        assert all(isinstance(d, date) for d in data["RELIANCE"].index)
+        assert store.path_for("RELIANCE.NS").exists()
+        assert data["RELIANCE"].attrs["symbol"] == "RELIANCE.NS"
+        assert data["MSFT"].attrs["symbol"] == "MSFT"
+
+    def test_extract_data_batched_download(self) -> None:
+        """Test batch mode issues one download plus one '.NS' retry for empty tickers."""
+        dates = pd.bdate_range("2024-01-01", periods=20, name="Date")
+
+        def bars(start: float) -> pd.DataFrame:
+            close = np.linspace(start, start * 1.1, 20)
+            return pd.DataFrame(
+                {"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1e6},
+                index=dates,
+            )
+
+        recorded = {"AAPL": bars(180.0), "MSFT": bars(370.0), "TCS.NS": bars(3600.0)}
+        calls: list[list[str]] = []
+
+        with patch("src.providers.yf.download", _recorded_download(recorded, calls)):
+            data = extract_data(
+                ["AAPL", "TCS", "MSFT"],
+                start_date="2024-01-01",
+                end_date="2024-02-01",
+                provider=YFinanceProvider(),
+                mode="batch",
+            )
+
+        assert calls == [["AAPL", "TCS", "MSFT"], ["TCS.NS"]]
+        assert list(data) == ["AAPL", "TCS", "MSFT"]
+        assert len(data["TCS"]) == 19
+        assert np.isclose(data["MSFT"]["Price"].iloc[-1], 370.0 * 1.1)
+        assert all(isinstance(d, date) for d in data["AAPL"].index)
+
+    def test_split_batched_frame_leaves_download_untouched(self) -> None:
+        """Test splitting a batched download does not rewrite the caller's index."""
+        from src.providers import _split_batched_frame
+
+        dates = pd.date_range("2024-01-01 09:30", periods=3, freq="D", tz="America/New_York")
+        frame = pd.concat(
+            {"AAPL": pd.DataFrame({"Close": [1.0, 2.0, np.nan]}, index=dates)}, axis=1
+        )
+
+        split = _split_batched_frame(frame, ["AAPL", "MSFT"])
+
+        assert frame.index.equals(dates)
+        assert list(split["AAPL"].index) == list(pd.date_range("2024-01-01", periods=2))
+        assert split["MSFT"].empty
+
+    def test_extract_data_unknown_mode(self) -> None:
+        """Test an unknown extraction mode is rejected."""
+        with pytest.raises(ValueError, match="Unknown extraction mode"):
+            extract_data(["AAPL"], provider=FixtureProvider({}), mode="bogus")
+
+    def test_extract_data_concurrent_reports(self) -> None:
+        """Test concurrent mode retries transient errors and reports per-ticker outcomes."""
+        dates = pd.bdate_range("2024-01-01", periods=20)
+        close = pd.DataFrame({"Close": np.linspace(100, 110, 20)}, index=dates)
+        provider = _FlakyProvider(
+            {"AAPL": close, "MSFT": close, "INFY.NS": close, "BAD": close},
+            errors={
+                "AAPL": [ConnectionError("reset"), TimeoutError("slow")],
+                "BAD": [ValueError("malformed response")],
+            },
+        )
+
+        data, reports = extract_data_concurrent(
+            ["AAPL", "MSFT", "INFY", "BAD"],
+            start_date="2024-01-01",
+            end_date="2024-02-01",
+            provider=provider,
+            max_concurrency=2,
+            backoff=0.0,
+        )
+
+        assert list(data) == ["AAPL", "MSFT", "INFY"]
+        assert list(reports) == ["AAPL", "MSFT", "INFY", "BAD"]
+        assert reports["AAPL"].success and reports["AAPL"].attempts == 3
+        assert reports["MSFT"].attempts == 1
+        assert reports["INFY"].symbol == "INFY.NS"
+        assert not reports["BAD"].success
+        assert reports["BAD"].attempts == 1  # Non-transient errors are not retried
+        assert "malformed response" in reports["BAD"].error
+        assert all(report.latency >= 0 for report in reports.values())
+
+    def test_extract_data_concurrent_gives_up_after_retries(self) -> None:
+        """Test a ticker that keeps failing is reported once retries are exhausted."""
+        provider = _FlakyProvider({}, errors={"AAPL": [ConnectionError("down")] * 5})
+
+        data, reports = extract_data_concurrent(
+            ["AAPL"], provider=provider, max_retries=2, backoff=0.0
+        )
+
+        assert data == {}
+        assert reports["AAPL"].attempts == 3
+        assert reports["AAPL"].error == "ConnectionError: down"
+
+    def test_extract_data_concurrent_deadline(self) -> None:
+        """Test retries stop once the per-ticker time budget would be exceeded."""
+        provider = _FlakyProvider({}, errors={"AAPL": [ConnectionError("down")] * 5})
+
+        _, reports = extract_data_concurrent(
+            ["AAPL"], provider=provider, timeout=0.1, max_retries=5, backoff=0.2
+        )
+
+        assert reports["AAPL"].attempts == 1
+        assert reports["AAPL"].error.startswith("TimeoutError")
@@ -0,0 +1,89 @@
+"""Tests for the forecast cache."""
+
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from src.forecast_cache import ForecastCache
+from src.model import ProphetModel, effective_params
+
+
+def _series(seed: int = 0, periods: int = 100) -> pd.Series:
+    """Random-walk price series."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-01-01", periods=periods, freq="D")
+    return pd.Series(100 + np.cumsum(rng.normal(0, 0.5, periods)), index=dates)
+
+
+class TestForecastCache:
+    """Test keys, memory/disk storage and eviction."""
+
+    def test_key_depends_on_ticker_data_and_params(self) -> None:
+        """Test every input of a forecast changes the key."""
+        series = _series()
+        params = {"yearly_seasonality": True, "calendar": "XNYS"}
+        key = ForecastCache.key("AAPL", series, params)
+        assert key == ForecastCache.key("AAPL", series.copy(), dict(params))
+        assert key != ForecastCache.key("MSFT", series, params)
+        assert key != ForecastCache.key("AAPL", _series(seed=1), params)
+        assert key != ForecastCache.key("AAPL", series, {**params, "yearly_seasonality": False})
+
+    def test_memory_lru(self) -> None:
+        """Test the least recently used entry leaves memory first."""
+        cache = ForecastCache(max_entries=2)
+        cache.put("a", 1.0)
+        cache.put("b", 2.0)
+        assert cache.get("a") == 1.0
+        cache.put("c", 3.0)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1.0
+
+    def test_disk_store_survives_restart_and_is_bounded(self, tmp_path) -> None:
+        """Test entries are reloaded from disk and the directory stays within budget."""
+        cache = ForecastCache(tmp_path, max_entries=1)
+        cache.put("a", 1.5)
+        cache.put("b", 2.5)
+        assert cache.get("a") == 1.5  # Evicted from memory, read back from disk
+        assert ForecastCache(tmp_path).get("b") == 2.5
+
+        entry_size = (tmp_path / "a.json").stat().st_size
+        bounded = ForecastCache(tmp_path / "bounded", max_bytes=entry_size * 3)
+        for index in range(10):
+            bounded.put(f"k{index}", float(index))
+        files = list((tmp_path / "bounded").glob("*.json"))
+        assert sum(path.stat().st_size for path in files) <= entry_size * 3
+        assert (tmp_path / "bounded" / "k9.json").exists()
+
+    def test_predict_next_skips_fit_on_hit(self) -> None:
+        """Test a repeated forecast with the same data and params is served from cache."""
+        series = _series()
+        cache = ForecastCache()
+        first = ProphetModel(store=None, forecast_cache=cache).predict_next(series, key="AAPL")
+
+        model = ProphetModel(store=None, forecast_cache=cache)
+        with patch.object(ProphetModel, "fit", autospec=True, side_effect=ProphetModel.fit) as fit:
+            assert model.predict_next(series, key="AAPL") == first
+            fit.assert_not_called()
+
+            # Different params are a miss
+            model.predict_next(series, prophet_params={"yearly_seasonality": False}, key="AAPL")
+            fit.assert_called_once()
+
+    def test_predict_for_tickers_dispatches_only_misses(self) -> None:
+        """Test cached tickers are resolved in the parent before the process pool runs."""
+        cache = ForecastCache()
+        portfolio = {
+            ticker: pd.DataFrame({"Price": _series(seed)}) for seed, ticker in enumerate("ABC")
+        }
+        for ticker, df in portfolio.items():
+            cache.put(ForecastCache.key(ticker, df["Price"], effective_params(None, "XNYS")), 123.0)
+
+        model = ProphetModel(store=None, forecast_cache=cache)
+        with patch("src.model.ProcessPoolExecutor") as pool:
+            predictions, predicted_returns = model.predict_for_tickers(portfolio, max_workers=2)
+        pool.assert_not_called()
+        assert predictions == {"A": 123.0, "B": 123.0, "C": 123.0}
+        last_price = portfolio["A"]["Price"].iloc[-1]
+        assert np.isclose(predicted_returns["A"], (123.0 - last_price) / last_price)
+
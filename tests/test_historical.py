@@ -0,0 +1,151 @@
+"""Tests for the historical results API."""
+
+import json
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import database
+from src.database import save_many_results_to_db
+
+
+@pytest.fixture
+def client(tmp_path):
+    """API client backed by a SQLite database holding 10 days x 3 tickers."""
+    with (
+        patch.object(database, "DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}"),
+        patch.object(database, "SessionLocal", None),
+    ):
+        database.init_db()
+        save_many_results_to_db(
+            {
+                "date": date(2024, 1, 1) + timedelta(days=offset),
+                "predictions": {"AAPL": 100.0 + offset, "MSFT": 200.0, "NVDA": 300.0},
+                "weights": {"AAPL": 0.5, "MSFT": 0.5},
+                "actual_prices_last_month": {ticker: [1.0, 2.0] for ticker in ("AAPL", "MSFT")},
+            }
+            for offset in range(10)
+        )
+        from api.main import app
+
+        yield TestClient(app)
+        database.SessionLocal.kw["bind"].dispose()
+
+
+class TestHistoricalAll:
+    """Test pagination, filters, projection and streaming of /api/historical/all."""
+
+    def test_keyset_pages_cover_every_row_once(self, client) -> None:
+        """Test following X-Next-Cursor returns each row exactly once, newest first."""
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 7, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/api/historical/all", params=params)
+            assert response.status_code == 200
+            seen.extend(response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+        assert len(seen) == 30
+        assert len({(row["date"], row["ticker"]) for row in seen}) == 30
+        dates = [row["date"] for row in seen]
+        assert dates == sorted(dates, reverse=True)
+        by_ticker = {row["ticker"]: row for row in seen if row["date"] == "2024-01-10"}
+        assert by_ticker["AAPL"]["actual_history"] == [1.0, 2.0]
+        assert by_ticker["NVDA"]["actual_history"] == []
+
+    def test_filters_and_fields(self, client) -> None:
+        """Test date range, ticker filters and field selection."""
+        response = client.get(
+            "/api/historical/all",
+            params={
+                "start_date": "2024-01-03",
+                "end_date": "2024-01-05",
+                "tickers": "AAPL,NVDA",
+                "fields": "ticker,date,predicted_price",
+            },
+        )
+        rows = response.json()
+        assert len(rows) == 6
+        assert {row["ticker"] for row in rows} == {"AAPL", "NVDA"}
+        assert all(set(row) == {"ticker", "date", "predicted_price"} for row in rows)
+        assert "X-Next-Cursor" not in response.headers
+
+        assert client.get("/api/historical/all", params={"fields": "secret"}).status_code == 422
+        assert client.get("/api/historical/all", params={"cursor": "bogus"}).status_code == 400
+
+    def test_ndjson_export(self, client) -> None:
+        """Test NDJSON streams every matching row across internal pages."""
+        response = client.get(
+            "/api/historical/all",
+            params={"format": "ndjson", "limit": 4, "tickers": "MSFT", "fields": "date,weight"},
+        )
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert len(rows) == 10
+        assert rows[0] == {"date": "2024-01-10", "weight": 0.5}
+
+
+class TestHistoricalLatest:
+    """Test the cached latest snapshot."""
+
+    def test_latest_snapshot_etag_and_invalidation(self, client) -> None:
+        """Test polling gets 304s until a save invalidates the cached snapshot."""
+        first = client.get("/api/historical/latest")
+        assert first.status_code == 200
+        rows = first.json()
+        assert [row["ticker"] for row in rows] == ["AAPL", "MSFT", "NVDA"]
+        assert {row["date"] for row in rows} == {"2024-01-10"}
+        etag = first.headers["ETag"]
+
+        cached = client.get("/api/historical/latest", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        for header in (f'"other", W/{etag}', "*"):
+            listed = client.get("/api/historical/latest", headers={"If-None-Match": header})
+            assert listed.status_code == 304
+        other = client.get("/api/historical/latest", headers={"If-None-Match": 'W/"other"'})
+        assert other.status_code == 200
+
+        # A second run for the same date replaces the per-ticker rows in the snapshot
+        save_many_results_to_db(
+            [{"date": date(2024, 1, 10), "predictions": {"AAPL": 999.0}, "weights": {"AAPL": 1.0}}]
+        )
+        refreshed = client.get("/api/historical/latest", headers={"If-None-Match": etag})
+        assert refreshed.status_code == 200
+        assert refreshed.headers["ETag"] != etag
+        rows = refreshed.json()
+        assert len(rows) == 3
+        assert rows[0]["predicted_price"] == 999.0
+
+    def test_build_overlapping_invalidation_is_not_cached(self) -> None:
+        """Test a body built across an invalidation is served once but not cached."""
+        from api.routers.historical import LatestSnapshot
+
+        snapshot = LatestSnapshot(ttl=300)
+        payloads = iter([{"run": 1}, {"run": 2}])
+
+        def stale_build():
+            snapshot.invalidate()  # A save lands while the body is being built
+            return next(payloads)
+
+        assert json.loads(snapshot.get(stale_build)[0]) == {"run": 1}
+        assert json.loads(snapshot.get(lambda: next(payloads))[0]) == {"run": 2}
+        assert json.loads(snapshot.get(lambda: {"run": 3})[0]) == {"run": 2}
+
+    def test_latest_without_data(self, tmp_path) -> None:
+        """Test an empty database returns the no-data message."""
+        from api.routers.historical import latest_snapshot
+
+        with (
+            patch.object(database, "DATABASE_URL", f"sqlite:///{tmp_path / 'empty.db'}"),
+            patch.object(database, "SessionLocal", None),
+        ):
+            from api.main import app
+
+            latest_snapshot.invalidate()
+            response = TestClient(app).get("/api/historical/latest")
+            latest_snapshot.invalidate()
+        assert response.json() == {"message": "No data found"}
@@ -0,0 +1,81 @@
+"""Tests for instrumentation module."""
+
+import json
+import logging
+
+import pytest
+
+from src.instrumentation import JsonLogSink, MetricsRegistry, profiled
+
+
+class TestInstrumentation:
+    """Test spans, counters, sinks and profiling."""
+
+    def test_counters_and_spans(self) -> None:
+        """Test counters accumulate per label set and spans feed histograms."""
+        metrics = MetricsRegistry()
+        metrics.increment("fits_total", start="warm")
+        metrics.increment("fits_total", 2, start="warm")
+        metrics.increment("fits_total", start="cold")
+        with metrics.span("optimise"):
+            pass
+        with pytest.raises(RuntimeError):
+            with metrics.span("optimise"):
+                raise RuntimeError("boom")
+
+        summary = metrics.summary()
+        assert summary["counters"]["fits_total"] == {'{start="warm"}': 3.0, '{start="cold"}': 1.0}
+        spans = summary["histograms"]["optimise_seconds"]
+        assert spans['{status="ok"}']["count"] == 1
+        assert spans['{status="error"}']["count"] == 1
+
+    def test_render_prometheus(self) -> None:
+        """Test the Prometheus text format has cumulative buckets, sum and count."""
+        metrics = MetricsRegistry()
+        metrics.increment("tickers_extracted_total", 5, outcome="ok")
+        metrics.observe("stage_seconds", 0.2, stage="forecast")
+        metrics.observe("stage_seconds", 3.0, stage="forecast")
+
+        text = metrics.render_prometheus()
+        assert "# TYPE portfolio_tickers_extracted_total counter" in text
+        assert 'portfolio_tickers_extracted_total{outcome="ok"} 5' in text
+        assert 'portfolio_stage_seconds_bucket{stage="forecast",le="0.25"} 1' in text
+        assert 'portfolio_stage_seconds_bucket{stage="forecast",le="+Inf"} 2' in text
+        assert 'portfolio_stage_seconds_count{stage="forecast"} 2' in text
+
+    def test_json_log_sink(self, caplog) -> None:
+        """Test the JSON sink logs one parseable line per span."""
+        metrics = MetricsRegistry([JsonLogSink()])
+        with caplog.at_level(logging.INFO, logger="src.instrumentation"):
+            with metrics.span("save", table="results"):
+                pass
+
+        payload = json.loads(caplog.records[-1].getMessage())
+        assert payload["event"] == "span"
+        assert payload["name"] == "save"
+        assert payload["table"] == "results"
+        assert payload["status"] == "ok"
+
+    def test_profiled_writes_cprofile_stats(self, tmp_path) -> None:
+        """Test the cProfile capture writes a stats file."""
+        output = tmp_path / "run.prof"
+        with profiled(output):
+            sum(range(1000))
+        assert output.stat().st_size > 0
+
+        with pytest.raises(ValueError, match="Unknown profiler"):
+            with profiled(profiler="perf"):
+                pass
+
+    def test_metrics_endpoint(self) -> None:
+        """Test the API serves the default registry as Prometheus text."""
+        from fastapi.testclient import TestClient
+
+        from api.main import app
+        from src.instrumentation import increment
+
+        increment("metrics_endpoint_test_total")
+        response = TestClient(app).get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "portfolio_metrics_endpoint_test_total 1" in response.text
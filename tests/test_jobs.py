@@ -0,0 +1,225 @@
+"""Tests for the API job manager."""
+
+import threading
+import time
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from api.jobs import FAILED, QUEUED, SUCCEEDED, JobManager, JobQueueFull
+
+
+def _wait_for(manager: JobManager, job_id: str, timeout: float = 5.0):
+    """Poll until the job has finished."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job.status in (SUCCEEDED, FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+class TestJobManager:
+    """Test job submission, progress and lifecycle."""
+
+    def test_job_succeeds_with_progress(self) -> None:
+        """Test a job reports stages and stores its result."""
+        manager = JobManager(max_workers=1)
+        release = threading.Event()
+
+        def work(progress):
+            progress("extract")
+            progress("forecast")
+            release.wait(5)
+            return {"weights": {"AAPL": 1.0}}
+
+        job = manager.submit("optimisation", work, stages=("extract", "forecast", "optimise"))
+        deadline = time.monotonic() + 5
+        while manager.get(job.id).stage != "forecast" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        running = manager.get(job.id).to_dict()
+        assert running["status"] == "running"
+        assert running["progress"] == pytest.approx(1 / 3, abs=1e-3)
+
+        release.set()
+        finished = _wait_for(manager, job.id)
+        assert finished.status == SUCCEEDED
+        assert finished.progress == 1.0
+        assert finished.result == {"weights": {"AAPL": 1.0}}
+        manager.shutdown()
+
+    def test_job_failure_and_unknown_id(self) -> None:
+        """Test failures are captured and unknown ids return None."""
+        manager = JobManager(max_workers=1)
+
+        def work(progress):
+            raise RuntimeError("no data")
+
+        job = _wait_for(manager, manager.submit("optimisation", work).id)
+        assert job.status == FAILED
+        assert job.error == "no data"
+        assert manager.get("missing") is None
+        manager.shutdown()
+
+    def test_jobs_run_concurrently_and_queue_is_bounded(self) -> None:
+        """Test workers run jobs side by side and excess submissions are rejected."""
+        manager = JobManager(max_workers=2, max_pending=1)
+        started = threading.Barrier(3, timeout=5)
+        release = threading.Event()
+
+        def work(progress):
+            started.wait()
+            release.wait(5)
+
+        first = manager.submit("optimisation", work)
+        second = manager.submit("optimisation", work)
+        # Both workers are busy at the same time
+        started.wait()
+        queued = manager.submit("optimisation", lambda progress: None)
+        assert manager.get(queued.id).status == QUEUED
+        with pytest.raises(JobQueueFull):
+            manager.submit("optimisation", lambda progress: None)
+
+        release.set()
+        for job in (first, second, queued):
+            assert _wait_for(manager, job.id).status == SUCCEEDED
+        manager.shutdown()
+
+    def test_finished_jobs_are_evicted(self) -> None:
+        """Test only the most recent finished jobs are retained."""
+        manager = JobManager(max_workers=1, history_size=2)
+        ids = [manager.submit("optimisation", lambda progress: None).id for _ in range(4)]
+        manager.shutdown()
+        assert manager.get(ids[0]) is None
+        assert manager.get(ids[-1]).status == SUCCEEDED
+
+    def test_run_endpoint_returns_job_id(self) -> None:
+        """Test POST /run queues a job that can be polled to completion."""
+        from fastapi.testclient import TestClient
+
+        from api.main import app
+
+        result = {"date": "2024-01-02", "weights": {"AAPL": 1.0}}
+        with (
+            patch("api.routers.optimization.run_optimisation", return_value=result),
+            patch("src.database.save_results_to_db") as save,
+        ):
+            client = TestClient(app)
+            response = client.post("/api/optimization/run", json={"tickers": ["AAPL"]})
+            assert response.status_code == 202
+            job_id = response.json()["data"]["job_id"]
+
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                job = client.get(f"/api/optimization/jobs/{job_id}").json()
+                if job["status"] in ("succeeded", "failed"):
+                    break
+                time.sleep(0.01)
+
+        assert job["status"] == "succeeded"
+        assert job["result"] == {"date": "2024-01-02", "weights": {"AAPL": 1.0}}
+        save.assert_called_once_with(result)
+        assert client.get("/api/optimization/jobs/unknown").status_code == 404
+
+    def test_duplicate_submissions_are_coalesced(self) -> None:
+        """Test a key already queued or running returns the same job without rerunning."""
+        manager = JobManager(max_workers=1)
+        release = threading.Event()
+        calls = []
+
+        def work(progress):
+            calls.append(1)
+            release.wait(5)
+            return "done"
+
+        first = manager.submit("optimisation", work, key="same")
+        second = manager.submit("optimisation", work, key="same")
+        other = manager.submit("optimisation", work, key="other")
+        assert second.id == first.id
+        assert other.id != first.id
+
+        release.set()
+        assert _wait_for(manager, first.id).result == "done"
+        _wait_for(manager, other.id)
+        assert len(calls) == 2
+        # Once finished, the key no longer coalesces
+        third = manager.submit("optimisation", lambda progress: None, key="same")
+        assert third.id != first.id
+        manager.shutdown()
+
+    def test_repeated_request_is_served_from_cache(self) -> None:
+        """Test identical requests run the optimisation once and then hit the cache."""
+        from fastapi.testclient import TestClient
+
+        from api.main import app
+        from api.result_cache import result_cache
+
+        result_cache.invalidate()
+        result = {"date": "2024-01-02", "weights": {"MSFT": 1.0}}
+        with (
+            patch("api.routers.optimization.run_optimisation", return_value=result) as run,
+            patch("src.database.save_results_to_db"),
+        ):
+            client = TestClient(app)
+            first = client.post("/api/optimization/run", json={"tickers": ["MSFT", "GOOG"]})
+            job_id = first.json()["data"]["job_id"]
+            deadline = time.monotonic() + 5
+            while client.get(f"/api/optimization/jobs/{job_id}").json()["status"] != "succeeded":
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+
+            # Same request with tickers reordered and lower-cased
+            second = client.post("/api/optimization/run", json={"tickers": ["goog", "MSFT"]})
+
+        assert second.status_code == 200
+        assert second.json()["data"]["status"] == "succeeded"
+        assert second.json()["data"]["result"] == {"date": "2024-01-02", "weights": {"MSFT": 1.0}}
+        run.assert_called_once()
+        result_cache.invalidate()
+
+    def test_frontier_endpoint_queues_a_job(self) -> None:
+        """Test POST /frontier runs through the job manager like /run."""
+        from fastapi.testclient import TestClient
+
+        from api.main import app
+        from api.result_cache import result_cache
+
+        result_cache.invalidate()
+        point = {
+            "risk_aversion": 1.0,
+            "weights": {"AAPL": 1.0},
+            "expected_return": 0.01,
+            "variance": 0.02,
+        }
+        result = {
+            "date": date(2024, 1, 2), "predicted_returns": {"AAPL": 0.01}, "frontier": [point]
+        }
+        with patch(
+            "api.routers.optimization.run_efficient_frontier", return_value=result
+        ) as frontier:
+            client = TestClient(app)
+            payload = {"tickers": ["AAPL"], "risk_aversions": [1.0]}
+            response = client.post("/api/optimization/frontier", json=payload)
+            assert response.status_code == 202
+            job_id = response.json()["data"]["job_id"]
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                job = client.get(f"/api/optimization/jobs/{job_id}").json()
+                if job["status"] in ("succeeded", "failed"):
+                    break
+                time.sleep(0.01)
+
+            cached = client.post("/api/optimization/frontier", json=payload)
+            invalid = client.post("/api/optimization/frontier", json={"risk_aversions": []})
+
+        assert job["kind"] == "frontier"
+        assert job["result"] == {
+            "date": "2024-01-02", "predicted_returns": {"AAPL": 0.01}, "frontier": [point]
+        }
+        assert cached.status_code == 200
+        assert cached.json()["data"]["result"] == job["result"]
+        frontier.assert_called_once()
+        assert invalid.status_code == 422
+        result_cache.invalidate()
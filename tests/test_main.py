@@ -0,0 +1,75 @@
+"""Tests for the main optimisation entry point."""
+
+import numpy as np
+import pandas as pd
+
+from src.main import _rolling_moments_with_prediction, rolling_moments_path
+from src.optimiser import RollingMoments
+from src.processor import preprocess_panel
+
+
+def _returns_data(periods: int, seed: int = 0) -> dict:
+    """Create a dict of DataFrames with random Price and Returns columns."""
+    rng = np.random.default_rng(seed)
+    dates = [d.date() for d in pd.date_range("2024-01-01", periods=periods, freq="D")]
+    return {
+        f"ASSET{i}": pd.DataFrame(
+            {
+                "Price": 100 + np.cumsum(rng.normal(0, 1, periods)),
+                "Returns": rng.normal(0.001 * i, 0.01, periods),
+            },
+            index=dates,
+        )
+        for i in range(3)
+    }
+
+
+class TestRollingMomentsState:
+    """Test the persisted rolling window used by run_optimisation."""
+
+    def test_earlier_end_date_does_not_look_ahead(self, tmp_path) -> None:
+        """Test a run ending before the stored state rebuilds from its panel and keeps the state."""
+        data = _returns_data(120)
+        full = preprocess_panel(data)
+        early = preprocess_panel({ticker: df.iloc[:80] for ticker, df in data.items()})
+        row = np.array([0.01, 0.02, 0.03])
+        base = tmp_path / "moments.npz"
+
+        _rolling_moments_with_prediction(full, row, str(base), window=30)
+        state_path = rolling_moments_path(base, full.tickers, 30)
+        stored_last = RollingMoments.load(state_path).last_date
+
+        predicted = _rolling_moments_with_prediction(early, row, str(base), window=30)
+
+        expected = RollingMoments.from_returns(early.returns_frame(), 30).with_row(row)
+        np.testing.assert_allclose(predicted.mean(), expected.mean(), atol=1e-12)
+        np.testing.assert_allclose(predicted.covariance(), expected.covariance(), atol=1e-12)
+        assert RollingMoments.load(state_path).last_date == stored_last
+
+    def test_state_is_keyed_by_tickers_and_window(self, tmp_path) -> None:
+        """Test other windows and ticker sets get their own state files."""
+        panel = preprocess_panel(_returns_data(60))
+        base = tmp_path / "moments.npz"
+
+        _rolling_moments_with_prediction(panel, np.zeros(3), str(base), window=20)
+        _rolling_moments_with_prediction(panel, np.zeros(3), str(base), window=40)
+
+        assert RollingMoments.load(rolling_moments_path(base, panel.tickers, 20)).window == 20
+        assert RollingMoments.load(rolling_moments_path(base, panel.tickers, 40)).window == 40
+        assert rolling_moments_path(base, panel.tickers[:2], 20) != rolling_moments_path(
+            base, panel.tickers, 20
+        )
+        assert list(tmp_path.glob("*.tmp")) == []
+
+    def test_masked_or_short_panel_uses_panel(self, tmp_path) -> None:
+        """Test union-aligned panels with gaps and panels shorter than the window skip the state."""
+        data = _returns_data(60)
+        data["ASSET2"] = data["ASSET2"].iloc[25:]  # Listed later: masked cells in union mode
+        union = preprocess_panel(data, mode="union", ffill_limit=0)
+        assert union.is_masked
+        base = tmp_path / "moments.npz"
+
+        assert _rolling_moments_with_prediction(union, np.zeros(3), str(base), window=20) is None
+        short = preprocess_panel(_returns_data(15))
+        assert _rolling_moments_with_prediction(short, np.zeros(3), str(base), window=20) is None
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,78 @@
+"""Tests for schema migrations."""
+
+from datetime import date, datetime
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, inspect, text
+
+from src.database import OptimizationResult
+from src.migrations import MIGRATIONS, current_version, upgrade
+from src.settings import SUPABASE_TABLE_NAME
+
+
+class TestMigrations:
+    """Test upgrading fresh and legacy databases."""
+
+    def test_fresh_database(self, tmp_path) -> None:
+        """Test a new database gets every table and index, and upgrading twice is a no-op."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+        assert upgrade(engine) == [version for version, _ in MIGRATIONS]
+        assert upgrade(engine) == []
+        assert current_version(engine) == MIGRATIONS[-1][0]
+
+        inspector = inspect(engine)
+        assert inspector.has_table(f"{SUPABASE_TABLE_NAME}_runs")
+        indexes = inspector.get_indexes(SUPABASE_TABLE_NAME)
+        assert ["as_of_date", "ticker", "created_at"] in [index["column_names"] for index in indexes]
+
+    def test_legacy_database_is_upgraded(self, tmp_path) -> None:
+        """Test a table created by the original schema gains run ids and indexes."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        with engine.begin() as connection:
+            connection.execute(
+                text(
+                    f"CREATE TABLE {SUPABASE_TABLE_NAME} (id VARCHAR PRIMARY KEY, "
+                    "created_at DATETIME, as_of_date DATE, ticker VARCHAR NOT NULL, "
+                    "predicted_price FLOAT NOT NULL, predicted_return FLOAT NOT NULL, "
+                    "actual_prices_last_month TEXT, portfolio_weight FLOAT NOT NULL)"
+                )
+            )
+            connection.execute(
+                text(
+                    f"INSERT INTO {SUPABASE_TABLE_NAME} VALUES ('1', :created, :day, 'AAPL', "
+                    "150.0, 0.01, '[148.0, 149.5]', 1.0)"
+                ),
+                {"created": datetime(2024, 1, 31, 18), "day": date(2024, 1, 31)},
+            )
+
+        upgrade(engine)
+
+        inspector = inspect(engine)
+        columns = {column["name"] for column in inspector.get_columns(SUPABASE_TABLE_NAME)}
+        assert "run_id" in columns
+        index_names = {index["name"] for index in inspector.get_indexes(SUPABASE_TABLE_NAME)}
+        assert {index.name for index in OptimizationResult.__table__.indexes} <= index_names
+
+        # Legacy JSON text is decoded by the new column type
+        with engine.connect() as connection:
+            row = connection.execute(OptimizationResult.__table__.select()).one()
+        assert row.actual_prices_last_month == [148.0, 149.5]
+        assert row.run_id is None
+
+        # Latest-date lookups use the composite index
+        with engine.connect() as connection:
+            plan = connection.execute(
+                text(f"EXPLAIN QUERY PLAN SELECT max(as_of_date) FROM {SUPABASE_TABLE_NAME}")
+            ).all()
+        assert "INDEX" in " ".join(str(step) for step in plan).upper()
+
+    def test_version_recorded_concurrently_is_skipped(self, tmp_path) -> None:
+        """Test a version another process recorded mid-upgrade is re-read, not an error."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'race.db'}")
+        upgrade(engine)
+
+        # Every version looks pending when checked, as if another worker had not
+        # committed yet; its record then collides with this worker's insert
+        with patch("src.migrations._is_applied", side_effect=[False, True] * len(MIGRATIONS)):
+            assert upgrade(engine) == []
+        assert current_version(engine) == MIGRATIONS[-1][0]
@@ -1,9 +1,21 @@
 """Tests for Prophet model module."""
 
+from unittest.mock import patch
+
 import numpy as np
 import pandas as pd
 
-from src.model import ProphetModel, _get_us_trading_holidays
+from src import model as model_module
+from src.model import (
+    ProphetModel,
+    _get_us_trading_holidays,
+    calendar_for_ticker,
+    get_trading_holidays,
+    load_holiday_table,
+    save_holiday_table,
+    trading_days_after,
+)
+from src.model_store import ModelStore, series_fingerprint
 
 
 class TestProphetModel:
@@ -84,6 +96,74 @@ class TestProphetModel:
         expected_return1 = (predictions["TICKER1"] - current_price1) / current_price1
         assert np.isclose(predicted_returns["TICKER1"], expected_return1, rtol=1e-5)
 
+    def test_predict_for_tickers_parallel(self) -> None:
+        """Test process-pool fitting returns the serial results in ticker order."""
+        dates = pd.date_range("2024-01-01", periods=100, freq="D")
+        rng = np.random.default_rng(42)
+
+        portfolio_data = {
+            ticker: pd.DataFrame(
+                {
+                    "Price": start + np.cumsum(rng.normal(0, 0.5, 100)),
+                    "Returns": rng.normal(0, 0.01, 100),
+                },
+                index=[d.date() for d in dates],
+            )
+            for ticker, start in (("TICKER3", 80.0), ("TICKER1", 100.0), ("TICKER2", 50.0))
+        }
+
+        serial_predictions, serial_returns = ProphetModel().predict_for_tickers(
+            portfolio_data, max_workers=1
+        )
+        # Bypass the forecast cache so the pool really fits the models
+        parallel_predictions, parallel_returns = ProphetModel(
+            cache_forecasts=False
+        ).predict_for_tickers(portfolio_data, max_workers=2)
+
+        assert list(parallel_predictions) == ["TICKER3", "TICKER1", "TICKER2"]
+        assert list(parallel_returns) == ["TICKER3", "TICKER1", "TICKER2"]
+        for ticker in portfolio_data:
+            assert np.isclose(parallel_predictions[ticker], serial_predictions[ticker], rtol=1e-4)
+            assert np.isclose(parallel_returns[ticker], serial_returns[ticker], atol=1e-6)
+
+    def test_predict_horizon(self) -> None:
+        """Test one fit forecasts every trading day of the horizon with intervals."""
+        dates = pd.bdate_range("2024-09-02", "2024-12-20")
+        rng = np.random.default_rng(1)
+        price_series = pd.Series(100 + np.cumsum(rng.normal(0, 0.5, len(dates))), index=dates)
+
+        model = ProphetModel(store=None, cache_forecasts=False)
+        forecast = model.predict_horizon(price_series, horizon=5)
+
+        # Christmas is skipped
+        assert list(forecast.index.strftime("%Y-%m-%d")) == [
+            "2024-12-23",
+            "2024-12-24",
+            "2024-12-26",
+            "2024-12-27",
+            "2024-12-30",
+        ]
+        assert (forecast["lower"] <= forecast["predicted_price"]).all()
+        assert (forecast["predicted_price"] <= forecast["upper"]).all()
+
+        step_returns = model_module.horizon_returns(price_series, forecast)
+        assert np.isclose(
+            step_returns[0], forecast["predicted_price"].iloc[0] / price_series.iloc[-1] - 1
+        )
+        assert np.isclose(
+            step_returns[1],
+            forecast["predicted_price"].iloc[1] / forecast["predicted_price"].iloc[0] - 1,
+        )
+
+    def test_trading_days_after_other_exchange(self) -> None:
+        """Test trading days follow the exchange calendar and start after a weekend."""
+        days = trading_days_after(pd.Timestamp("2024-08-10"), 3, "XNSE")
+        # 15 August (Independence Day) is an NSE holiday
+        assert list(days.strftime("%Y-%m-%d")) == ["2024-08-12", "2024-08-13", "2024-08-14"]
+        assert trading_days_after(pd.Timestamp("2024-08-14"), 1, "XNSE")[0] == pd.Timestamp(
+            "2024-08-16"
+        )
+
     def test_get_us_trading_holidays(self) -> None:
         """Test US trading holidays generation."""
         holidays = _get_us_trading_holidays(2024, 2024)
@@ -108,6 +188,43 @@ class TestProphetModel:
         # Check date format
         assert pd.api.types.is_datetime64_any_dtype(holidays["ds"])
 
+    def test_get_trading_holidays_is_memoised(self) -> None:
+        """Test holiday tables are built once per calendar and year range."""
+        first = get_trading_holidays("XNYS", 2023, 2025)
+        second = get_trading_holidays("XNYS", 2023, 2025)
+
+        assert first is second
+        assert ("XNYS", 2023, 2025) in model_module._HOLIDAY_CACHE
+
+    def test_get_trading_holidays_other_exchange(self) -> None:
+        """Test holidays can be generated for the NSE calendar used by '.NS' tickers."""
+        holidays = get_trading_holidays("XNSE", 2024, 2024)
+
+        assert len(holidays) > 0
+        assert holidays["ds"].dt.year.eq(2024).all()
+        assert calendar_for_ticker("RELIANCE.NS") == "XNSE"
+        assert calendar_for_ticker("AAPL") == "XNYS"
+
+    def test_holiday_table_round_trip(self, tmp_path) -> None:
+        """Test a persisted precomputed table serves later lookups by slicing."""
+        path = tmp_path / "holidays.json"
+        save_holiday_table(path, ["XNYS"], 2020, 2030)
+        expected = _get_us_trading_holidays(2024, 2024)
+
+        saved_cache = dict(model_module._HOLIDAY_CACHE)
+        saved_precomputed = dict(model_module._PRECOMPUTED_HOLIDAYS)
+        try:
+            load_holiday_table(path)
+            holidays = get_trading_holidays("XNYS", 2024, 2024)
+        finally:
+            model_module._HOLIDAY_CACHE.clear()
+            model_module._HOLIDAY_CACHE.update(saved_cache)
+            model_module._PRECOMPUTED_HOLIDAYS.clear()
+            model_module._PRECOMPUTED_HOLIDAYS.update(saved_precomputed)
+
+        assert list(holidays["ds"]) == list(expected["ds"])
+        assert list(holidays["holiday"]) == list(expected["holiday"])
+
     def test_fit_with_holidays(self) -> None:
         """Test that Prophet model includes holidays when fitting."""
         dates = pd.date_range("2024-01-01", periods=100, freq="D")
@@ -137,3 +254,39 @@ class TestProphetModel:
         assert model.model.yearly_seasonality is True
         assert model.model.weekly_seasonality is True
         assert model.model.daily_seasonality is False
+
+    def test_use_store_false_ignores_model_store_dir(self, tmp_path) -> None:
+        """Test use_store=False disables the store even when MODEL_STORE_DIR is set."""
+        with patch.object(model_module, "MODEL_STORE_DIR", str(tmp_path)):
+            assert ProphetModel().store is not None
+            assert ProphetModel(use_store=False).store is None
+
+    def test_model_store_warm_start_and_reuse(self, tmp_path) -> None:
+        """Test fitted models are persisted, warm-started and reused when data is unchanged."""
+        dates = pd.date_range("2024-01-01", periods=100, freq="D")
+        prices = 100 + np.cumsum(np.random.randn(100) * 0.5)
+        price_series = pd.Series(prices, index=dates)
+        store = ModelStore(tmp_path)
+
+        first = ProphetModel(store=store, cache_forecasts=False).predict_next(
+            price_series, key="TICKER1"
+        )
+        stored = store.load("TICKER1", {**model_module.PROPHET_PARAMS, "calendar": "XNYS"})
+        assert stored is not None
+        assert stored[1] == series_fingerprint(price_series)
+
+        # Identical data with reuse enabled skips fitting and returns the same forecast
+        reused = ProphetModel(store=store, reuse_if_unchanged=True, cache_forecasts=False)
+        assert np.isclose(reused.predict_next(price_series, key="TICKER1"), first)
+        assert reused.model.params["k"].tolist() == stored[0].params["k"].tolist()
+
+        # One extra day of data is warm-started from the stored parameters
+        extended = pd.concat(
+            [price_series, pd.Series([prices[-1] + 0.1], index=[dates[-1] + pd.Timedelta(days=1)])]
+        )
+        warm = ProphetModel(store=store, reuse_if_unchanged=True, cache_forecasts=False)
+        predicted = warm.predict_next(extended, key="TICKER1")
+        assert predicted > 0
+        assert store.load("TICKER1", {**model_module.PROPHET_PARAMS, "calendar": "XNYS"})[
+            1
+        ] == series_fingerprint(extended)
@@ -1,12 +1,38 @@
 """Tests for portfolio optimisation module."""
 
+from itertools import pairwise
+
 import numpy as np
 import pandas as pd
+import pytest
+from scipy.optimize import check_grad
 
 from src.optimiser import (
+    FactorCovariance,
+    RollingMoments,
+    _mean_variance_objective,
     calculate_mean_variance,
+    efficient_frontier,
+    estimate_covariance,
     optimize_portfolio_mean_variance,
 )
+from src.processor import append_predictions, preprocess_panel
+
+
+def _random_returns_data(num_assets: int, periods: int = 252, seed: int = 0) -> dict:
+    """Create a dict of DataFrames with random Returns columns."""
+    rng = np.random.default_rng(seed)
+    dates = [d.date() for d in pd.date_range("2024-01-01", periods=periods, freq="D")]
+    return {
+        f"ASSET{i}": pd.DataFrame(
+            {
+                "Price": 100 + np.cumsum(rng.normal(0, 1, periods)),
+                "Returns": rng.normal(0.0005 * (i % 5), 0.01 + 0.002 * (i % 7), periods),
+            },
+            index=dates,
+        )
+        for i in range(num_assets)
+    }
 
 
 class TestPortfolioOptimisation:
@@ -102,3 +128,204 @@ class TestPortfolioOptimisation:
         assert np.isclose(sum(optimal_weights.values()), 1.0, rtol=1e-5)
         assert all(w >= min_allocation for w in optimal_weights.values())
         assert all(w <= 1.0 for w in optimal_weights.values())
+
+    def test_mean_variance_gradient_matches_finite_differences(self) -> None:
+        """Test the closed-form gradient agrees with a numerical gradient."""
+        rng = np.random.default_rng(1)
+        factors = rng.normal(size=(10, 10))
+        cov = factors @ factors.T / 10
+        mu = rng.normal(0, 0.01, 10)
+
+        error = check_grad(
+            lambda w: _mean_variance_objective(w, mu, cov, 5.0)[0],
+            lambda w: _mean_variance_objective(w, mu, cov, 5.0)[1],
+            np.full(10, 0.1),
+        )
+
+        assert error < 1e-6
+
+    def test_projected_gradient_matches_slsqp(self) -> None:
+        """Test the projected-gradient QP solver reaches at least the SLSQP optimum."""
+        data_dict = _random_returns_data(40)
+        mu, cov = calculate_mean_variance(data_dict)
+
+        slsqp = optimize_portfolio_mean_variance(
+            data_dict, minimum_allocation=0.0, maximum_allocation=0.2, solver="slsqp"
+        )
+        projected = optimize_portfolio_mean_variance(
+            data_dict, minimum_allocation=0.0, maximum_allocation=0.2, solver="projected_gradient"
+        )
+
+        assert list(projected) == list(data_dict)
+        assert np.isclose(sum(projected.values()), 1.0)
+        assert all(-1e-12 <= w <= 0.2 + 1e-12 for w in projected.values())
+        projected_value, _ = _mean_variance_objective(
+            np.array(list(projected.values())), mu.to_numpy(), cov.to_numpy(), 5.0
+        )
+        slsqp_value, _ = _mean_variance_objective(
+            np.array(list(slsqp.values())), mu.to_numpy(), cov.to_numpy(), 5.0
+        )
+        assert projected_value <= slsqp_value + 1e-8
+
+    def test_optimize_portfolio_infeasible_bounds(self) -> None:
+        """Test infeasible allocation bounds raise a clear error."""
+        data_dict = _random_returns_data(3)
+
+        with pytest.raises(ValueError, match="infeasible"):
+            optimize_portfolio_mean_variance(data_dict, minimum_allocation=0.5)
+
+    def test_efficient_frontier(self) -> None:
+        """Test the frontier sweep trades return for variance as risk aversion grows."""
+        data_dict = _random_returns_data(20)
+        risk_aversions = [1.0, 5.0, 20.0, 100.0]
+
+        frontier = efficient_frontier(
+            data_dict, risk_aversions, minimum_allocation=0.0, maximum_allocation=0.5
+        )
+
+        assert [point["risk_aversion"] for point in frontier] == risk_aversions
+        for point in frontier:
+            assert np.isclose(sum(point["weights"].values()), 1.0)
+            assert list(point["weights"]) == list(data_dict)
+        returns = [point["expected_return"] for point in frontier]
+        variances = [point["variance"] for point in frontier]
+        assert all(a >= b - 1e-9 for a, b in pairwise(returns))
+        assert all(a >= b - 1e-9 for a, b in pairwise(variances))
+
+        # Each point matches an independent single optimisation
+        single = optimize_portfolio_mean_variance(
+            data_dict, minimum_allocation=0.0, maximum_allocation=0.5, risk_aversion=5.0
+        )
+        assert np.allclose(list(frontier[1]["weights"].values()), list(single.values()), atol=1e-3)
+
+    def test_estimate_covariance_methods(self) -> None:
+        """Test shrinkage and EWMA estimators return symmetric positive definite matrices."""
+        data_dict = _random_returns_data(30, periods=40)
+        returns_df = pd.DataFrame({ticker: df["Returns"] for ticker, df in data_dict.items()})
+
+        for method in ("ledoit_wolf", "ewma"):
+            cov = estimate_covariance(returns_df, method=method)
+            assert isinstance(cov, pd.DataFrame)
+            assert list(cov.index) == list(returns_df.columns)
+            assert np.allclose(cov.to_numpy(), cov.to_numpy().T)
+            assert np.linalg.eigvalsh(cov.to_numpy())[0] > 0
+
+        with pytest.raises(ValueError, match="Unknown covariance method"):
+            estimate_covariance(returns_df, method="bogus")
+
+    def test_factor_covariance(self) -> None:
+        """Test the factored covariance matches its dense form and preserves variances."""
+        data_dict = _random_returns_data(50, periods=120)
+        returns_df = pd.DataFrame({ticker: df["Returns"] for ticker, df in data_dict.items()})
+
+        cov = estimate_covariance(returns_df, method="factor", n_factors=5)
+
+        assert isinstance(cov, FactorCovariance)
+        assert cov.loadings.shape == (50, 5)
+        weights = np.random.default_rng(0).random(50)
+        dense = cov.to_dense().to_numpy()
+        assert np.allclose(cov @ weights, dense @ weights)
+        assert np.allclose(np.diag(dense), returns_df.var().to_numpy())
+        assert cov.max_eigenvalue() >= np.linalg.eigvalsh(dense)[-1] - 1e-12
+
+    def test_optimize_with_factor_covariance(self) -> None:
+        """Test both solvers optimise directly against the factored covariance."""
+        data_dict = _random_returns_data(300, periods=120)
+
+        for solver in ("slsqp", "projected_gradient"):
+            weights = optimize_portfolio_mean_variance(
+                data_dict,
+                minimum_allocation=0.0,
+                maximum_allocation=0.05,
+                solver=solver,
+                covariance_method="factor",
+            )
+            assert len(weights) == 300
+            assert np.isclose(sum(weights.values()), 1.0)
+            assert all(-1e-9 <= w <= 0.05 + 1e-9 for w in weights.values())
+
+    def test_rolling_moments_match_batch_window(self) -> None:
+        """Test incremental add/drop updates reproduce the trailing-window statistics."""
+        data = _random_returns_data(num_assets=5, periods=400)
+        returns_df = pd.DataFrame({ticker: df["Returns"] for ticker, df in data.items()})
+
+        moments = RollingMoments.from_returns(returns_df.iloc[:300], window=100)
+        assert len(moments) == 100
+        assert moments.update(returns_df) == 100
+        assert moments.last_date == returns_df.index[-1]
+
+        mu, cov = calculate_mean_variance(moments)
+        expected_mu, expected_cov = calculate_mean_variance(data, lookback_days=100)
+        np.testing.assert_allclose(mu.to_numpy(), expected_mu.to_numpy(), atol=1e-12)
+        np.testing.assert_allclose(cov.to_numpy(), expected_cov.to_numpy(), atol=1e-12)
+
+        # Re-applying the same rows is a no-op
+        assert moments.update(returns_df) == 0
+
+    def test_rolling_moments_with_row_and_persistence(self, tmp_path) -> None:
+        """Test prediction rows are added to a copy and the state survives save/load."""
+        data = _random_returns_data(num_assets=3, periods=60)
+        returns_df = pd.DataFrame({ticker: df["Returns"] for ticker, df in data.items()})
+        moments = RollingMoments.from_returns(returns_df, window=20)
+
+        predicted = moments.with_row(np.array([0.01, 0.02, 0.03]))
+        assert len(predicted) == 20
+        assert moments.last_date == returns_df.index[-1]
+        prediction_row = pd.DataFrame([[0.01, 0.02, 0.03]], columns=returns_df.columns)
+        expected = pd.concat([returns_df.tail(19), prediction_row])
+        np.testing.assert_allclose(
+            predicted.mean().to_numpy(), expected.mean().to_numpy(), atol=1e-12
+        )
+
+        path = tmp_path / "moments.npz"
+        moments.save(path)
+        restored = RollingMoments.load(path)
+        assert restored.tickers == moments.tickers
+        assert restored.last_date == moments.last_date
+        np.testing.assert_allclose(
+            restored.covariance().to_numpy(), moments.covariance().to_numpy(), atol=1e-12
+        )
+
+        weights = optimize_portfolio_mean_variance(predicted, minimum_allocation=0.0)
+        assert list(weights) == moments.tickers
+        assert sum(weights.values()) == pytest.approx(1.0)
+
+    def test_calculate_mean_variance_from_panel(self) -> None:
+        """Test a panel gives the same statistics as the dict of DataFrames."""
+        data = _random_returns_data(num_assets=4, periods=300)
+        panel = preprocess_panel(data)
+
+        mu, cov = calculate_mean_variance(panel)
+        expected_mu, expected_cov = calculate_mean_variance(data)
+        np.testing.assert_allclose(mu.to_numpy(), expected_mu.to_numpy())
+        np.testing.assert_allclose(cov.to_numpy(), expected_cov.to_numpy())
+        assert list(optimize_portfolio_mean_variance(panel)) == panel.tickers
+
+    def test_calculate_mean_variance_honours_panel_masks(self) -> None:
+        """Test masked cells are excluded from the moments of a union-aligned panel."""
+        data = _random_returns_data(num_assets=3, periods=200)
+        late = data["ASSET2"].iloc[120:]
+        panel = preprocess_panel({**data, "ASSET2": late}, mode="union", ffill_limit=0)
+
+        mu, cov = calculate_mean_variance(panel)
+        assert mu["ASSET2"] == pytest.approx(late["Returns"].mean())
+        assert mu["ASSET0"] == pytest.approx(data["ASSET0"]["Returns"].mean())
+        assert cov.loc["ASSET2", "ASSET2"] == pytest.approx(late["Returns"].var())
+        assert np.linalg.eigvalsh(cov.to_numpy())[0] >= -1e-12
+
+        weights = optimize_portfolio_mean_variance(panel, minimum_allocation=0.0)
+        assert sum(weights.values()) == pytest.approx(1.0)
+
+    def test_calculate_mean_variance_with_overlay_row(self) -> None:
+        """Test the overlay panel matches appending the prediction row to every frame."""
+        data = _random_returns_data(num_assets=4, periods=300)
+        predictions = {ticker: 100.0 for ticker in data}
+        predicted_returns = {ticker: 0.001 * i for i, ticker in enumerate(data)}
+
+        overlay = append_predictions(preprocess_panel(data), predictions, predicted_returns)
+        appended = append_predictions(data, predictions, predicted_returns)
+
+        mu, cov = calculate_mean_variance(overlay)
+        expected_mu, expected_cov = calculate_mean_variance(appended)
+        np.testing.assert_allclose(mu.to_numpy(), expected_mu.to_numpy())
+        np.testing.assert_allclose(cov.to_numpy(), expected_cov.to_numpy())
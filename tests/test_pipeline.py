@@ -0,0 +1,145 @@
+"""Tests for the streaming pipeline module."""
+
+import threading
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.forecast_cache import ForecastCache
+from src.pipeline import StageTimings, run_streaming_forecast
+from src.providers import FixtureProvider
+
+
+def _price_frames(symbols: list[str], periods: int = 60) -> dict[str, pd.DataFrame]:
+    """Create random-walk Close bars for each symbol."""
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2024-01-01", periods=periods)
+    return {
+        symbol: pd.DataFrame({"Close": 100 + np.cumsum(rng.normal(0, 1, periods))}, index=dates)
+        for symbol in symbols
+    }
+
+
+class _SlowProvider(FixtureProvider):
+    """Fixture provider that delays selected symbols."""
+
+    def __init__(self, frames: dict[str, pd.DataFrame], delays: dict[str, float]):
+        super().__init__(frames)
+        self.delays = delays
+
+    def fetch(self, symbol, start_date, end_date, timeout=None):
+        time.sleep(self.delays.get(symbol, 0.0))
+        return super().fetch(symbol, start_date, end_date, timeout=timeout)
+
+
+def _fake_forecast(price_series, prophet_params, calendar, key, store, reuse_if_unchanged):
+    """Stand-in for a Prophet fit: predict a 1% move from the last price."""
+    time.sleep(0.05)
+    last_price = float(price_series.iloc[-1])
+    return last_price * 1.01, 0.01
+
+
+class TestPipeline:
+    """Test the streaming extract/forecast executor."""
+
+    def test_streaming_forecast_overlaps_stages(self) -> None:
+        """Test fast tickers are forecast while a slow download is still running."""
+        provider = _SlowProvider(_price_frames(["FAST1", "FAST2", "SLOW"]), {"SLOW": 0.5})
+
+        with (
+            patch("src.pipeline._forecast_ticker", side_effect=_fake_forecast),
+            patch("src.pipeline.default_forecast_cache", return_value=None),
+        ):
+            result = run_streaming_forecast(
+                ["SLOW", "FAST1", "FAST2", "MISSING"],
+                "2024-01-01",
+                "2024-12-31",
+                provider=provider,
+                store=None,
+                forecast_workers=1,
+                queue_size=1,
+            )
+
+        # Outputs follow the requested ticker order and skip tickers without data
+        assert list(result.predictions) == ["SLOW", "FAST1", "FAST2"]
+        assert list(result.all_stock_data) == ["SLOW", "FAST1", "FAST2"]
+        assert result.predicted_returns["FAST1"] == 0.01
+        assert not result.reports["MISSING"].success
+
+        extract = result.timings.stages["extract"]
+        forecast = result.timings.stages["forecast"]
+        assert extract.count == 4
+        assert forecast.count == 3
+        # Forecasting started before the slowest download finished
+        assert forecast.first_start < extract.last_end
+
+    def test_streaming_forecast_uses_forecast_cache(self) -> None:
+        """Test a repeated run serves every ticker from the forecast cache."""
+        provider = _SlowProvider(_price_frames(["CACHED1", "CACHED2"]), {})
+        cache = ForecastCache()
+
+        with (
+            patch("src.pipeline._forecast_ticker", side_effect=_fake_forecast) as forecast,
+            patch("src.pipeline.default_forecast_cache", return_value=cache),
+        ):
+            first = run_streaming_forecast(
+                ["CACHED1", "CACHED2"], "2024-01-01", "2024-12-31", provider=provider, store=None
+            )
+            second = run_streaming_forecast(
+                ["CACHED1", "CACHED2"], "2024-01-01", "2024-12-31", provider=provider, store=None
+            )
+
+        assert forecast.call_count == 2
+        assert second.predictions == first.predictions
+        assert "forecast" not in second.timings.stages
+
+    def test_failed_forecast_releases_producer(self) -> None:
+        """Test a raising forecast stops the extraction thread instead of leaving it blocked."""
+        symbols = [f"T{i}" for i in range(8)]
+        provider = _SlowProvider(_price_frames(symbols), {})
+
+        with (
+            patch("src.pipeline._forecast_ticker", side_effect=RuntimeError("fit failed")),
+            patch("src.pipeline.default_forecast_cache", return_value=None),
+            pytest.raises(RuntimeError, match="fit failed"),
+        ):
+            run_streaming_forecast(
+                symbols,
+                "2024-01-01",
+                "2024-12-31",
+                provider=provider,
+                store=None,
+                forecast_workers=1,
+                queue_size=1,
+            )
+
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and any(
+            thread.name == "pipeline-extract" for thread in threading.enumerate()
+        ):
+            time.sleep(0.05)
+        assert not any(thread.name == "pipeline-extract" for thread in threading.enumerate())
+
+    def test_streaming_forecast_empty(self) -> None:
+        """Test an empty universe returns empty results."""
+        result = run_streaming_forecast([], "2024-01-01", "2024-12-31", provider=FixtureProvider({}))
+        assert result.predictions == {}
+        assert result.timings.stages == {}
+
+    def test_stage_timings(self) -> None:
+        """Test stage aggregation and the summary table."""
+        timings = StageTimings(origin=0.0)
+        timings.record("forecast", 1.0, 3.0)
+        timings.record("forecast", 2.0, 5.0)
+        with timings.time("optimise"):
+            pass
+
+        forecast = timings.stages["forecast"]
+        assert forecast.count == 2
+        assert forecast.busy == 5.0
+        assert forecast.wall == 4.0
+        summary = timings.summary()
+        assert "forecast" in summary and "optimise" in summary
@@ -0,0 +1,144 @@
+"""Tests for the local price store and providers."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.price_store import PriceStore
+from src.providers import FixtureProvider
+
+
+def _make_bars(start: str, periods: int) -> pd.DataFrame:
+    """Create business-day bars with a 'Close' column."""
+    dates = pd.bdate_range(start, periods=periods)
+    return pd.DataFrame({"Close": 100 + np.arange(periods, dtype=float)}, index=dates)
+
+
+class TestPriceStore:
+    """Test incremental refresh of cached bars."""
+
+    def test_get_history_caches_full_range(self, tmp_path) -> None:
+        """Test the first request downloads the range and persists it."""
+        provider = FixtureProvider({"AAPL": _make_bars("2024-01-01", 40)})
+        store = PriceStore(tmp_path)
+
+        bars = store.get_history("AAPL", "2024-01-01", "2024-02-01", provider)
+
+        assert len(provider.calls) == 1
+        assert not bars.empty
+        assert bars.index.max() < pd.Timestamp("2024-02-01")
+        assert store.path_for("AAPL").exists()
+
+    def test_get_history_fetches_only_tail(self, tmp_path) -> None:
+        """Test a later request only fetches from the bar before the last cached one."""
+        provider = FixtureProvider({"AAPL": _make_bars("2024-01-01", 40)})
+        store = PriceStore(tmp_path)
+        store.get_history("AAPL", "2024-01-01", "2024-02-01", provider)
+
+        bars = store.get_history("AAPL", "2024-01-01", "2024-02-10", provider)
+
+        assert len(provider.calls) == 2
+        symbol, tail_start, tail_end = provider.calls[-1]
+        assert symbol == "AAPL"
+        assert tail_start == "2024-01-30"
+        assert tail_end == "2024-02-10"
+        expected = provider.frames["AAPL"].loc["2024-01-01":"2024-02-09"]
+        assert bars.index.equals(expected.index)
+        assert np.allclose(bars["Close"], expected["Close"])
+
+    def test_get_history_served_from_cache(self, tmp_path) -> None:
+        """Test a request inside the cached range makes no provider call."""
+        provider = FixtureProvider({"AAPL": _make_bars("2024-01-01", 40)})
+        store = PriceStore(tmp_path)
+        store.get_history("AAPL", "2024-01-01", "2024-02-01", provider)
+
+        bars = store.get_history("AAPL", "2024-01-10", "2024-01-20", provider)
+
+        assert len(provider.calls) == 1
+        assert bars.index.min() >= pd.Timestamp("2024-01-10")
+        assert bars.index.max() < pd.Timestamp("2024-01-20")
+
+    def test_get_history_fetches_missing_head(self, tmp_path) -> None:
+        """Test requesting earlier history fetches only the missing head range."""
+        provider = FixtureProvider({"AAPL": _make_bars("2023-12-01", 60)})
+        store = PriceStore(tmp_path)
+        store.get_history("AAPL", "2024-01-01", "2024-02-01", provider)
+
+        bars = store.get_history("AAPL", "2023-12-01", "2024-02-01", provider)
+
+        assert provider.calls[-1] == ("AAPL", "2023-12-01", "2024-01-01")
+        assert bars.index.min() == pd.Timestamp("2023-12-01")
+
+        # Head is now covered, so repeating the request needs no further calls
+        store.get_history("AAPL", "2023-12-01", "2024-02-01", provider)
+        assert len(provider.calls) == 2
+
+    def test_get_many_batches_tail_refresh(self, tmp_path) -> None:
+        """Test symbols sharing a missing tail are refreshed with one batched call."""
+        provider = FixtureProvider(
+            {"AAPL": _make_bars("2024-01-01", 40), "MSFT": _make_bars("2024-01-01", 40)}
+        )
+        store = PriceStore(tmp_path)
+        store.get_many(["AAPL", "MSFT"], "2024-01-01", "2024-02-01", provider)
+
+        frames = store.get_many(["AAPL", "MSFT"], "2024-01-01", "2024-02-10", provider)
+
+        assert provider.batch_calls == [
+            (("AAPL", "MSFT"), "2024-01-01", "2024-02-01"),
+            (("AAPL", "MSFT"), "2024-01-30", "2024-02-10"),
+        ]
+        assert provider.calls == []
+        assert frames["AAPL"].index.max() == pd.Timestamp("2024-02-09")
+        assert frames["MSFT"].index.max() == pd.Timestamp("2024-02-09")
+
+    def test_split_refetches_readjusted_history(self, tmp_path) -> None:
+        """Test a split re-based by the provider replaces the cached bars instead of mixing."""
+        before = _make_bars("2024-01-01", 60)
+        provider = FixtureProvider({"AAPL": before})
+        store = PriceStore(tmp_path)
+        store.get_history("AAPL", "2024-01-01", "2024-02-29", provider)
+
+        # 2:1 split on 2024-02-29: the provider halves every earlier close
+        after = before.copy()
+        after.loc[after.index < "2024-02-29", "Close"] /= 2
+        after.loc[after.index >= "2024-02-29", "Close"] = after["Close"].iloc[40] + 1
+        after["Stock Splits"] = np.where(after.index == "2024-02-29", 2.0, 0.0)
+        provider.frames["AAPL"] = after
+
+        bars = store.get_history("AAPL", "2024-01-01", "2024-03-10", provider)
+
+        assert provider.calls[-1] == ("AAPL", "2024-01-01", "2024-03-10")
+        assert np.allclose(bars["Close"], after.loc[:"2024-03-09", "Close"])
+        assert bars["Close"].pct_change().min() > -0.1
+        assert np.allclose(store.load("AAPL")["Close"], bars["Close"])
+
+    def test_dividend_adjustment_refetches_batched(self, tmp_path) -> None:
+        """Test re-scaled closes alone (no action columns) trigger a batched full refetch."""
+        provider = FixtureProvider(
+            {"AAPL": _make_bars("2024-01-01", 40), "MSFT": _make_bars("2024-01-01", 40)}
+        )
+        store = PriceStore(tmp_path)
+        store.get_many(["AAPL", "MSFT"], "2024-01-01", "2024-02-01", provider)
+
+        adjusted = provider.frames["AAPL"].copy()
+        adjusted["Close"] *= 0.99
+        provider.frames["AAPL"] = adjusted
+        frames = store.get_many(["AAPL", "MSFT"], "2024-01-01", "2024-02-10", provider)
+
+        assert provider.batch_calls[-1] == (("AAPL",), "2024-01-01", "2024-02-10")
+        assert np.allclose(frames["AAPL"]["Close"], adjusted.loc[:"2024-02-09", "Close"])
+        assert np.allclose(
+            frames["MSFT"]["Close"], provider.frames["MSFT"].loc[:"2024-02-09", "Close"]
+        )
+
+    def test_concurrent_saves_of_one_symbol(self, tmp_path) -> None:
+        """Test concurrent saves of the same symbol neither fail nor leave temp files."""
+        store = PriceStore(tmp_path)
+        bars = _make_bars("2024-01-01", 40)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: store.save("AAPL", bars, bars.index[0]), range(200)))
+
+        assert np.allclose(store.load("AAPL")["Close"], bars["Close"])
+        assert list(tmp_path.glob("*.tmp")) == []
@@ -4,8 +4,16 @@ from datetime import date, timedelta
 
 import numpy as np
 import pandas as pd
+import pytest
 
-from src.processor import append_predictions, collect_recent_prices, preprocess_data
+from src.processor import (
+    AlignedPanel,
+    AugmentedPanel,
+    append_predictions,
+    collect_recent_prices,
+    preprocess_data,
+    preprocess_panel,
+)
 
 
 class TestProcessor:
@@ -149,3 +157,152 @@ class TestProcessor:
         assert recent_prices["TICKER1"][0] == expected_start_price
         # Last value should be most recent price
         assert recent_prices["TICKER1"][-1] == float(df.iloc[-1]["Price"])
+
+    def test_preprocess_panel(self) -> None:
+        """Test the array-backed panel matches dict alignment and exposes views."""
+        dates1 = pd.date_range("2024-01-01", periods=10, freq="D")
+        dates2 = pd.date_range("2024-01-03", periods=8, freq="D")
+        data1 = pd.DataFrame(
+            {"Price": np.arange(10, dtype=float) + 100, "Returns": np.arange(10) * 0.001},
+            index=dates1.date,
+        )
+        data1.attrs["symbol"] = "RELIANCE.NS"
+        # Unsorted input with a duplicated date (the later row wins)
+        data2 = pd.DataFrame(
+            {"Price": np.arange(9, dtype=float) + 50, "Returns": np.arange(9) * 0.002},
+            index=list(dates2[::-1]) + [dates2[0]],
+        )
+        data_dict = {"TICKER1": data1, "TICKER2": data2}
+
+        panel = preprocess_panel(data_dict)
+        aligned = preprocess_data(data_dict)
+
+        assert isinstance(panel, AlignedPanel)
+        assert panel.tickers == ["TICKER1", "TICKER2"]
+        assert panel.dates.dtype == np.dtype("datetime64[D]")
+        assert panel.prices.shape == (8, 2)
+        assert panel.prices.flags.f_contiguous
+        for ticker in data_dict:
+            np.testing.assert_array_equal(
+                panel.price_series(ticker).to_numpy(), aligned[ticker]["Price"].to_numpy()
+            )
+            assert list(panel.to_dict()[ticker].index) == list(aligned[ticker].index)
+        assert panel.prices[0, 1] == 58.0
+
+        series = panel.price_series("TICKER1")
+        assert series.attrs["symbol"] == "RELIANCE.NS"
+        assert np.shares_memory(series.to_numpy(), panel.prices)
+        returns_df = panel.returns_frame(lookback_days=5)
+        assert returns_df.shape == (5, 2)
+        assert np.shares_memory(returns_df.to_numpy(), panel.returns)
+
+    def test_panel_downstream_stages(self) -> None:
+        """Test collect_recent_prices and append_predictions accept a panel."""
+        dates = pd.date_range("2024-01-01", periods=40, freq="D")
+        df = pd.DataFrame(
+            {"Price": np.linspace(100, 140, num=40), "Returns": np.full(40, 0.01)},
+            index=[d.date() for d in dates],
+        )
+        panel = preprocess_panel({"TICKER1": df})
+
+        assert collect_recent_prices(panel, days=30) == collect_recent_prices(
+            {"TICKER1": df}, days=30
+        )
+
+        updated = append_predictions(panel, {"TICKER1": 141.0}, {"TICKER1": 0.007})
+        assert isinstance(updated, AugmentedPanel)
+        assert updated.base is panel
+        assert len(updated) == len(panel) + 1
+        assert updated.overlay_date == np.datetime64(dates[-1].date() + timedelta(days=1))
+
+        window = updated.returns_frame(lookback_days=10)
+        assert window.shape == (10, 1)
+        assert window.iloc[-1, 0] == 0.007
+        assert window.index[-1] == pd.Timestamp(dates[-1] + timedelta(days=1))
+
+        materialised = updated.to_panel()
+        assert len(materialised) == 41
+        assert materialised.prices[-1, 0] == 141.0
+        # The source panel is left untouched
+        assert len(panel) == 40
+
+    def test_panel_horizon_overlay(self) -> None:
+        """Test a multi-day forecast is overlaid as one row per step."""
+        dates = pd.date_range("2024-01-01", periods=20, freq="D")
+        frames = {
+            ticker: pd.DataFrame(
+                {"Price": np.linspace(start, start + 19, num=20), "Returns": np.full(20, 0.01)},
+                index=[d.date() for d in dates],
+            )
+            for ticker, start in (("TICKER1", 100.0), ("TICKER2", 50.0))
+        }
+        panel = preprocess_panel(frames)
+        steps = pd.DatetimeIndex(["2024-01-22", "2024-01-23", "2024-01-24"])
+        forecasts = {
+            "TICKER1": pd.DataFrame({"predicted_price": [120.0, 121.0, 122.0]}, index=steps),
+            "TICKER2": pd.DataFrame({"predicted_price": [70.0, 70.5, 71.0]}, index=steps),
+        }
+        step_returns = {"TICKER1": np.array([0.01, 0.02, 0.03]), "TICKER2": np.zeros(3)}
+
+        updated = panel.with_horizon_overlay(forecasts, step_returns)
+        assert updated.horizon == 3
+        assert len(updated) == 23
+        assert updated.overlay_date == np.datetime64("2024-01-22")
+
+        window = updated.returns_frame(lookback_days=5)
+        assert window.shape == (5, 2)
+        assert list(window.index[-3:]) == list(steps)
+        assert window["TICKER1"].iloc[-3:].tolist() == [0.01, 0.02, 0.03]
+
+        materialised = updated.to_panel()
+        assert len(materialised) == 23
+        assert materialised.prices[-1].tolist() == [122.0, 71.0]
+        assert materialised.dates[-1] == np.datetime64("2024-01-24")
+
+    def test_preprocess_panel_union_alignment(self) -> None:
+        """Test union alignment forward-fills short gaps and masks the rest."""
+        dates = pd.date_range("2024-01-01", periods=10, freq="D")
+        full = pd.DataFrame(
+            {"Price": np.arange(10, dtype=float) + 100, "Returns": np.full(10, 0.01)},
+            index=dates.date,
+        )
+        # Recent listing (first 4 dates missing) with a 3-day gap in the middle
+        keep = [4, 5, 9]
+        ipo = pd.DataFrame(
+            {"Price": [50.0, 51.0, 55.0], "Returns": [0.0, 0.02, 0.0784]},
+            index=dates[keep].date,
+        )
+
+        strict = preprocess_panel({"FULL": full, "IPO": ipo}, mode="intersection")
+        assert len(strict) == 3
+        assert strict.valid is None
+
+        panel = preprocess_panel({"FULL": full, "IPO": ipo}, mode="union", ffill_limit=2)
+        assert len(panel) == 10
+        assert panel.is_masked
+        np.testing.assert_array_equal(
+            panel.valid[:, 1], [False] * 4 + [True, True, True, True, False, True]
+        )
+        np.testing.assert_array_equal(panel.prices[4:8, 1], [50.0, 51.0, 51.0, 51.0])
+        np.testing.assert_array_equal(panel.returns[6:8, 1], [0.0, 0.0])
+        assert np.isnan(panel.prices[8, 1])
+        assert np.isnan(panel.prices[:4, 1]).all()
+
+        # Model input holds only valid rows; the fully observed ticker stays a view
+        ipo_series = panel.price_series("IPO")
+        assert list(ipo_series.to_numpy()) == [50.0, 51.0, 51.0, 51.0, 55.0]
+        assert np.shares_memory(panel.price_series("FULL").to_numpy(), panel.prices)
+        assert collect_recent_prices(panel, days=30)["IPO"] == [50.0, 51.0, 51.0, 51.0, 55.0]
+        assert len(panel.to_dict()["IPO"]) == 5
+
+        updated = append_predictions(panel, {"FULL": 110.0, "IPO": 56.0}, {"FULL": 0.0, "IPO": 0.0})
+        assert updated.is_masked
+        materialised = updated.to_panel()
+        assert materialised.valid.shape == (11, 2)
+        assert materialised.valid[-1].all()
+
+    def test_preprocess_panel_unknown_mode(self) -> None:
+        """Test an unknown alignment mode is rejected."""
+        df = pd.DataFrame({"Price": [1.0], "Returns": [0.0]}, index=[date(2024, 1, 1)])
+        with pytest.raises(ValueError, match="Unknown alignment mode"):
+            preprocess_panel({"TICKER1": df}, mode="outer")
@@ -0,0 +1,81 @@
+"""Tests for the optimisation result cache."""
+
+from datetime import UTC, datetime
+from unittest.mock import patch
+
+from api.result_cache import ResultCache, market_data_version, request_key
+
+
+class TestRequestKey:
+    """Test request normalisation."""
+
+    def test_equivalent_requests_share_a_key(self) -> None:
+        """Test ticker order, case and unset fields do not change the key."""
+        first = request_key(
+            "optimisation",
+            {"tickers": ["AAPL", "msft"], "risk_aversion": None, "prophet_params": None},
+        )
+        second = request_key("optimisation", {"tickers": [" MSFT", "AAPL", "AAPL"]})
+        assert first == second
+
+    def test_explicit_defaults_share_a_key(self) -> None:
+        """Test spelling out the settings defaults matches leaving the fields unset."""
+        from src.settings import MINIMUM_ALLOCATION, PROPHET_PARAMS, RISK_AVERSION
+
+        explicit = request_key(
+            "optimisation",
+            {
+                "tickers": ["AAPL"],
+                "risk_aversion": float(RISK_AVERSION),
+                "min_allocation": MINIMUM_ALLOCATION,
+                "prophet_params": {"yearly_seasonality": PROPHET_PARAMS["yearly_seasonality"]},
+            },
+        )
+        assert explicit == request_key("optimisation", {"tickers": ["AAPL"]})
+
+    def test_different_requests_differ(self) -> None:
+        """Test parameters and kind are part of the key."""
+        base = request_key("optimisation", {"tickers": ["AAPL"], "risk_aversion": 1.0})
+        assert base != request_key("optimisation", {"tickers": ["AAPL"], "risk_aversion": 2.0})
+        assert base != request_key("frontier", {"tickers": ["AAPL"], "risk_aversion": 1.0})
+        assert request_key(
+            "optimisation", {"tickers": ["AAPL"], "prophet_params": {"yearly_seasonality": True}}
+        ) != request_key(
+            "optimisation", {"tickers": ["AAPL"], "prophet_params": {"yearly_seasonality": False}}
+        )
+
+
+class TestResultCache:
+    """Test expiry, eviction and market data invalidation."""
+
+    def test_lru_eviction_and_ttl(self) -> None:
+        """Test the least recently used entry is evicted and expired entries are dropped."""
+        cache = ResultCache(max_entries=2, ttl=60)
+        with patch.object(cache, "current_version", return_value="v1"):
+            cache.put("a", 1)
+            cache.put("b", 2)
+            assert cache.get("a") == 1
+            cache.put("c", 3)
+            assert cache.get("b") is None
+            assert cache.get("a") == 1 and cache.get("c") == 3
+
+            cache.ttl = 0
+            assert cache.get("a") is None
+            assert len(cache) == 1
+
+    def test_new_market_data_invalidates(self) -> None:
+        """Test entries computed before the latest session close are stale."""
+        cache = ResultCache(max_entries=4, ttl=60)
+        with patch.object(cache, "current_version", return_value="v1"):
+            cache.put("a", 1)
+        with patch.object(cache, "current_version", return_value="v2"):
+            assert cache.get("a") is None
+
+    def test_market_data_version_changes_at_close(self) -> None:
+        """Test the version changes once a session has closed and is stable until the next."""
+        before_close = datetime(2024, 1, 3, 20, 0, tzinfo=UTC)
+        after_close = datetime(2024, 1, 3, 21, 30, tzinfo=UTC)
+        assert market_data_version(before_close) != market_data_version(after_close)
+        assert market_data_version(after_close) == market_data_version(
+            datetime(2024, 1, 4, 9, 0, tzinfo=UTC)
+        )